@@ -0,0 +1,153 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Events are buffered and written in groups: a batch is flushed once it holds
+# ACTIVITY_BATCH_SIZE events or ACTIVITY_FLUSH_MS have passed since its first event
+ACTIVITY_QUEUE_SIZE = int(os.getenv("ACTIVITY_QUEUE_SIZE", "10000"))
+ACTIVITY_BATCH_SIZE = int(os.getenv("ACTIVITY_BATCH_SIZE", "500"))
+ACTIVITY_FLUSH_MS = int(os.getenv("ACTIVITY_FLUSH_MS", "50"))
+
+Writer = Callable[[List[Any]], None]
+
+_STOP = object()
+
+class ActivitySink:
+    """Write-behind buffer for log events.
+
+    Producers hand an event and the batch writer that stores it to submit(),
+    which never blocks: when the queue is full the event is dropped and
+    counted. A background thread groups queued events by writer and calls each
+    writer once per batch, so a burst of events costs one file write or one
+    transaction instead of one per event. close() flushes and stops the
+    thread; the next submit() starts a new one, as the storage executor does.
+    """
+
+    def __init__(self, max_pending: int = ACTIVITY_QUEUE_SIZE, batch_size: int = ACTIVITY_BATCH_SIZE,
+                 flush_interval: float = ACTIVITY_FLUSH_MS / 1000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()  # Guards _queue, _closed and the counters, updated from both sides
+        self._closed = False  # Only while close() is flushing
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+
+    def start(self):
+        """Start the background writer if it is not running"""
+        with self._start_lock:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), name="activity-sink",
+                                                daemon=True)
+                self._thread.start()
+
+    def submit(self, writer: Writer, event: Any) -> bool:
+        """Queue an event for writer; return False if it had to be dropped"""
+        if self._thread is None:
+            self.start()
+
+        with self._lock:
+            # Checked under the lock so no event is queued behind close()'s stop marker
+            if self._closed:
+                self.dropped += 1
+                return False
+            try:
+                self._queue.put_nowait((writer, event))
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self.submitted += 1
+            return True
+
+    def _collect(self, pending: "queue.Queue") -> List:
+        """Block for the first event, then gather more until the batch is full or due"""
+        batch = [pending.get()]
+        if batch[0] is _STOP:
+            return batch
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = pending.get(timeout=remaining) if remaining > 0 else pending.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is _STOP:
+                break
+        return batch
+
+    def _write(self, batch: List):
+        """Call each writer once with all of its events, in submission order"""
+        groups: Dict[Writer, List[Any]] = {}
+        for writer, event in batch:
+            groups.setdefault(writer, []).append(event)
+
+        for writer, events in groups.items():
+            try:
+                writer(events)
+                with self._lock:
+                    self.written += len(events)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"Error writing activity batch: {e}")
+        with self._lock:
+            self.batches += 1
+
+    def _run(self, pending: "queue.Queue"):
+        while True:
+            batch = self._collect(pending)
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            if batch:
+                self._write(batch)
+            if stopping:
+                return
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Flush everything queued so far and stop the writer; the next submit() starts a new one"""
+        with self._start_lock:
+            with self._lock:
+                if self._thread is None:
+                    return
+                self._closed = True
+                thread, pending = self._thread, self._queue
+
+            pending.put(_STOP)
+            thread.join(timeout)
+            with self._lock:
+                # A writer still finishing after the timeout keeps the old queue to itself
+                self._queue = queue.Queue(maxsize=self.max_pending)
+                self._thread = None
+                self._closed = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counters = {
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "errors": self.errors
+            }
+        return {
+            "pending": self._queue.qsize(),
+            **counters,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000)
+        }
+
+# Global activity sink
+activity_sink = ActivitySink()
+atexit.register(activity_sink.close)
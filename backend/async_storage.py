@@ -0,0 +1,52 @@
+import asyncio
+import functools
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from repository import Repository
+
+# Blocking file and SQLite work runs on this executor so route handlers never
+# stall the event loop; the semaphore bounds how much work can queue up behind it
+STORAGE_WORKERS = int(os.getenv("STORAGE_WORKERS", "8"))
+STORAGE_MAX_PENDING = int(os.getenv("STORAGE_MAX_PENDING", str(STORAGE_WORKERS * 8)))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# One semaphore per event loop: a semaphore that ever waited is bound to its loop
+_pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def storage_executor() -> ThreadPoolExecutor:
+    """The storage executor, started on first use and again after shutdown_storage()"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=STORAGE_WORKERS, thread_name_prefix="storage")
+        return _executor
+
+async def run_storage(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking storage call on the storage executor and await its result"""
+    loop = asyncio.get_running_loop()
+    pending = _pending.get(loop)
+    if pending is None:
+        pending = _pending[loop] = asyncio.Semaphore(STORAGE_MAX_PENDING)
+    async with pending:
+        return await loop.run_in_executor(storage_executor(), functools.partial(func, *args, **kwargs))
+
+def shutdown_storage():
+    """Wait for queued storage work to finish and stop the executor; the next call starts a new one"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+class AsyncRepository:
+    """Awaitable view of a Repository whose calls run on the storage executor"""
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+    async def scan_by(self, field: str, value: str) -> List[Dict]:
+        return await run_storage(self.repository.scan_by, field, value)
@@ -0,0 +1,80 @@
+"""Boot-to-first-search time with the catalog parsed from CSV vs loaded from its binary copy.
+
+Run from the backend directory: python benchmarks/catalog_boot.py
+Works in a temporary directory, so the real data files are not touched.
+Each boot runs in a fresh interpreter.
+"""
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CATALOG_SIZE = 100_000
+RUNS = 3
+
+BOOT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend!r})
+from free_resources_service import FreeResourcesService
+service = FreeResourcesService()
+loaded = time.perf_counter()
+service.search_with_facets('python', limit=10)
+searched = time.perf_counter()
+print(json.dumps({{'load': loaded - start, 'search': searched - loaded, 'total': searched - start}}))
+"""
+
+def write_csv(path, count, rng):
+    from free_resources_service import RESOURCE_FIELDS
+    words = ['python', 'react', 'data', 'design', 'security', 'cloud', 'mobile', 'machine', 'learning', 'web']
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(RESOURCE_FIELDS)
+        for i in range(count):
+            title = ' '.join(rng.sample(words, 3)).title()
+            writer.writerow([
+                str(i + 1), f"{title} {i}", f"Synthetic course {i} about {' '.join(rng.sample(words, 5))}",
+                rng.choice(['freeCodeCamp', 'Coursera', 'edX', 'Khan Academy', 'MIT OpenCourseWare']),
+                rng.choice(['Web Development', 'Data Science', 'AI', 'Design', 'Cybersecurity']),
+                rng.choice(['Beginner', 'Intermediate', 'Advanced']), f"{rng.randint(1, 80)} hours",
+                f"https://www.example.com/course/{i}", '', f"https://img.example.com/{i}.jpg",
+                rng.choice(['English', 'Spanish', 'Hindi']), ','.join(w.title() for w in rng.sample(words, 3)),
+                f"{rng.uniform(3.0, 5.0):.1f}", '2024-01-01'
+            ])
+
+def boot(directory, snapshots):
+    env = dict(os.environ, CATALOG_SNAPSHOT_FILES='true' if snapshots else 'false')
+    output = subprocess.run([sys.executable, '-c', BOOT.format(backend=BACKEND_DIR)], cwd=directory, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def best_of(directory, snapshots):
+    runs = [boot(directory, snapshots) for _ in range(RUNS)]
+    return min(runs, key=lambda run: run['total'])
+
+def main():
+    directory = tempfile.mkdtemp(prefix="catalog-boot-")
+    os.makedirs(os.path.join(directory, 'data'))
+    csv_file = os.path.join(directory, 'data', 'free_resources.csv')
+    write_csv(csv_file, CATALOG_SIZE, random.Random(5))
+
+    csv_boot = best_of(directory, snapshots=False)
+    boot(directory, snapshots=True)  # First boot parses the CSV and writes the binary copy
+    catalog_file = os.path.join(directory, 'data', 'free_resources.catalog')
+    binary_boot = best_of(directory, snapshots=True)
+
+    print(f"catalog: {CATALOG_SIZE} resources, CSV {os.path.getsize(csv_file) / 1e6:.1f} MB, "
+          f"binary {os.path.getsize(catalog_file) / 1e6:.1f} MB")
+    for label, run in (('csv', csv_boot), ('binary', binary_boot)):
+        print(f"{label:>6}: load {run['load']:6.2f} s  first search {run['search']:6.2f} s  total {run['total']:6.2f} s")
+    print(f"load speedup {csv_boot['load'] / binary_boot['load']:.1f}x, "
+          f"boot-to-first-search speedup {csv_boot['total'] / binary_boot['total']:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Learning-path relevance: per-resource Python loop vs RelevanceIndex.
+
+Run from the backend directory: python benchmarks/learning_path_relevance.py
+Uses a synthetic catalog, so no data files are read or written.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from relevance_index import RelevanceIndex, calculate_relevance
+
+TOPICS = ['python', 'javascript', 'typescript', 'react', 'angular', 'vue', 'node.js', 'django', 'flask',
+          'fastapi', 'spring', 'java', 'kotlin', 'swift', 'flutter', 'dart', 'go', 'rust', 'c++', 'c#',
+          'sql', 'postgresql', 'mongodb', 'redis', 'graphql', 'docker', 'kubernetes', 'terraform', 'aws',
+          'azure', 'linux', 'git', 'pandas', 'numpy', 'tensorflow', 'pytorch', 'statistics', 'excel',
+          'tableau', 'figma', 'photoshop', 'typography', 'networking', 'cryptography', 'pentesting',
+          'blockchain', 'unity', 'algorithms', 'recursion', 'compilers']
+FILLER = ['complete', 'course', 'tutorial', 'for', 'beginners', 'advanced', 'introduction', 'to', 'the',
+          'fundamentals', 'with', 'and', 'build', 'projects', 'guide', 'hands-on', 'learn', 'modern',
+          'practical', 'in', 'depth', 'crash', 'masterclass', 'from', 'scratch', 'real', 'world']
+CATEGORIES = ['Web Development', 'Data Science', 'AI', 'Computer Science', 'Design', 'Cybersecurity',
+              'Mobile Development']
+PROVIDERS = ['freeCodeCamp', 'Coursera', 'Programming with Mosh', 'Kaggle Learn', 'Stanford Online',
+             'Traversy Media', 'Udacity', 'Harvard University']
+GOALS = ['Python', 'React', 'SQL', 'Docker', 'Machine Learning']
+
+def make_resources(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        'id': str(i),
+        'title': ' '.join(rng.choices(FILLER, k=3) + rng.choices(TOPICS, k=2)).title(),
+        'description': ' '.join(rng.choices(FILLER, k=14) + rng.choices(TOPICS, k=4)),
+        'provider': rng.choice(PROVIDERS),
+        'category': rng.choice(CATEGORIES),
+        'tags': [topic.title() for topic in rng.sample(TOPICS, 3)],
+        'rating': round(rng.uniform(3.0, 5.0), 1)
+    } for i in range(count)]
+
+def loop_ranking(resources, goals):
+    """The per-resource loop the service used before RelevanceIndex"""
+    relevant = []
+    scores = {}
+    for goal in goals:
+        goal_lower = goal.lower()
+        for resource in resources:
+            if (goal_lower in resource['title'].lower() or
+                    goal_lower in resource['description'].lower() or
+                    any(goal_lower in tag.lower() for tag in resource['tags'])):
+                if resource['rating'] >= 4.0:
+                    if resource['id'] not in scores:
+                        relevant.append(resource)
+                    scores[resource['id']] = calculate_relevance(resource, goal)
+    ranked = [(resource, scores[resource['id']]) for resource in relevant]
+    ranked.sort(key=lambda entry: (entry[1], entry[0]['rating']), reverse=True)
+    return [(resource['id'], score) for resource, score in ranked[:15]]
+
+def best_of(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    for count in (10_000, 100_000):
+        resources = make_resources(count)
+        build_time, index = best_of(lambda: RelevanceIndex.build(resources), 1)
+        loop_time, expected = best_of(lambda: loop_ranking(resources, GOALS), 3)
+        index_time, ranked = best_of(lambda: index.rank(GOALS, limit=15), 5)
+
+        actual = [(resources[doc]['id'], score) for doc, score in ranked]
+        assert actual == expected, "RelevanceIndex ranking differs from the loop"
+        print(f"{count:>7} resources: loop {loop_time * 1000:8.1f} ms  "
+              f"index {index_time * 1000:7.1f} ms  ({loop_time / index_time:5.1f}x)  "
+              f"build {build_time * 1000:7.1f} ms")
+
+if __name__ == '__main__':
+    main()
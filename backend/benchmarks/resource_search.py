@@ -0,0 +1,79 @@
+"""Search latency on a large catalog: single and multi-term queries, with and without facet filters.
+
+Run from the backend directory: python benchmarks/resource_search.py
+Works in a temporary directory, so the real data files are not touched.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CATALOG_SIZE = 100_000
+LIMIT = 20
+REPEATS = 50
+
+TOPICS = ['python', 'javascript', 'react', 'node.js', 'data', 'science', 'machine', 'learning', 'deep',
+          'web', 'development', 'design', 'security', 'cloud', 'aws', 'docker', 'kubernetes', 'sql',
+          'database', 'mobile', 'flutter', 'android', 'ios', 'java', 'c++', 'rust', 'go', 'algorithms',
+          'statistics', 'excel', 'marketing', 'ux', 'figma', 'testing', 'devops', 'linux', 'networking']
+FILLER = ['complete', 'course', 'tutorial', 'beginners', 'introduction', 'advanced', 'guide', 'hands-on',
+          'projects', 'fundamentals', 'masterclass', 'bootcamp', 'crash', 'practical', 'modern']
+
+QUERIES = {
+    'one term': [('python', {}), ('react', {}), ('security', {})],
+    'two terms': [('python data', {}), ('machine learning', {}), ('web development', {})],
+    'three terms': [('python machine learning', {}), ('react web development', {})],
+    'two terms + facet': [('python data', {'level': 'Beginner'}), ('machine learning', {'language': 'Spanish'}),
+                          ('web development', {'category': 'Design', 'level': 'Advanced'})],
+}
+
+def zipf_choice(rng, words):
+    return words[min(int(rng.paretovariate(1.2)) - 1, len(words) - 1)]
+
+def make_resources(count, rng):
+    resources = []
+    for i in range(count):
+        topics = {zipf_choice(rng, TOPICS) for _ in range(rng.randint(2, 4))}
+        title = ' '.join(list(topics)[:2] + rng.sample(FILLER, 2))
+        resources.append({
+            'title': f"{title} {i}",
+            'description': ' '.join([zipf_choice(rng, TOPICS) for _ in range(6)] + rng.sample(FILLER, 4)),
+            'provider': rng.choice(['freeCodeCamp', 'Coursera', 'edX', 'Khan Academy', 'MIT OpenCourseWare']),
+            'category': rng.choice(['Web Development', 'Data Science', 'AI', 'Design', 'Cybersecurity']),
+            'level': rng.choice(['Beginner', 'Intermediate', 'Advanced']),
+            'language': rng.choice(['English', 'English', 'English', 'Spanish', 'Hindi']),
+            'url': f"https://www.example.com/course/{i}",
+            'tags': sorted(topics),
+            'rating': round(rng.uniform(3.0, 5.0), 1)
+        })
+    return resources
+
+def main():
+    os.chdir(tempfile.mkdtemp(prefix="search-bench-"))
+    from free_resources_service import FreeResourcesService
+
+    service = FreeResourcesService()
+    service.add_resources_from_external(make_resources(CATALOG_SIZE, random.Random(7)))
+    snapshot = service.catalog.snapshot()
+    service.search_index(snapshot)
+    service.facet_index(snapshot)
+    print(f"catalog: {len(snapshot)} resources, top {LIMIT}")
+
+    for label, queries in QUERIES.items():
+        timings = []
+        for query, filters in queries:
+            service.search_with_facets(query, limit=LIMIT, **filters)
+            for _ in range(REPEATS):
+                start = time.perf_counter()
+                service.search_with_facets(query, limit=LIMIT, **filters)
+                timings.append(time.perf_counter() - start)
+        print(f"{label:>18}: median {statistics.median(timings) * 1000:6.2f} ms  "
+              f"max {max(timings) * 1000:6.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+import atexit
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from repository import Entity, Repository, get_repository
+
+USER_BOOKMARKS_CSV = "data/user_bookmarks.csv"
+
+# last_accessed is server time; reported_at is the client's time of the latest batched
+# progress report, only ever compared with other client times
+BOOKMARK_FIELDS = ['user_id', 'resource_id', 'status', 'progress', 'bookmarked_at', 'last_accessed', 'reported_at']
+
+BOOKMARK_ENTITY = Entity(
+    "user_bookmarks", USER_BOOKMARKS_CSV, BOOKMARK_FIELDS,
+    key=('user_id', 'resource_id'),
+    indexes=['user_id'],
+    append_updates=True
+)
+
+# Bookmark changes are held in memory and stored together, at most this long
+# after the first one; 0 stores every change as it is made
+BOOKMARK_FLUSH_MS = int(os.getenv("BOOKMARK_FLUSH_MS", "200"))
+
+def progress_status(status: str, progress: int) -> str:
+    """Bookmark status after reporting progress"""
+    if progress >= 100:
+        return 'completed'
+    if progress > 0:
+        return 'in_progress'
+    return status
+
+class BookmarkStore:
+    """User bookmarks keyed by (user_id, resource_id), with write-behind storage.
+
+    Changes land in a per-user in-memory overlay that reads consult first. A
+    timer stores every bookmark changed during the flush window as one batch,
+    so a player reporting progress every few seconds costs one appended row
+    per window rather than a file rewrite per report.
+    """
+
+    def __init__(self, repository: Optional[Repository] = None, flush_interval: float = BOOKMARK_FLUSH_MS / 1000):
+        self.bookmarks = repository or get_repository(BOOKMARK_ENTITY)
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, Dict]] = {}  # user_id -> resource_id -> row
+        self._writing: Dict[str, Dict[str, Dict]] = {}  # Taken by a flush and not stored yet
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # One flush at a time, so batches are stored in order
+        self._timer: Optional[threading.Timer] = None
+        self.flushes = 0
+        self.rows_written = 0
+
+    def get(self, user_id: str, resource_id: str) -> Optional[Dict]:
+        with self._lock:
+            for overlay in (self._pending, self._writing):
+                row = overlay.get(user_id, {}).get(resource_id)
+                if row is not None:
+                    return dict(row)
+        return self.bookmarks.get((user_id, resource_id))
+
+    def for_user(self, user_id: str) -> List[Dict]:
+        """A user's bookmarks in the order they were first made"""
+        with self._lock:
+            overlay = {**self._writing.get(user_id, {}), **self._pending.get(user_id, {})}
+        rows = {row['resource_id']: row for row in self.bookmarks.scan_by('user_id', user_id)}
+        rows.update((resource_id, dict(row)) for resource_id, row in overlay.items())
+        return list(rows.values())
+
+    def _schedule_flush(self):
+        """Start the flush timer if none is running; caller holds the lock"""
+        if self._timer is None and self.flush_interval > 0:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _write(self, row: Dict) -> Dict:
+        """Put a row in the overlay; caller holds the lock"""
+        row = BOOKMARK_ENTITY.normalize(row)
+        self._pending.setdefault(row['user_id'], {})[row['resource_id']] = row
+        self._schedule_flush()
+        return dict(row)
+
+    def _written(self, row: Dict) -> Dict:
+        """Store right away when write-behind is off; called without the lock"""
+        if self.flush_interval <= 0:
+            self.flush()
+        return row
+
+    def bookmark(self, user_id: str, resource_id: str, status: str = 'bookmarked') -> Dict:
+        """Create a bookmark, or start an existing one over with no progress"""
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            row = self._write({
+                'user_id': user_id,
+                'resource_id': resource_id,
+                'status': status,
+                'progress': '0',
+                'bookmarked_at': now,
+                'last_accessed': now,
+                'reported_at': ''
+            })
+        return self._written(row)
+
+    def _progress_row(self, user_id: str, resource_id: str, progress: int, accessed_at: str,
+                      existing: Optional[Dict], reported_at: str = '') -> Dict:
+        return {
+            'user_id': user_id,
+            'resource_id': resource_id,
+            'status': progress_status(existing['status'] if existing else 'in_progress', progress),
+            'progress': str(progress),
+            'bookmarked_at': existing['bookmarked_at'] if existing else accessed_at,
+            'last_accessed': accessed_at,
+            'reported_at': reported_at
+        }
+
+    def set_progress(self, user_id: str, resource_id: str, progress: int) -> Dict:
+        """Record progress on a resource, bookmarking it first if needed"""
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            existing = self.get(user_id, resource_id)
+            row = self._write(self._progress_row(user_id, resource_id, progress, now, existing))
+        return self._written(row)
+
+    def set_progress_many(self, user_id: str, reports: Iterable[Tuple[str, int, Optional[str]]]) -> int:
+        """Record (resource_id, progress, reported_at) reports; return how many bookmarks changed.
+
+        reported_at is the client's UTC ISO timestamp, or None. It is only
+        compared with other client timestamps: per resource the latest
+        report in the batch counts (an untimed one counts as newest), and a
+        report older than the last one stored from the client is ignored, so
+        retried or reordered heartbeats cannot move progress backwards.
+        last_accessed is always server time, so a client clock running
+        behind the server's cannot make reports look stale.
+        """
+        latest: Dict[str, Tuple[str, int]] = {}
+        for resource_id, progress, reported_at in reports:
+            current = latest.get(resource_id)
+            if current is None or not reported_at or not current[0] or reported_at >= current[0]:
+                latest[resource_id] = (reported_at or '', progress)
+
+        now = datetime.utcnow().isoformat()
+        changed = 0
+        with self._lock:
+            for resource_id, (reported_at, progress) in latest.items():
+                existing = self.get(user_id, resource_id)
+                if reported_at and existing is not None and existing.get('reported_at', '') > reported_at:
+                    continue
+                self._write(self._progress_row(user_id, resource_id, progress, now, existing, reported_at))
+                changed += 1
+        if changed:
+            self._written({})
+        return changed
+
+    def flush(self):
+        """Store all pending changes in one batch"""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._writing, self._pending = self._pending, {}
+                writing = self._writing
+            if not writing:
+                return
+
+            try:
+                with self.bookmarks.batch():
+                    for rows in writing.values():
+                        for row in rows.values():
+                            self.bookmarks.put(row)
+                self.flushes += 1
+                self.rows_written += sum(len(rows) for rows in writing.values())
+            except Exception as e:
+                print(f"Error writing bookmarks: {e}")
+                with self._lock:
+                    # Keep the changes for the next flush; newer pending rows win
+                    for user_id, rows in writing.items():
+                        user_pending = self._pending.setdefault(user_id, {})
+                        for resource_id, row in rows.items():
+                            user_pending.setdefault(resource_id, row)
+                    self._schedule_flush()
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def close(self):
+        """Store pending changes; called at shutdown"""
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pending = sum(len(rows) for rows in self._pending.values())
+        return {
+            "pending": pending,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "flush_interval_ms": int(self.flush_interval * 1000)
+        }
+
+# Global bookmark store
+bookmark_store = BookmarkStore()
+atexit.register(bookmark_store.close)
@@ -0,0 +1,204 @@
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zipfile
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Binary copy of the resource catalog, loaded at startup instead of parsing the CSV.
+# Layout: header, column directory, then each column's data and string table,
+# 8-byte aligned so numeric columns can be read in place from a memory map.
+CATALOG_MAGIC = b'SSCT'
+CATALOG_FORMAT = 1
+
+_HEADER = struct.Struct('<4sHBxQQqQII')  # magic, format, little-endian flag, version, inode, mtime_ns, size, rows, columns
+_COLUMN = struct.Struct('<16sB7xQQQQ')   # name, kind, data offset, data length, table offset, table length
+
+# Column kinds
+TEXT = 1        # Values joined by a separator
+CODED = 2       # uint32 codes into a table of distinct values, for low-cardinality fields
+TEXT_LIST = 3   # Lists of strings, joined by ',' within a row
+FLOAT = 4       # float64; NaN marks an empty value
+
+# Catalog fields and how each is stored, in the shape resource_from_row() returns
+CATALOG_COLUMNS: Sequence[Tuple[str, int]] = (
+    ('id', TEXT), ('title', TEXT), ('description', TEXT), ('provider', CODED),
+    ('category', CODED), ('level', CODED), ('duration', CODED), ('url', TEXT),
+    ('embed_url', TEXT), ('thumbnail', TEXT), ('language', CODED), ('tags', TEXT_LIST),
+    ('rating', FLOAT), ('created_at', TEXT)
+)
+
+_SEPARATOR = '\x00'
+_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+Signature = Tuple[int, int, int]  # Source CSV inode, mtime_ns and size
+
+def _padded(data: bytes) -> bytes:
+    return data + b'\x00' * (-len(data) % 8)
+
+def _float_value(value) -> float:
+    # resource_from_row() turns an empty rating into the int 0
+    return float('nan') if value == 0 and not isinstance(value, float) else float(value)
+
+def _joined(values: List[str]) -> Optional[bytes]:
+    if any(_SEPARATOR in value for value in values):
+        return None
+    return _SEPARATOR.join(values).encode('utf-8')
+
+def write_catalog(path: str, resources: Sequence[Dict], version: int, source: Signature) -> Optional[Signature]:
+    """Write resources to path atomically; return the new file's signature, or None if a value cannot be stored"""
+    sections: List[Tuple[str, int, bytes, bytes]] = []
+    for name, kind in CATALOG_COLUMNS:
+        if kind == FLOAT:
+            values = array('d', (_float_value(resource[name]) for resource in resources))
+            data, table = values.tobytes(), b''
+        elif kind == CODED:
+            codes: Dict[str, int] = {}
+            values = array('I', (codes.setdefault(resource[name], len(codes)) for resource in resources))
+            data, table = values.tobytes(), _joined(list(codes))
+        elif kind == TEXT_LIST:
+            lists = [resource[name] for resource in resources]
+            if any(',' in item for items in lists for item in items):
+                return None
+            data, table = _joined([','.join(items) for items in lists]), b''
+        else:
+            data, table = _joined([resource[name] for resource in resources]), b''
+        if data is None or table is None:
+            return None
+        sections.append((name, kind, data, table))
+
+    offset = _HEADER.size + _COLUMN.size * len(sections)
+    offset += -offset % 8
+    directory = []
+    for name, kind, data, table in sections:
+        data_offset = offset
+        table_offset = data_offset + len(_padded(data))
+        offset = table_offset + len(_padded(table))
+        directory.append(_COLUMN.pack(name.encode('ascii'), kind, data_offset, len(data), table_offset, len(table)))
+
+    # A temporary file of its own, so processes saving at the same time do not mix their writes
+    descriptor, temp_file = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                             prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with open(descriptor, 'wb') as file:
+            file.write(_HEADER.pack(CATALOG_MAGIC, CATALOG_FORMAT, _LITTLE_ENDIAN, version,
+                                    *source, len(resources), len(sections)))
+            file.write(_padded(b''.join(directory)))
+            for _, _, data, table in sections:
+                file.write(_padded(data))
+                file.write(_padded(table))
+            file.flush()
+            stat = os.fstat(file.fileno())  # Renaming keeps inode, mtime and size
+        os.replace(temp_file, path)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except FileNotFoundError:
+            pass
+        raise
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def _read_header(buffer) -> Optional[Tuple]:
+    if len(buffer) < _HEADER.size:
+        return None
+    header = _HEADER.unpack_from(buffer, 0)
+    magic, file_format, little_endian = header[:3]
+    if magic != CATALOG_MAGIC or file_format != CATALOG_FORMAT or bool(little_endian) != _LITTLE_ENDIAN:
+        return None
+    return header
+
+def stored_version(path: str) -> int:
+    """Catalog version recorded in the file at path, or 0"""
+    try:
+        with open(path, 'rb') as file:
+            header = _read_header(file.read(_HEADER.size))
+    except OSError:
+        return 0
+    return header[3] if header else 0
+
+def read_catalog(path: str, source: Signature) -> Optional[Tuple[int, List[Dict]]]:
+    """(version, resources) from path if it was written from the source file as it is now"""
+    try:
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+
+    view = memoryview(buffer)
+    try:
+        header = _read_header(view)
+        if header is None or tuple(header[4:7]) != tuple(source):
+            return None
+        version, rows, column_count = header[3], header[7], header[8]
+
+        columns = {}
+        for position in range(column_count):
+            name, kind, data_offset, data_length, table_offset, table_length = _COLUMN.unpack_from(
+                view, _HEADER.size + position * _COLUMN.size)
+            data = view[data_offset:data_offset + data_length]
+            if kind == FLOAT:
+                columns[name.rstrip(b'\x00').decode('ascii')] = [
+                    0 if value != value else value for value in data.cast('d').tolist()
+                ]
+            elif kind == CODED:
+                table = str(view[table_offset:table_offset + table_length], 'utf-8').split(_SEPARATOR)
+                columns[name.rstrip(b'\x00').decode('ascii')] = list(map(table.__getitem__, data.cast('I')))
+            elif kind == TEXT_LIST:
+                columns[name.rstrip(b'\x00').decode('ascii')] = [
+                    value.split(',') if value else [] for value in str(data, 'utf-8').split(_SEPARATOR)
+                ] if rows else []
+            else:
+                columns[name.rstrip(b'\x00').decode('ascii')] = str(data, 'utf-8').split(_SEPARATOR) if rows else []
+            data.release()
+
+        names = [name for name, _ in CATALOG_COLUMNS]
+        if any(len(columns.get(name, ())) != rows for name in names):
+            return None
+        resources = [dict(zip(names, values)) for values in zip(*(columns[name] for name in names))]
+        return version, resources
+    except (ValueError, struct.error, UnicodeDecodeError) as e:
+        print(f"Error reading catalog file: {e}")
+        return None
+    finally:
+        view.release()
+        buffer.close()
+
+def file_signature(path: str) -> Optional[Signature]:
+    """Inode, mtime_ns and size of the file at path, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+def write_arrays(path: str, arrays: Dict[str, np.ndarray], source: Signature):
+    """Store named arrays built from the catalog copy whose file signature is source"""
+    descriptor, temp_file = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                             prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with open(descriptor, 'wb') as file:
+            np.savez(file, _source=np.array(source, dtype=np.int64), **arrays)
+        os.replace(temp_file, path)
+    except BaseException:
+        try:
+            os.unlink(temp_file)
+        except FileNotFoundError:
+            pass
+        raise
+
+def read_arrays(path: str, source: Signature) -> Optional[Dict[str, np.ndarray]]:
+    """Arrays stored by write_arrays() if they were built from the catalog copy as it is now"""
+    try:
+        with np.load(path, allow_pickle=False) as stored:
+            if '_source' not in stored or tuple(stored['_source'].tolist()) != tuple(source):
+                return None
+            return {name: stored[name] for name in stored.files if name != '_source'}
+    except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile) as e:
+        if not isinstance(e, FileNotFoundError):
+            print(f"Error reading {path}: {e}")
+        return None
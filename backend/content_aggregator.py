@@ -1,16 +1,16 @@
 
 import requests
 from bs4 import BeautifulSoup
-import csv
 import os
 from typing import List, Dict
 from datetime import datetime
 import json
 import time
+from free_resources_service import RESOURCE_ENTITY, resource_catalog
 
 class ContentAggregator:
     def __init__(self):
-        self.resources_file = "data/free_resources.csv"
+        self.resources_file = RESOURCE_ENTITY.csv_file
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -334,39 +334,13 @@ class ContentAggregator:
             khan_courses = self.get_khan_academy_courses()
             all_resources.extend(khan_courses)
             
-            # Read existing resources
-            existing_resources = []
-            if os.path.exists(self.resources_file):
-                with open(self.resources_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    existing_resources = list(reader)
+            for resource in all_resources:
+                # Convert tags list to string for CSV
+                if isinstance(resource.get('tags'), list):
+                    resource['tags'] = ','.join(resource['tags'])
             
             # Add new resources (avoid duplicates)
-            existing_ids = {resource['id'] for resource in existing_resources}
-            new_resources = [resource for resource in all_resources if resource['id'] not in existing_ids]
-            
-            # Combine all resources
-            all_combined = existing_resources + new_resources
-            
-            # Write back to file
-            if all_combined:
-                with open(self.resources_file, 'w', newline='', encoding='utf-8') as file:
-                    fieldnames = [
-                        'id', 'title', 'description', 'provider', 'category', 'level',
-                        'duration', 'url', 'embed_url', 'thumbnail', 'language',
-                        'tags', 'rating', 'created_at'
-                    ]
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-                    
-                    for resource in all_combined:
-                        # Convert tags list to string for CSV
-                        if isinstance(resource.get('tags'), list):
-                            resource['tags'] = ','.join(resource['tags'])
-                        
-                        # Only write required fields
-                        row = {field: resource.get(field, '') for field in fieldnames}
-                        writer.writerow(row)
+            _, new_resources = resource_catalog.apply(added=all_resources)
             
             print(f"Added {len(new_resources)} new resources from external platforms")
             return len(new_resources)
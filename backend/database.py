@@ -1,16 +1,125 @@
 
 import sqlite3
 import json
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import os
+from typing import Dict, List
+from activity_sink import activity_sink
+from id_generator import new_id
 
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'skillspring.db')
 
+class ConnectionPool:
+    """Thread-safe pool of reusable, pre-configured SQLite connections"""
+
+    def __init__(self, database_path: str, max_size: int = 8, timeout: float = 30.0):
+        self.database_path = database_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.in_use = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with WAL and tuned pragmas"""
+        os.makedirs(os.path.dirname(self.database_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.timeout,
+            check_same_thread=False,  # Connections move between threads, one borrower at a time
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-65536')  # 64 MB page cache
+        conn.execute('PRAGMA mmap_size=268435456')  # 256 MB memory-mapped I/O
+        conn.execute('PRAGMA temp_store=MEMORY')
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self.created < self.max_size:
+                self.created += 1
+                create = True
+            else:
+                self.waits += 1
+                create = False
+
+        if create:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self.created -= 1
+                raise
+        return self._idle.get(timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; uncommitted work is rolled back on return"""
+        conn = self._acquire()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                self.in_use -= 1
+            self._idle.put(conn)
+
+    def stats(self) -> Dict:
+        return {
+            "database": os.path.basename(self.database_path),
+            "max_size": self.max_size,
+            "created": self.created,
+            "in_use": self.in_use,
+            "idle": self._idle.qsize(),
+            "checkouts": self.checkouts,
+            "waits": self.waits
+        }
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(database_path: str = DATABASE_PATH) -> ConnectionPool:
+    """Return the process-wide connection pool for a database file"""
+    database_path = os.path.abspath(database_path)
+    with _pools_lock:
+        pool = _pools.get(database_path)
+        if pool is None:
+            pool = ConnectionPool(database_path)
+            _pools[database_path] = pool
+        return pool
+
+def get_pool_stats():
+    """Get usage statistics for every connection pool"""
+    with _pools_lock:
+        return [pool.stats() for pool in _pools.values()]
+
 def init_database():
     """Initialize the database with required tables"""
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    
-    conn = sqlite3.connect(DATABASE_PATH)
+    with get_pool().connection() as conn:
+        _create_tables(conn)
+        conn.commit()
+        migrate_database(conn)
+
+def _create_tables(conn: sqlite3.Connection):
+    """Create the base tables"""
     cursor = conn.cursor()
     
     # Users table
@@ -83,111 +192,138 @@ def init_database():
             scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    conn.commit()
-    conn.close()
+
+# Schema migrations, applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    # 1: composite indexes matching the per-user activity and learning path
+    # queries, carrying their projected columns so the reads are covered
+    [
+        '''CREATE INDEX IF NOT EXISTS idx_activity_logs_user_timestamp
+           ON activity_logs (user_id, timestamp, id, type, title, description)''',
+        '''CREATE INDEX IF NOT EXISTS idx_learning_paths_user_created
+           ON learning_paths (user_id, created_at, id, title, description, progress,
+                              estimated_time, difficulty, skills, status, last_accessed)''',
+    ],
+]
+
+def migrate_database(conn: sqlite3.Connection):
+    """Apply schema migrations newer than the database's user_version"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for target in range(version + 1, len(MIGRATIONS) + 1):
+        for statement in MIGRATIONS[target - 1]:
+            conn.execute(statement)
+        conn.execute(f'PRAGMA user_version = {target}')
+        conn.commit()
+
+# Per-user reads served by the migration 1 indexes
+USER_LEARNING_PATHS_QUERY = '''
+    SELECT id, title, description, progress, estimated_time, difficulty,
+           skills, status, last_accessed
+    FROM learning_paths WHERE user_id = ? ORDER BY created_at DESC
+'''
+
+USER_ACTIVITIES_QUERY = '''
+    SELECT id, type, title, description, timestamp
+    FROM activity_logs WHERE user_id = ?
+    ORDER BY timestamp DESC, id DESC LIMIT ?
+'''
 
 def get_user_learning_paths(user_id: str):
     """Get all learning paths for a user"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT * FROM learning_paths WHERE user_id = ? ORDER BY created_at DESC
-    ''', (user_id,))
-    
-    paths = []
-    for row in cursor.fetchall():
-        path = {
-            'id': row[0],
-            'title': row[2],
-            'description': row[3],
-            'progress': row[4],
-            'estimatedTime': row[5],
-            'difficulty': row[6],
-            'skills': json.loads(row[7]) if row[7] else [],
-            'status': row[8],
-            'lastAccessed': row[10]
-        }
-        paths.append(path)
-    
-    conn.close()
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(USER_LEARNING_PATHS_QUERY, (user_id,))
+
+        paths = []
+        for row in cursor.fetchall():
+            path = {
+                'id': row['id'],
+                'title': row['title'],
+                'description': row['description'],
+                'progress': row['progress'],
+                'estimatedTime': row['estimated_time'],
+                'difficulty': row['difficulty'],
+                'skills': json.loads(row['skills']) if row['skills'] else [],
+                'status': row['status'],
+                'lastAccessed': row['last_accessed']
+            }
+            paths.append(path)
+
     return paths
 
 def add_learning_path(user_id: str, path_data: dict):
     """Add a new learning path for a user"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO learning_paths 
-        (id, user_id, title, description, estimated_time, difficulty, skills, last_accessed)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
-        path_data['id'],
-        user_id,
-        path_data['title'],
-        path_data['description'],
-        path_data.get('estimatedTime', '8-12 weeks'),
-        path_data.get('difficulty', 'Beginner'),
-        json.dumps(path_data.get('skills', [])),
-        datetime.now().isoformat()
-    ))
-    
-    conn.commit()
-    conn.close()
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT INTO learning_paths 
+            (id, user_id, title, description, estimated_time, difficulty, skills, last_accessed)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            path_data['id'],
+            user_id,
+            path_data['title'],
+            path_data['description'],
+            path_data.get('estimatedTime', '8-12 weeks'),
+            path_data.get('difficulty', 'Beginner'),
+            json.dumps(path_data.get('skills', [])),
+            datetime.now().isoformat()
+        ))
+
+        conn.commit()
 
 def update_learning_path_progress(user_id: str, path_id: str, progress: int):
     """Update progress for a learning path"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    status = 'completed' if progress >= 100 else 'in_progress' if progress > 0 else 'not_started'
-    
-    cursor.execute('''
-        UPDATE learning_paths 
-        SET progress = ?, status = ?, last_accessed = ?
-        WHERE id = ? AND user_id = ?
-    ''', (progress, status, datetime.now().isoformat(), path_id, user_id))
-    
-    conn.commit()
-    conn.close()
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+
+        status = 'completed' if progress >= 100 else 'in_progress' if progress > 0 else 'not_started'
+
+        cursor.execute('''
+            UPDATE learning_paths 
+            SET progress = ?, status = ?, last_accessed = ?
+            WHERE id = ? AND user_id = ?
+        ''', (progress, status, datetime.now().isoformat(), path_id, user_id))
+
+        conn.commit()
 
 def log_activity(user_id: str, activity_type: str, title: str, description: str):
-    """Log user activity"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO activity_logs (id, user_id, type, title, description)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (str(int(datetime.now().timestamp())), user_id, activity_type, title, description))
-    
-    conn.commit()
-    conn.close()
+    """Queue a user activity for the next batched insert"""
+    activity_sink.submit(write_activities, (
+        new_id(), user_id, activity_type, title, description,
+        datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    ))
+
+def write_activities(activities: List[tuple]):
+    """Insert a batch of queued activities in a single transaction"""
+    with get_pool().connection() as conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO activity_logs (id, user_id, type, title, description, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', activities)
+
+        conn.commit()
 
 def get_user_activities(user_id: str, limit: int = 10):
     """Get recent activities for a user"""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT * FROM activity_logs WHERE user_id = ? 
-        ORDER BY timestamp DESC LIMIT ?
-    ''', (user_id, limit))
-    
-    activities = []
-    for row in cursor.fetchall():
-        activity = {
-            'id': row[0],
-            'type': row[2],
-            'title': row[3],
-            'description': row[4],
-            'timestamp': row[5]
-        }
-        activities.append(activity)
-    
-    conn.close()
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute(USER_ACTIVITIES_QUERY, (user_id, limit))
+
+        activities = []
+        for row in cursor.fetchall():
+            activity = {
+                'id': row['id'],
+                'type': row['type'],
+                'title': row['title'],
+                'description': row['description'],
+                'timestamp': row['timestamp']
+            }
+            activities.append(activity)
+
     return activities
 
 # Initialize database when module is imported
@@ -0,0 +1,133 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+
+# Resource fields that can be filtered on and counted
+FACET_FIELDS = ('category', 'level', 'language', 'provider')
+
+def bitset_from(docs: Iterable[int], size: int) -> int:
+    """Bitset with the given document bits set"""
+    flags = bytearray((size + 7) // 8)
+    for doc in docs:
+        flags[doc >> 3] |= 1 << (doc & 7)
+    return int.from_bytes(flags, 'little')
+
+def bitset_docs(bits: int) -> Iterator[int]:
+    """Document numbers set in a bitset, ascending"""
+    # Reversed binary digits put document 0 first; find() skips runs of zeros in C
+    digits = bin(bits)[:1:-1]
+    doc = digits.find('1')
+    while doc != -1:
+        yield doc
+        doc = digits.find('1', doc + 1)
+
+def bitset_test(bits: int) -> Callable[[int], bool]:
+    """Constant-time membership test for a bitset"""
+    flags = bits.to_bytes((bits.bit_length() + 7) // 8 or 1, 'little')
+    size = len(flags) * 8
+
+    def test(doc: int) -> bool:
+        return doc < size and bool(flags[doc >> 3] >> (doc & 7) & 1)
+    return test
+
+class FacetIndex:
+    """Bitset of documents per facet value, with Python ints as the bitsets.
+
+    Filtering is an AND of value bitsets, and counting a facet value within
+    a result set is a popcount of their intersection. Documents are numbered
+    by catalog position; extended() returns a new index with documents
+    appended and leaves this one unchanged. to_arrays() and from_arrays()
+    store an index and load it back.
+    """
+
+    def __init__(self, fields: Iterable[str] = FACET_FIELDS):
+        self.fields = tuple(fields)
+        self.doc_count = 0
+        self.bitmaps: Dict[str, Dict[str, int]] = {field: {} for field in self.fields}
+        self.all_docs = 0
+
+    @classmethod
+    def build(cls, resources: Iterable[Dict], fields: Iterable[str] = FACET_FIELDS) -> "FacetIndex":
+        index = cls(fields)
+        index._add(list(resources))
+        return index
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The index as flat arrays, for storing; from_arrays() loads them back"""
+        width = (self.doc_count + 7) // 8
+        arrays = {'doc_count': np.array([self.doc_count], dtype=np.int64)}
+        for field in self.fields:
+            values = list(self.bitmaps[field])
+            # Facet values are stored CSV text, which never contains NUL
+            arrays[f'{field}.values'] = np.frombuffer('\x00'.join(values).encode('utf-8'), dtype=np.uint8)
+            arrays[f'{field}.count'] = np.array([len(values)], dtype=np.int64)
+            arrays[f'{field}.bits'] = np.frombuffer(
+                b''.join(self.bitmaps[field][value].to_bytes(width, 'little') for value in values), dtype=np.uint8)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray], fields: Iterable[str] = FACET_FIELDS) -> "FacetIndex":
+        """Index stored with to_arrays()"""
+        index = cls(fields)
+        index.doc_count = int(arrays['doc_count'][0])
+        width = (index.doc_count + 7) // 8
+        for field in index.fields:
+            count = int(arrays[f'{field}.count'][0])
+            values = arrays[f'{field}.values'].tobytes().decode('utf-8').split('\x00') if count else []
+            bits = arrays[f'{field}.bits'].tobytes()
+            index.bitmaps[field] = {
+                value: int.from_bytes(bits[position * width:(position + 1) * width], 'little')
+                for position, value in enumerate(values)
+            }
+        index.all_docs = (1 << index.doc_count) - 1
+        return index
+
+    def _add(self, resources: List[Dict]):
+        start = self.doc_count
+        self.doc_count += len(resources)
+        size = self.doc_count
+        for field in self.fields:
+            positions: Dict[str, List[int]] = {}
+            for offset, resource in enumerate(resources):
+                positions.setdefault(resource.get(field, ''), []).append(start + offset)
+            bitmaps = self.bitmaps[field]
+            for value, docs in positions.items():
+                bitmaps[value] = bitmaps.get(value, 0) | bitset_from(docs, size)
+        self.all_docs = (1 << self.doc_count) - 1
+
+    def extended(self, resources: Iterable[Dict]) -> "FacetIndex":
+        """New index with resources appended"""
+        index = FacetIndex(self.fields)
+        index.doc_count = self.doc_count
+        index.bitmaps = {field: dict(bitmaps) for field, bitmaps in self.bitmaps.items()}
+        index.all_docs = self.all_docs
+        index._add(list(resources))
+        return index
+
+    def values(self, field: str) -> List[str]:
+        return sorted(value for value, bits in self.bitmaps.get(field, {}).items() if bits)
+
+    def filter(self, filters: Dict[str, str], exclude: Optional[str] = None) -> int:
+        """Bitset of documents matching every non-empty filter (except the excluded field)"""
+        bits = self.all_docs
+        for field, value in filters.items():
+            if value and field != exclude:
+                bits &= self.bitmaps.get(field, {}).get(value, 0)
+        return bits
+
+    def counts(self, matches: int, filters: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+        """Per-facet value counts within matches.
+
+        Each facet is counted with the other facets' filters applied but not
+        its own, so a sidebar can show how many results every alternative
+        value would give.
+        """
+        counts = {}
+        for field in self.fields:
+            base = matches & self.filter(filters, exclude=field)
+            field_counts = {}
+            for value, bits in self.bitmaps[field].items():
+                count = (base & bits).bit_count()
+                if count:
+                    field_counts[value] = count
+            counts[field] = dict(sorted(field_counts.items(), key=lambda item: (-item[1], item[0])))
+        return counts
@@ -1,4 +1,5 @@
 
+import asyncio
 import os
 import json
 import re
@@ -7,7 +8,7 @@ from datetime import datetime, timedelta
 import email
 from email.mime.text import MIMEText
 import base64
-import csv
+from repository import Entity, get_repository
 try:
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
@@ -17,26 +18,26 @@ try:
 except ImportError:
     print("Google API libraries not installed. Using mock data for demo.")
 
+TRACKED_APPLICATION_ENTITY = Entity(
+    "tracked_applications", "data/tracked_applications.csv",
+    ['id', 'user_id', 'title', 'company', 'platform', 'type', 'status',
+     'applied_date', 'last_updated', 'email_subject', 'location', 'salary',
+     'deadline', 'description', 'application_url', 'email_id'],
+    indexes=['user_id']
+)
+
 class GmailApplicationTracker:
     def __init__(self):
         self.scopes = ['https://www.googleapis.com/auth/gmail.readonly']
         self.credentials_file = "data/gmail_credentials.json"
         self.token_file = "data/gmail_token.json"
-        self.applications_file = "data/tracked_applications.csv"
+        self.applications_file = TRACKED_APPLICATION_ENTITY.csv_file
         self.init_files()
 
     def init_files(self):
         """Initialize required files"""
         os.makedirs("data", exist_ok=True)
-        
-        if not os.path.exists(self.applications_file):
-            with open(self.applications_file, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    'id', 'user_id', 'title', 'company', 'platform', 'type', 'status',
-                    'applied_date', 'last_updated', 'email_subject', 'location', 'salary',
-                    'deadline', 'description', 'application_url', 'email_id'
-                ])
+        self.applications = get_repository(TRACKED_APPLICATION_ENTITY)
 
     def get_authorization_url(self, user_id: str) -> str:
         """Generate OAuth authorization URL"""
@@ -368,30 +369,8 @@ class GmailApplicationTracker:
             return
         
         try:
-            # Read existing applications
-            existing_apps = []
-            if os.path.exists(self.applications_file):
-                with open(self.applications_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    existing_apps = list(reader)
-            
-            # Merge with new applications (avoid duplicates)
-            existing_ids = {app['id'] for app in existing_apps}
-            new_apps = [app for app in applications if app['id'] not in existing_ids]
-            
-            all_apps = existing_apps + new_apps
-            
-            # Write back to file
-            if all_apps:
-                with open(self.applications_file, 'w', newline='', encoding='utf-8') as file:
-                    fieldnames = [
-                        'id', 'user_id', 'title', 'company', 'platform', 'type', 'status',
-                        'applied_date', 'last_updated', 'email_subject', 'location', 'salary',
-                        'deadline', 'description', 'application_url', 'email_id'
-                    ]
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-                    writer.writerows(all_apps)
+            # Store new applications (avoid duplicates)
+            self.applications.add_many(applications)
             
         except Exception as e:
             print(f"Error saving applications: {e}")
@@ -400,12 +379,7 @@ class GmailApplicationTracker:
         """Get all applications for a user"""
         applications = []
         try:
-            if not os.path.exists(self.applications_file):
-                return applications
-            
-            with open(self.applications_file, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                applications = [row for row in reader if row['user_id'] == user_id]
+            applications = self.applications.scan_by('user_id', user_id)
             
         except Exception as e:
             print(f"Error reading applications: {e}")
@@ -446,8 +420,9 @@ class GmailApplicationTracker:
                 # Return mock data for demo purposes
                 return self.get_mock_applications(user_id)
             
-            # Scan emails for applications
-            applications = self.scan_emails_for_applications(user_id, days_back=60)
+            # Scan emails for applications; this waits on the Gmail API, so it runs on
+            # its own thread rather than holding one of the storage executor's workers
+            applications = await asyncio.to_thread(self.scan_emails_for_applications, user_id, days_back=60)
             return applications
         except Exception as e:
             print(f"Error syncing applications for user {user_id}: {e}")
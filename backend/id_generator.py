@@ -0,0 +1,68 @@
+import os
+import threading
+import time
+
+# Crockford base32: no I, L, O or U, so ids survive being read aloud or retyped
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+class IdGenerator:
+    """Monotonic, time-ordered 128-bit ids in the ULID layout.
+
+    An id is a 48-bit millisecond timestamp followed by 80 random bits,
+    encoded as 26 Crockford base32 characters, so ids sort by creation time
+    both as integers and as strings. Ids made within the same millisecond
+    increment the random part instead of drawing a new one, which keeps them
+    strictly increasing in this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new_int(self) -> int:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms <= self._last_ms:
+                # Same millisecond, or the clock stepped back: stay ahead of the last id
+                now_ms = self._last_ms
+                self._last_random += 1
+                if self._last_random > _RANDOM_MAX:
+                    now_ms += 1
+                    self._last_random = int.from_bytes(os.urandom(10), 'big') >> 1
+            else:
+                # Leave headroom below the maximum so same-millisecond increments rarely carry
+                self._last_random = int.from_bytes(os.urandom(10), 'big') >> 1
+            self._last_ms = now_ms
+            return (now_ms << _RANDOM_BITS) | self._last_random
+
+    def new_id(self) -> str:
+        return _encode(self.new_int())
+
+def id_timestamp_ms(id_value: str) -> int:
+    """Creation time of an id in milliseconds since the epoch"""
+    value = 0
+    for char in id_value[:10].upper():
+        value = (value << 5) | _ALPHABET.index(char)
+    return value  # The first 10 characters hold the 2 unused top bits and the timestamp
+
+def min_id_for(timestamp_ms: int) -> str:
+    """Smallest id that can be generated at timestamp_ms, for range scans"""
+    return _encode(timestamp_ms << _RANDOM_BITS)
+
+def is_generated_id(value: str) -> bool:
+    """True if value has the layout of ids made here (older records used other id formats)"""
+    return len(value) == 26 and value[0] <= '7' and all(char in _ALPHABET for char in value)
+
+# Global id generator
+id_generator = IdGenerator()
+new_id = id_generator.new_id
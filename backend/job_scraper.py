@@ -1,7 +1,7 @@
 import asyncio
 import aiohttp
 import json
-from typing import List, Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime, timedelta
 import re
 from bs4 import BeautifulSoup
@@ -12,10 +12,29 @@ import json
 import time
 from datetime import datetime, timedelta
 import random
+from trigram_index import FALLBACK_MIN_HITS, TrigramIndex
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _opportunities_in(all_data: Dict, category: str) -> List[Dict]:
+    """Opportunities of a category ("all", "jobs", "internships" or "hackathons")"""
+    opportunities = []
+    if category in ["all", "jobs"]:
+        opportunities.extend(all_data.get("jobs", []))
+    if category in ["all", "internships"]:
+        opportunities.extend(all_data.get("internships", []))
+    if category in ["all", "hackathons"]:
+        opportunities.extend(all_data.get("hackathons", []))
+    return opportunities
+
+def _titles_and_tags_index(opportunities: List[Dict]) -> TrigramIndex:
+    """Trigram index over opportunity titles and tags, for correcting misspelled queries"""
+    return TrigramIndex.build(
+        text for opportunity in opportunities
+        for text in [opportunity.get("title", ""), *opportunity.get("tags", [])]
+    )
+
 class JobScrapingService:
     def __init__(self):
         self.session = None
@@ -333,30 +352,48 @@ class JobScrapingService:
             ]
         }
 
+    def _filter_opportunities(self, opportunities: List[Dict], query_lower: str) -> List[Dict]:
+        """Opportunities containing the query in their title, company, tags or description"""
+        filtered = []
+        for opportunity in opportunities:
+            if (query_lower in opportunity.get("title", "").lower() or
+                query_lower in opportunity.get("company", "").lower() or
+                query_lower in " ".join(opportunity.get("tags", [])).lower() or
+                query_lower in opportunity.get("description", "").lower()):
+                filtered.append(opportunity)
+        return filtered
+
     async def search_opportunities(self, query: str, category: str = "all") -> List[Dict]:
         """Search opportunities by query and category"""
         try:
-            all_data = await self.fetch_all_opportunities()
-
-            # Combine all opportunities
-            all_opportunities = []
-            if category in ["all", "jobs"]:
-                all_opportunities.extend(all_data["jobs"])
-            if category in ["all", "internships"]:
-                all_opportunities.extend(all_data["internships"])
-            if category in ["all", "hackathons"]:
-                all_opportunities.extend(all_data["hackathons"])
+            # Search the periodically refreshed opportunities when there are any
+            all_data = opportunity_cache.get("live_opportunities")
+            cached = all_data is not None
+            if not cached:
+                all_data = await self.fetch_all_opportunities()
+            all_opportunities = _opportunities_in(all_data, category)
 
             # Filter by query
-            query_lower = query.lower()
-            filtered = []
-
-            for opportunity in all_opportunities:
-                if (query_lower in opportunity.get("title", "").lower() or
-                    query_lower in opportunity.get("company", "").lower() or
-                    query_lower in " ".join(opportunity.get("tags", [])).lower() or
-                    query_lower in opportunity.get("description", "").lower()):
-                    filtered.append(opportunity)
+            filtered = self._filter_opportunities(all_opportunities, query.lower())
+
+            if len(filtered) < FALLBACK_MIN_HITS:
+                # Too few matches: retry with misspelled words corrected against titles and tags
+                # Built once per cache refresh; freshly fetched data gets a one-off index
+                titles_and_tags = None
+                if cached:
+                    titles_and_tags = opportunity_cache.derive(
+                        "live_opportunities", f"titles_and_tags:{category}",
+                        lambda data: _titles_and_tags_index(_opportunities_in(data, category))
+                    )
+                if titles_and_tags is None:
+                    titles_and_tags = _titles_and_tags_index(all_opportunities)
+                corrected = titles_and_tags.correct(query)
+                if corrected:
+                    seen = {id(opportunity) for opportunity in filtered}
+                    filtered.extend(
+                        opportunity for opportunity in self._filter_opportunities(all_opportunities, corrected)
+                        if id(opportunity) not in seen
+                    )
 
             return filtered[:20]  # Limit results
 
@@ -372,7 +409,7 @@ class OpportunityCache:
 
     def get(self, key: str) -> Optional[Dict]:
         if key in self.cache:
-            data, timestamp = self.cache[key]
+            data, timestamp, _ = self.cache[key]
             if datetime.now() - timestamp < self.cache_duration:
                 return data
             else:
@@ -380,7 +417,18 @@ class OpportunityCache:
         return None
 
     def set(self, key: str, data: Dict):
-        self.cache[key] = (data, datetime.now())
+        # Structures derived from the previous data are dropped with it
+        self.cache[key] = (data, datetime.now(), {})
+
+    def derive(self, key: str, name: str, build: Callable[[Dict], Any]) -> Optional[Any]:
+        """Build (once per cached value) and return a structure computed from the data at key"""
+        data = self.get(key)
+        if data is None:
+            return None
+        derived = self.cache[key][2]
+        if name not in derived:
+            derived[name] = build(data)
+        return derived[name]
 
     def clear(self):
         self.cache.clear()
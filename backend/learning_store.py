@@ -0,0 +1,407 @@
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from repository import Entity, Repository, get_repository
+from order_keys import key_between, keys_between
+
+LEARNING_FOLDERS_CSV = "data/learning_folders.csv"
+LEARNING_PATH_ITEMS_CSV = "data/learning_path_items.csv"
+LEARNING_FOLDER_STATS_CSV = "data/learning_folder_stats.csv"
+
+FOLDER_ENTITY = Entity(
+    "learning_folders", LEARNING_FOLDERS_CSV,
+    ['id', 'user_id', 'name', 'description', 'color', 'created_at'],
+    indexes=['user_id']
+)
+
+ITEM_ENTITY = Entity(
+    "learning_path_items", LEARNING_PATH_ITEMS_CSV,
+    ['id', 'folder_id', 'user_id', 'title', 'description', 'completed',
+     'resources', 'estimated_hours', 'order_index', 'created_at', 'order_key'],
+    indexes=['folder_id', 'user_id'],
+    append_updates=True
+)
+
+# Item counts per folder, kept in step with item writes so listing folders
+# does not have to read any items
+FOLDER_STATS_ENTITY = Entity(
+    "learning_folder_stats", LEARNING_FOLDER_STATS_CSV,
+    ['folder_id', 'user_id', 'total_items', 'completed_items'],
+    key=('folder_id',),
+    indexes=['user_id'],
+    append_updates=True
+)
+
+def folder_progress(stats: Optional[Dict]) -> Dict:
+    """Progress fields of a folder from its stats row"""
+    total_items = int(stats['total_items']) if stats else 0
+    completed_items = int(stats['completed_items']) if stats else 0
+    progress = (completed_items / total_items * 100) if total_items > 0 else 0
+    return {
+        "progress": int(progress),
+        "total_items": total_items,
+        "completed_items": completed_items
+    }
+
+def encode_cursor(order_key: str, item_id: str) -> str:
+    """Opaque page cursor pointing just past the given item"""
+    data = json.dumps([order_key, item_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value = json.loads(data)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not (isinstance(value, list) and len(value) == 2 and all(isinstance(part, str) for part in value)):
+        raise ValueError("Invalid cursor")
+    return value[0], value[1]
+
+def _position(order: List[Tuple[str, str]], order_key: str, item_id: str) -> Optional[int]:
+    """Index of (order_key, item_id) in a sorted folder order, or None if it is not there"""
+    position = bisect_left(order, (order_key, item_id))
+    if position < len(order) and order[position] == (order_key, item_id):
+        return position
+    return None
+
+def _kept_positions(keys: List[str]) -> Set[int]:
+    """Positions of a longest increasing run of keys: the items a reorder can leave in place"""
+    tails: List[int] = []  # tails[n]: position ending the best increasing run of length n + 1
+    tail_keys: List[str] = []
+    previous = [-1] * len(keys)
+    for position, key in enumerate(keys):
+        length = bisect_left(tail_keys, key)
+        if length > 0:
+            previous[position] = tails[length - 1]
+        if length == len(tails):
+            tails.append(position)
+            tail_keys.append(key)
+        else:
+            tails[length] = position
+            tail_keys[length] = key
+
+    kept = set()
+    position = tails[-1] if tails else -1
+    while position != -1:
+        kept.add(position)
+        position = previous[position]
+    return kept
+
+class LearningStore:
+    """Learning folders and their items, with materialized per-folder progress.
+
+    Items are ordered within a folder by a fractional order key, so adding or
+    moving an item writes only that item. Each folder's (order_key, item_id)
+    pairs are cached in sorted order, which lets reads skip sorting.
+    """
+
+    def __init__(self, folders: Optional[Repository] = None, items: Optional[Repository] = None,
+                 folder_stats: Optional[Repository] = None):
+        self.folders = folders or get_repository(FOLDER_ENTITY)
+        self.items = items or get_repository(ITEM_ENTITY)
+        self.folder_stats = folder_stats or get_repository(FOLDER_STATS_ENTITY)
+        self._lock = threading.RLock()  # Serializes item writes with their stats updates
+        self._stats_ready = False
+        self._order: Dict[str, List[Tuple[str, str]]] = {}
+        self._order_generation = None
+
+    def _ensure_stats(self):
+        """Build the stats table on first use if items exist without it"""
+        if self._stats_ready:
+            return
+        with self._lock:
+            if not self._stats_ready:
+                if self.folder_stats.count() == 0 and self.items.count() > 0:
+                    self.rebuild_stats()
+                self._stats_ready = True
+
+    def rebuild_stats(self):
+        """Recompute every folder's counters in one pass over the items"""
+        with self._lock:
+            totals = Counter()
+            completed = Counter()
+            for item in self.items.scan():
+                totals[item['folder_id']] += 1
+                if item['completed'] == 'True':
+                    completed[item['folder_id']] += 1
+
+            owners = {folder['id']: folder['user_id'] for folder in self.folders.scan()}
+            with self.folder_stats.batch():
+                for folder_id in set(owners) | set(totals):
+                    self.folder_stats.put({
+                        'folder_id': folder_id,
+                        'user_id': owners.get(folder_id, ''),
+                        'total_items': totals[folder_id],
+                        'completed_items': completed[folder_id]
+                    })
+
+    def _adjust_stats(self, folder_id: str, user_id: str, total_delta: int = 0, completed_delta: int = 0) -> Dict:
+        """Apply item count changes to a folder's stats row; caller holds the lock"""
+        stats = self.folder_stats.get(folder_id)
+        total_items = (int(stats['total_items']) if stats else 0) + total_delta
+        completed_items = (int(stats['completed_items']) if stats else 0) + completed_delta
+        return self.folder_stats.put({
+            'folder_id': folder_id,
+            'user_id': stats['user_id'] if stats and stats['user_id'] else user_id,
+            'total_items': max(total_items, 0),
+            'completed_items': min(max(completed_items, 0), max(total_items, 0))
+        })
+
+    def list_folders(self, user_id: str) -> List[Dict]:
+        """A user's folders with their progress, without reading items"""
+        self._ensure_stats()
+        folders = []
+        for folder in self.folders.scan_by('user_id', user_id):
+            folders.append({
+                "id": folder['id'],
+                "name": folder['name'],
+                "description": folder['description'],
+                "color": folder['color'],
+                **folder_progress(self.folder_stats.get(folder['id'])),
+                "created_at": folder['created_at']
+            })
+        return folders
+
+    def create_folder(self, folder_id: str, user_id: str, name: str, description: str, color: str) -> Dict:
+        """Store a new, empty folder"""
+        self._ensure_stats()
+        with self._lock:
+            folder = self.folders.put({
+                'id': folder_id,
+                'user_id': user_id,
+                'name': name,
+                'description': description,
+                'color': color,
+                'created_at': datetime.utcnow().isoformat()
+            })
+            self._adjust_stats(folder_id, user_id)
+        return folder
+
+    def _folder_order(self, folder_id: str) -> List[Tuple[str, str]]:
+        """Sorted (order_key, item_id) pairs of a folder; caller holds the lock"""
+        generation = self.items.generation()
+        if generation != self._order_generation:
+            # Items were reloaded after an outside write
+            self._order = {}
+            self._order_generation = generation
+
+        order = self._order.get(folder_id)
+        if order is None:
+            order = self._order[folder_id] = self._build_order(folder_id)
+        return order
+
+    def _checked_order(self, folder_id: str, item_ids: List[str]) -> List[Tuple[str, str]]:
+        """A folder's order, read again from its items if the cache lacks any of item_ids; caller holds the lock"""
+        order = self._folder_order(folder_id)
+        for item_id in item_ids:
+            item = self.items.get(item_id)
+            if item is not None and _position(order, item['order_key'], item_id) is None:
+                # Missed write or an item without a key yet
+                order = self._order[folder_id] = self._build_order(folder_id)
+                break
+        return order
+
+    def _build_order(self, folder_id: str) -> List[Tuple[str, str]]:
+        """Read a folder's order from its items, giving keys to items stored before order keys"""
+        folder_items = self.items.scan_by('folder_id', folder_id)
+        order = sorted((item['order_key'], item['id']) for item in folder_items if item['order_key'])
+
+        unkeyed = [item for item in folder_items if not item['order_key']]
+        if unkeyed:
+            unkeyed.sort(key=lambda x: int(x.get('order_index') or 0))
+            keys = keys_between(order[-1][0] if order else None, None, len(unkeyed))
+            with self.items.batch():
+                for item, key in zip(unkeyed, keys):
+                    self.items.update(item['id'], order_key=key)
+                    order.append((key, item['id']))
+        return order
+
+    def folder_items(self, user_id: str, folder_id: str) -> List[Dict]:
+        """A user's items in a folder, in order; order_index is the 1-based position"""
+        with self._lock:
+            folder_items = []
+            for _, item_id in self._folder_order(folder_id):
+                item = self.items.get(item_id)
+                if item is not None and item['user_id'] == user_id:
+                    item['order_index'] = str(len(folder_items) + 1)
+                    folder_items.append(item)
+        return folder_items
+
+    def get_item(self, user_id: str, item_id: str) -> Optional[Dict]:
+        """Look up an item by id, only if it belongs to the user"""
+        item = self.items.get(item_id)
+        if item is None or item['user_id'] != user_id:
+            return None
+        return item
+
+    def update_item(self, user_id: str, item_id: str, **fields) -> Optional[Dict]:
+        """Change fields of one of the user's items, keeping folder counters in step"""
+        self._ensure_stats()
+        with self._lock:
+            item = self.get_item(user_id, item_id)
+            if item is None:
+                return None
+
+            updated = self.items.update(item_id, **fields)
+            was_completed = item['completed'] == 'True'
+            is_completed = updated['completed'] == 'True'
+            if was_completed != is_completed:
+                self._adjust_stats(item['folder_id'], user_id, completed_delta=1 if is_completed else -1)
+        return updated
+
+    def toggle_item(self, user_id: str, item_id: str) -> Optional[Dict]:
+        """Flip an item's completed flag and return the folder's new progress"""
+        with self._lock:
+            item = self.get_item(user_id, item_id)
+            if item is None:
+                return None
+
+            completed = item['completed'] != 'True'
+            self.update_item(user_id, item_id, completed='True' if completed else 'False')
+            stats = self.folder_stats.get(item['folder_id'])
+        return {"item_id": item_id, "folder_id": item['folder_id'], "completed": completed, **folder_progress(stats)}
+
+    def folder_items_page(self, user_id: str, folder_id: str, limit: int,
+                          cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """One page of a folder's items after cursor, and the cursor of the next page"""
+        with self._lock:
+            order = self._folder_order(folder_id)
+            start = bisect_right(order, decode_cursor(cursor)) if cursor else 0
+
+            # One item past the page tells whether a next page exists
+            folder_items = []
+            cursors = []
+            position = start
+            while position < len(order) and len(folder_items) <= limit:
+                item = self.items.get(order[position][1])
+                position += 1
+                if item is not None and item['user_id'] == user_id:
+                    item['order_index'] = str(position)
+                    folder_items.append(item)
+                    cursors.append(order[position - 1])
+
+            next_cursor = None
+            if len(folder_items) > limit:
+                folder_items = folder_items[:limit]
+                next_cursor = encode_cursor(*cursors[limit - 1])
+        return folder_items, next_cursor
+
+    def add_items(self, user_id: str, folder_id: str, items: List[Dict]) -> List[Dict]:
+        """Append items to the end of a folder"""
+        self._ensure_stats()
+        with self._lock:
+            order = self._folder_order(folder_id)
+            keys = keys_between(order[-1][0] if order else None, None, len(items))
+
+            new_items = []
+            for i, item in enumerate(items):
+                new_items.append({
+                    **item,
+                    'folder_id': folder_id,
+                    'user_id': user_id,
+                    'completed': item.get('completed', 'False'),
+                    'order_index': str(len(order) + i + 1),
+                    'order_key': keys[i],
+                    'created_at': item.get('created_at') or datetime.utcnow().isoformat()
+                })
+
+            added = self.items.add_many(new_items)
+            # New keys all sort after the folder's last key, so appending keeps the order sorted
+            order.extend((item['order_key'], item['id']) for item in added)
+            completed = len([item for item in added if item['completed'] == 'True'])
+            self._adjust_stats(folder_id, user_id, total_delta=len(added), completed_delta=completed)
+        return added
+
+    def move_item(self, user_id: str, folder_id: str, item_id: str, after_id: Optional[str] = None,
+                  to_folder_id: Optional[str] = None) -> Optional[Dict]:
+        """Place an item right after another one (or first), optionally in another of the user's folders.
+
+        Only the moved item is written, plus both folders' counters when it
+        changes folder.
+        """
+        self._ensure_stats()
+        with self._lock:
+            item = self.get_item(user_id, item_id)
+            if item is None or item['folder_id'] != folder_id:
+                return None
+            target_id = to_folder_id or folder_id
+            if target_id != folder_id:
+                target_folder = self.folders.get(target_id)
+                if target_folder is None or target_folder['user_id'] != user_id:
+                    raise ValueError("to_folder_id must be another of the user's folders")
+            after = self.get_item(user_id, after_id) if after_id is not None else None
+            if after_id is not None and (after is None or after['folder_id'] != target_id or after_id == item_id):
+                raise ValueError("after_id must be another item in the target folder")
+
+            anchors = [after_id] if after is not None else []
+            if target_id == folder_id:
+                source = target = self._checked_order(folder_id, [item_id] + anchors)
+            else:
+                source = self._checked_order(folder_id, [item_id])
+                target = self._checked_order(target_id, anchors)
+
+            item = self.items.get(item_id)  # Building the order may have just given it a key
+            del source[_position(source, item['order_key'], item_id)]
+            if after is None:
+                position = 0
+            else:
+                after = self.items.get(after_id)
+                position = _position(target, after['order_key'], after_id) + 1
+
+            before_key = target[position - 1][0] if position > 0 else None
+            after_key = target[position][0] if position < len(target) else None
+            key = key_between(before_key, after_key)
+            target.insert(position, (key, item_id))
+            if target_id == folder_id:
+                return self.items.update(item_id, order_key=key)
+
+            updated = self.items.update(item_id, folder_id=target_id, order_key=key)
+            completed = 1 if updated['completed'] == 'True' else 0
+            self._adjust_stats(folder_id, user_id, total_delta=-1, completed_delta=-completed)
+            self._adjust_stats(target_id, user_id, total_delta=1, completed_delta=completed)
+            return updated
+
+    def reorder_items(self, user_id: str, folder_id: str, item_ids: List[str]) -> int:
+        """Put a folder's items in the given order, rewriting as few order keys as possible"""
+        with self._lock:
+            order = self._folder_order(folder_id)
+            current = {item_id: key for key, item_id in order}
+            if len(item_ids) != len(current) or set(item_ids) != set(current):
+                raise ValueError("item_ids must list every item in the folder exactly once")
+            if any(self.get_item(user_id, item_id) is None for item_id in item_ids):
+                raise ValueError("Folder items do not belong to this user")
+
+            # Items on a longest already-increasing run keep their keys; the
+            # rest get new keys between their kept neighbours
+            keys = [current[item_id] for item_id in item_ids]
+            kept = _kept_positions(keys)
+            new_keys = list(keys)
+            position = 0
+            while position < len(item_ids):
+                if position in kept:
+                    position += 1
+                    continue
+                end = position
+                while end < len(item_ids) and end not in kept:
+                    end += 1
+                before_key = new_keys[position - 1] if position > 0 else None
+                after_key = keys[end] if end < len(item_ids) else None
+                new_keys[position:end] = keys_between(before_key, after_key, end - position)
+                position = end
+
+            changed = 0
+            with self.items.batch():
+                for item_id, key in zip(item_ids, new_keys):
+                    if key != current[item_id]:
+                        self.items.update(item_id, order_key=key)
+                        changed += 1
+            order[:] = list(zip(new_keys, item_ids))
+            return changed
+
+# Global learning store
+learning_store = LearningStore()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
@@ -7,14 +7,22 @@ import csv
 import os
 import hashlib
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import uuid
 import asyncio
 from ai_service import AIService
 from websocket_service import socket_app, send_notification, broadcast_job_update, broadcast_candidate_update, update_market_insights
-from user_activity import log_user_activity, get_user_activities, get_user_applications
+from user_activity import log_user_activity, get_user_activities, get_user_applications, APPLICATION_ENTITY
 from free_resources_service import FreeResourcesService
 from gmail_service import GmailApplicationTracker
+from user_store import user_store
+from token_cache import token_cache
+from repository import get_repository
+from learning_store import learning_store
+from async_storage import AsyncRepository, run_storage, shutdown_storage
+from activity_sink import activity_sink
+from bookmark_store import bookmark_store
+from id_generator import new_id
 import database
 
 # Set YouTube API key
@@ -97,7 +105,6 @@ init_csv_files()
 # Initialize services
 free_resources_service = FreeResourcesService()
 ai_service = AIService()
-activity_tracker = UserActivityTracker()
 gmail_tracker = GmailApplicationTracker()
 
 # Start background tasks
@@ -112,6 +119,10 @@ async def shutdown_event():
     # Assuming task_manager is defined and initialized elsewhere (e.g., in ai_service.py)
     from ai_service import task_manager
     await task_manager.stop()
+    activity_sink.close()
+    bookmark_store.close()
+    free_resources_service.catalog.close()
+    shutdown_storage()
 
 # Pydantic models
 class UserSignup(BaseModel):
@@ -151,51 +162,43 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+
+    # Tokens verified earlier skip signature checks and the user lookup;
+    # a reload of the user store invalidates them via its generation
+    user_store.refresh()
+    cached = token_cache.get(token, user_store.generation)
+    if cached is not None:
+        return cached[1]
+
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
-        # Get user from CSV
-        with open(USERS_CSV, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row['email'] == email:
-                    return User(
-                        id=row['id'],
-                        email=row['email'],
-                        role=row['role'],
-                        profession=row['profession'],
-                        created_at=row['created_at']
-                    )
+        # Resolve user from the in-memory user index
+        user = user_store.get_by_email(email)
+        if user is not None:
+            current_user = User(
+                id=user['id'],
+                email=user['email'],
+                role=user['role'],
+                profession=user['profession'],
+                created_at=user['created_at']
+            )
+            token_cache.put(token, payload, current_user, user_store.generation)
+            return current_user
         raise HTTPException(status_code=401, detail="User not found")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
 
-# CSV helper functions
-def read_csv_data(file_path: str) -> List[dict]:
-    data = []
-    if os.path.exists(file_path):
-        with open(file_path, 'r') as file:
-            reader = csv.DictReader(file)
-            data = list(reader)
-    return data
-
-def write_csv_data(file_path: str, data: List[dict], fieldnames: List[str]):
-    with open(file_path, 'w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
-
 # Authentication endpoints
 @app.post("/auth/signup", response_model=Token)
 async def signup(user_data: UserSignup):
-    # Check if user already exists
-    users = read_csv_data(USERS_CSV)
-    for user in users:
-        if user['email'] == user_data.email:
-            raise HTTPException(status_code=400, detail="Email already registered")
+    # Cheap pre-check; create_user re-checks under the store's lock
+    if await run_storage(user_store.get_by_email, user_data.email) is not None:
+        raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create new user
     user_id = str(uuid.uuid4())
@@ -211,8 +214,8 @@ async def signup(user_data: UserSignup):
         'created_at': created_at
     }
 
-    users.append(new_user)
-    write_csv_data(USERS_CSV, users, ['id', 'email', 'password_hash', 'role', 'profession', 'created_at'])
+    if not await run_storage(user_store.create_user, new_user):
+        raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create access token
     access_token = create_access_token(data={"sub": user_data.email})
@@ -259,31 +262,30 @@ async def signup(user_data: UserSignup):
 
 @app.post("/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
-    users = read_csv_data(USERS_CSV)
+    user = await run_storage(user_store.get_by_email, user_data.email)
 
-    for user in users:
-        if user['email'] == user_data.email and verify_password(user_data.password, user['password_hash']):
-            access_token = create_access_token(data={"sub": user_data.email})
+    if user is not None and verify_password(user_data.password, user['password_hash']):
+        access_token = create_access_token(data={"sub": user_data.email})
 
-            user_response = User(
-                id=user['id'],
-                email=user['email'],
-                role=user['role'],
-                profession=user['profession'],
-                created_at=user['created_at']
-            )
+        user_response = User(
+            id=user['id'],
+            email=user['email'],
+            role=user['role'],
+            profession=user['profession'],
+            created_at=user['created_at']
+        )
 
-            # Send login notification via WebSocket
-            asyncio.create_task(send_notification(
-                user['id'],
-                "login_success",
-                {
-                    "message": f"Welcome back! You logged in at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}",
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            ))
+        # Send login notification via WebSocket
+        asyncio.create_task(send_notification(
+            user['id'],
+            "login_success",
+            {
+                "message": f"Welcome back! You logged in at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')}",
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        ))
 
-            return Token(access_token=access_token, token_type="bearer", user=user_response)
+        return Token(access_token=access_token, token_type="bearer", user=user_response)
 
     raise HTTPException(status_code=401, detail="Invalid email or password")
 
@@ -291,6 +293,22 @@ async def login(user_data: UserLogin):
 async def verify_token(current_user: User = Depends(get_current_user)):
     return current_user
 
+@app.get("/auth/token-cache/stats")
+async def get_token_cache_stats(current_user: User = Depends(get_current_user)):
+    return token_cache.stats()
+
+@app.get("/database/pool-stats")
+async def get_database_pool_stats(current_user: User = Depends(get_current_user)):
+    return {"pools": database.get_pool_stats()}
+
+@app.get("/activity/sink-stats")
+async def get_activity_sink_stats(current_user: User = Depends(get_current_user)):
+    return activity_sink.stats()
+
+@app.get("/learning/bookmark-stats")
+async def get_bookmark_store_stats(current_user: User = Depends(get_current_user)):
+    return bookmark_store.stats()
+
 # File upload models
 from fastapi import UploadFile, File
 
@@ -590,77 +608,41 @@ class AddToPathRequest(BaseModel):
     folder_id: str
     generated_path: GeneratedLearningPath
 
-# Initialize learning folders CSV
-LEARNING_FOLDERS_CSV = "data/learning_folders.csv"
-LEARNING_PATH_ITEMS_CSV = "data/learning_path_items.csv"
+class ReorderItemsRequest(BaseModel):
+    item_ids: List[str]
 
-def init_learning_folders():
-    if not os.path.exists(LEARNING_FOLDERS_CSV):
-        with open(LEARNING_FOLDERS_CSV, 'w', newline='') as<edit_file>
-<path>backend/main.py</path>
-<content>
-<<<<<<< SEARCH
-# Learning endpoints
-@app.get("/learning/folders")
-async def get_learning_folders(current_user: User = Depends(get_current_user)):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
+class MoveItemRequest(BaseModel):
+    after_id: Optional[str] = None
+    folder_id: Optional[str] = None  # Move into this folder instead of within the current one
 
-    folders_data = read_csv_data(LEARNING_FOLDERS_CSV)
-    user_folders = [folder for folder in folders_data if folder['user_id'] == current_user.id]
-
-    folders_with_items = []
-    for folder in user_folders:
-        items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-        folder_items = [item for item in items_data if item['folder_id'] == folder['id']]
-
-        # Calculate progress
-        total_items = len(folder_items)
-        completed_items = len([item for item in folder_items if item['completed'] == 'True'])
-        progress = (completed_items / total_items * 100) if total_items > 0 else 0
-
-        folders_with_items.append({
-            "id": folder['id'],
-            "name": folder['name'],
-            "description": folder['description'],
-            "color": folder['color'],
-            "progress": int(progress),
-            "total_items": total_items,
-            "completed_items": completed_items,
-            "created_at": folder['created_at']
-        })
+class ResourceProgressRequest(BaseModel):
+    progress: int
+
+class ProgressReport(BaseModel):
+    resource_id: str
+    progress: int
+    timestamp: Optional[datetime] = None
+
+class ProgressBatchRequest(BaseModel):
+    reports: List[ProgressReport]
+
+# Most progress reports accepted in one batch request
+MAX_PROGRESS_BATCH = 500
+
+# Page sizes for GET /learning/folders/{folder_id}/items
+DEFAULT_FOLDER_ITEMS_PAGE = 50
+MAX_FOLDER_ITEMS_PAGE = 200
+
+# Tracked application storage
+applications_store = AsyncRepository(get_repository(APPLICATION_ENTITY))
 
-    return {"folders": folders_with_items}
-=======
 # Learning endpoints
 @app.get("/learning/folders")
 async def get_learning_folders(current_user: User = Depends(get_current_user)):
     if current_user.role != "individual":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    folders_data = read_csv_data(LEARNING_FOLDERS_CSV)
-    user_folders = [folder for folder in folders_data if folder['user_id'] == current_user.id]
-
-    folders_with_items = []
-    for folder in user_folders:
-        items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-        folder_items = [item for item in items_data if item['folder_id'] == folder['id']]
-
-        # Calculate progress
-        total_items = len(folder_items)
-        completed_items = len([item for item in folder_items if item['completed'] == 'True'])
-        progress = (completed_items / total_items * 100) if total_items > 0 else 0
-
-        folders_with_items.append({
-            "id": folder['id'],
-            "name": folder['name'],
-            "description": folder['description'],
-            "color": folder['color'],
-            "progress": int(progress),
-            "total_items": total_items,
-            "completed_items": completed_items,
-            "created_at": folder['created_at']
-        })
+    folders_with_items = await run_storage(learning_store.list_folders, current_user.id)
 
     return {"folders": folders_with_items}
 
@@ -686,7 +668,7 @@ async def get_job_recommendations(current_user: User = Depends(get_current_user)
 
     # For demo, return top 5 jobs from database or mock data
     try:
-        jobs = database.get_user_job_recommendations(current_user.id)
+        jobs = await run_storage(database.get_user_job_recommendations, current_user.id)
         if not jobs:
             # Return mock data if no recommendations
             jobs = [
@@ -732,38 +714,6 @@ async def get_student_dashboard_stats(current_user: User = Depends(get_current_u
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to fetch dashboard stats")
 
-# Learning endpoints
-@app.get("/learning/folders")
-async def get_learning_folders(current_user: User = Depends(get_current_user)):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    folders_data = read_csv_data(LEARNING_FOLDERS_CSV)
-    user_folders = [folder for folder in folders_data if folder['user_id'] == current_user.id]
-
-    folders_with_items = []
-    for folder in user_folders:
-        items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-        folder_items = [item for item in items_data if item['folder_id'] == folder['id']]
-
-        # Calculate progress
-        total_items = len(folder_items)
-        completed_items = len([item for item in folder_items if item['completed'] == 'True'])
-        progress = (completed_items / total_items * 100) if total_items > 0 else 0
-
-        folders_with_items.append({
-            "id": folder['id'],
-            "name": folder['name'],
-            "description": folder['description'],
-            "color": folder['color'],
-            "progress": int(progress),
-            "total_items": total_items,
-            "completed_items": completed_items,
-            "created_at": folder['created_at']
-        })
-
-    return {"folders": folders_with_items}
-
 @app.post("/learning/folders")
 async def create_learning_folder(
     folder: LearningFolder,
@@ -773,36 +723,44 @@ async def create_learning_folder(
         raise HTTPException(status_code=403, detail="Access denied")
 
     folder_id = str(uuid.uuid4())
-    created_at = datetime.utcnow().isoformat()
 
-    folders_data = read_csv_data(LEARNING_FOLDERS_CSV)
-    folders_data.append({
-        'id': folder_id,
-        'user_id': current_user.id,
-        'name': folder.name,
-        'description': folder.description,
-        'color': folder.color,
-        'created_at': created_at
-    })
-
-    write_csv_data(LEARNING_FOLDERS_CSV, folders_data, 
-                  ['id', 'user_id', 'name', 'description', 'color', 'created_at'])
+    await run_storage(
+        learning_store.create_folder,
+        folder_id,
+        current_user.id,
+        folder.name,
+        folder.description,
+        folder.color
+    )
 
     return {"folder_id": folder_id, "message": "Folder created successfully"}
 
 @app.get("/learning/folders/{folder_id}/items")
 async def get_folder_items(
     folder_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_FOLDER_ITEMS_PAGE),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "individual":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-    folder_items = [item for item in items_data if item['folder_id'] == folder_id and item['user_id'] == current_user.id]
-
-    # Sort by order_index
-    folder_items.sort(key=lambda x: int(x.get('order_index', 0)))
+    # Without limit or cursor the whole folder is returned, as before
+    paginated = limit is not None or cursor is not None
+    next_cursor = None
+    if paginated:
+        try:
+            folder_items, next_cursor = await run_storage(
+                learning_store.folder_items_page,
+                current_user.id,
+                folder_id,
+                limit or DEFAULT_FOLDER_ITEMS_PAGE,
+                cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        folder_items = await run_storage(learning_store.folder_items, current_user.id, folder_id)
 
     formatted_items = []
     for item in folder_items:
@@ -816,6 +774,8 @@ async def get_folder_items(
             "order_index": int(item.get('order_index', 0))
         })
 
+    if paginated:
+        return {"items": formatted_items, "next_cursor": next_cursor}
     return {"items": formatted_items}
 
 @app.post("/learning/folders/{folder_id}/items/{item_id}/toggle")
@@ -827,18 +787,51 @@ async def toggle_item_completion(
     if current_user.role != "individual":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
+    progress = await run_storage(learning_store.toggle_item, current_user.id, item_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    # Push the folder's new progress to the user's other open sessions
+    asyncio.create_task(send_notification(current_user.id, "learning_progress", progress))
+
+    return {"message": "Item completion toggled", **progress}
+
+@app.post("/learning/folders/{folder_id}/items/reorder")
+async def reorder_folder_items(
+    folder_id: str,
+    request: ReorderItemsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    try:
+        items_updated = await run_storage(learning_store.reorder_items, current_user.id, folder_id, request.item_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    for item in items_data:
-        if item['id'] == item_id and item['user_id'] == current_user.id:
-            item['completed'] = 'False' if item['completed'] == 'True' else 'True'
-            break
+    return {"message": "Items reordered", "items_updated": items_updated}
 
-    write_csv_data(LEARNING_PATH_ITEMS_CSV, items_data,
-                  ['id', 'folder_id', 'user_id', 'title', 'description', 'completed', 
-                   'resources', 'estimated_hours', 'order_index', 'created_at'])
+@app.post("/learning/folders/{folder_id}/items/{item_id}/move")
+async def move_folder_item(
+    folder_id: str,
+    item_id: str,
+    request: MoveItemRequest,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    try:
+        item = await run_storage(
+            learning_store.move_item, current_user.id, folder_id, item_id, request.after_id, request.folder_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if item is None:
+        raise HTTPException(status_code=404, detail="Item not found")
 
-    return {"message": "Item completion toggled"}
+    return {"message": "Item moved"}
 
 @app.post("/ai/generate-learning-path")
 async def generate_learning_path(
@@ -931,34 +924,139 @@ async def add_generated_path_to_folder(
     if current_user.role != "individual":
         raise HTTPException(status_code=403, detail="Access denied")
 
-    items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-
-    # Get current max order_index for the folder
-    folder_items = [item for item in items_data if item['folder_id'] == request.folder_id]
-    max_order = max([int(item.get('order_index', 0)) for item in folder_items]) if folder_items else 0
-
-    # Add each item from the generated path
-    for i, item in enumerate(request.generated_path.items):
-        item_id = str(uuid.uuid4())
-        items_data.append({
-            'id': item_id,
-            'folder_id': request.folder_id,
-            'user_id': current_user.id,
-            'title':item.title,
+    # Add each item from the generated path after the folder's existing items
+    new_items = []
+    for item in request.generated_path.items:
+        new_items.append({
+            'id': str(uuid.uuid4()),
+            'title': item.title,
             'description': item.description,
-'completed': 'False',
             'resources': ','.join(item.resources),
-            'estimated_hours': str(item.estimated_hours),
-            'order_index': str(max_order + i + 1),
-            'created_at': datetime.utcnow().isoformat()
+            'estimated_hours': str(item.estimated_hours)
         })
 
-    write_csv_data(LEARNING_PATH_ITEMS_CSV, items_data,
-                  ['id', 'folder_id', 'user_id', 'title', 'description', 'completed', 
-                   'resources', 'estimated_hours', 'order_index', 'created_at'])
+    await run_storage(learning_store.add_items, current_user.id, request.folder_id, new_items)
 
     return {"message": "Learning path added successfully", "items_added": len(request.generated_path.items)}
 
+# Free resources endpoints
+@app.get("/learning/free-resources")
+async def get_free_resources(
+    search: str = "",
+    category: str = "",
+    level: str = "",
+    language: str = "",
+    provider: str = "",
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await run_storage(
+        free_resources_service.search_with_facets, search, category, level, language, provider, limit
+    )
+
+@app.get("/learning/free-resources/search")
+async def search_free_resources(
+    q: str,
+    category: str = "",
+    level: str = "",
+    language: str = "",
+    provider: str = "",
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return await run_storage(
+        free_resources_service.search_with_facets, q, category, level, language, provider, limit
+    )
+
+@app.get("/learning/free-resources/categories")
+async def get_free_resource_filters(current_user: User = Depends(get_current_user)):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    snapshot = await run_storage(free_resources_service.catalog.snapshot)
+    return {
+        "categories": list(snapshot.categories),
+        "levels": free_resources_service.get_levels(),
+        "languages": list(snapshot.languages)
+    }
+
+@app.get("/learning/free-resources/recommendations")
+async def get_free_resource_recommendations(current_user: User = Depends(get_current_user)):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    recommendations = await run_storage(
+        free_resources_service.get_recommended_resources, {"profession": current_user.profession}
+    )
+    return {"recommendations": recommendations}
+
+@app.get("/learning/free-resources/bookmarks")
+async def get_free_resource_bookmarks(current_user: User = Depends(get_current_user)):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    bookmarks = await run_storage(free_resources_service.get_user_bookmarks, current_user.id)
+    return {"bookmarks": bookmarks}
+
+@app.post("/learning/free-resources/{resource_id}/bookmark")
+async def bookmark_free_resource(
+    resource_id: str,
+    status: str = "bookmarked",
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    result = await run_storage(free_resources_service.bookmark_resource, current_user.id, resource_id, status)
+    if result['status'] == 'error':
+        raise HTTPException(status_code=500, detail=result['message'])
+    return result
+
+@app.post("/learning/free-resources/progress/batch")
+async def update_free_resource_progress_batch(
+    request: ProgressBatchRequest,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+    if len(request.reports) > MAX_PROGRESS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PROGRESS_BATCH} progress reports per request")
+
+    reports = []
+    for report in request.reports:
+        reported_at = None
+        if report.timestamp is not None:
+            timestamp = report.timestamp
+            if timestamp.tzinfo is not None:
+                timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+            reported_at = timestamp.isoformat()
+        reports.append((report.resource_id, report.progress, reported_at))
+
+    result = await run_storage(free_resources_service.update_progress_batch, current_user.id, reports)
+    if result['status'] == 'error':
+        raise HTTPException(status_code=500, detail=result['message'])
+    return result
+
+@app.post("/learning/free-resources/{resource_id}/progress")
+async def update_free_resource_progress(
+    resource_id: str,
+    request: ResourceProgressRequest,
+    current_user: User = Depends(get_current_user)
+):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    result = await run_storage(free_resources_service.update_progress, current_user.id, resource_id, request.progress)
+    if result['status'] == 'error':
+        raise HTTPException(status_code=500, detail=result['message'])
+    return result
+
 @app.get("/learning/paths")
 async def get_learning_paths(current_user: User = Depends(get_current_user)):
     if current_user.role != "individual":
@@ -966,7 +1064,7 @@ async def get_learning_paths(current_user: User = Depends(get_current_user)):
 
     # Get learning paths from database
     try:
-        learning_paths = database.get_user_learning_paths(current_user.id)
+        learning_paths = await run_storage(database.get_user_learning_paths, current_user.id)
 
         # If no paths exist, create some default ones
         if not learning_paths:
@@ -990,9 +1088,9 @@ async def get_learning_paths(current_user: User = Depends(get_current_user)):
             ]
 
             for path in default_paths:
-                database.add_learning_path(current_user.id, path)
+                await run_storage(database.add_learning_path, current_user.id, path)
 
-            learning_paths = database.get_user_learning_paths(current_user.id)
+            learning_paths = await run_storage(database.get_user_learning_paths, current_user.id)
 
         return {"paths": learning_paths}
     except Exception as e:
@@ -1022,7 +1120,7 @@ async def create_learning_path(
 
     try:
         # Add path to database
-        database.add_learning_path(current_user.id, path_data)
+        await run_storage(database.add_learning_path, current_user.id, path_data)
 
         # Log activity
         database.log_activity(
@@ -1036,232 +1134,6 @@ async def create_learning_path(
     except Exception as e:
         raise HTTPException(status_code=500, detail="Failed to create learning path")
 
-@app.get("/learning/folders")
-async def get_learning_folders(current_user: User = Depends(get_current_user)):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    folders_data = read_csv_data(LEARNING_FOLDERS_CSV)
-    user_folders = [folder for folder in folders_data if folder['user_id'] == current_user.id]
-
-    folders_with_items = []
-    for folder in user_folders:
-        items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-        folder_items = [item for item in items_data if item['folder_id'] == folder['id']]
-
-        # Calculate progress
-        total_items = len(folder_items)
-        completed_items = len([item for item in folder_items if item['completed'] == 'True'])
-        progress = (completed_items / total_items * 100) if total_items > 0 else 0
-
-        folders_with_items.append({
-            "id": folder['id'],
-            "name": folder['name'],
-            "description": folder['description'],
-            "color": folder['color'],
-            "progress": int(progress),
-            "total_items": total_items,
-            "completed_items": completed_items,
-            "created_at": folder['created_at']
-        })
-
-    return {"folders": folders_with_items}
-
-@app.post("/learning/folders")
-async def create_learning_folder(
-    folder: LearningFolder,
-    current_user: User = Depends(get_current_user)
-):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    folder_id = str(uuid.uuid4())
-    created_at = datetime.utcnow().isoformat()
-
-    folders_data = read_csv_data(LEARNING_FOLDERS_CSV)
-    folders_data.append({
-        'id': folder_id,
-        'user_id': current_user.id,
-        'name': folder.name,
-        'description': folder.description,
-        'color': folder.color,
-        'created_at': created_at
-    })
-
-    write_csv_data(LEARNING_FOLDERS_CSV, folders_data, 
-                  ['id', 'user_id', 'name', 'description', 'color', 'created_at'])
-
-    return {"folder_id": folder_id, "message": "Folder created successfully"}
-
-@app.get("/learning/folders/{folder_id}/items")
-async def get_folder_items(
-    folder_id: str,
-    current_user: User = Depends(get_current_user)
-):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-    folder_items = [item for item in items_data if item['folder_id'] == folder_id and item['user_id'] == current_user.id]
-
-    # Sort by order_index
-    folder_items.sort(key=lambda x: int(x.get('order_index', 0)))
-
-    formatted_items = []
-    for item in folder_items:
-        formatted_items.append({
-            "id": item['id'],
-            "title": item['title'],
-            "description": item['description'],
-            "completed": item['completed'] == 'True',
-            "resources": item['resources'].split(',') if item['resources'] else [],
-            "estimated_hours": int(item['estimated_hours']) if item['estimated_hours'] else 1,
-            "order_index": int(item.get('order_index', 0))
-        })
-
-    return {"items": formatted_items}
-
-@app.post("/learning/folders/{folder_id}/items/{item_id}/toggle")
-async def toggle_item_completion(
-    folder_id: str,
-    item_id: str,
-    current_user: User = Depends(get_current_user)
-):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-
-    for item in items_data:
-        if item['id'] == item_id and item['user_id'] == current_user.id:
-            item['completed'] = 'False' if item['completed'] == 'True' else 'True'
-            break
-
-    write_csv_data(LEARNING_PATH_ITEMS_CSV, items_data,
-                  ['id', 'folder_id', 'user_id', 'title', 'description', 'completed', 
-                   'resources', 'estimated_hours', 'order_index', 'created_at'])
-
-    return {"message": "Item completion toggled"}
-
-@app.post("/ai/generate-learning-path")
-async def generate_learning_path(
-    request: dict,
-    current_user: User = Depends(get_current_user)
-):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    goal = request.get('goal', '')
-    skill_level = request.get('skill_level', 'beginner')
-    time_commitment = request.get('time_commitment', '10')
-
-    try:
-        ai_service = AIService()
-
-        # Create a detailed prompt for learning path generation
-        prompt = f"""Generate a comprehensive learning path for: {goal}
-
-        User details:
-        - Skill level: {skill_level}
-        - Available time per week: {time_commitment} hours
-        - Profession: {current_user.profession}
-
-        Create a structured roadmap with:
-        1. Clear milestones/topics to learn
-        2. Estimated hours for each topic
-        3. Practical exercises or projects
-        4. Resource recommendations
-
-        Format as a JSON structure with title, description, items (each with title, description, estimated_hours), total_hours, difficulty, and skills array."""
-
-        # Generate the learning path using AI
-        ai_response = await ai_service.generate_ai_chat_response(prompt, {
-            "role": current_user.role,
-            "profession": current_user.profession
-        })
-
-        # Parse AI response and create structured path
-        # For demo, return a structured example
-        generated_path = {
-            "title": f"{goal} Mastery Path",
-            "description": f"Complete roadmap to master {goal} from {skill_level} level",
-            "items": [
-                {
-                    "title": f"Fundamentals of {goal}",
-                    "description": "Learn the core concepts and terminology",
-                    "completed": False,
-                    "resources": [],
-                    "estimated_hours": 8
-                },
-                {
-                    "title": "Hands-on Practice",
-                    "description": "Build practical projects to apply knowledge",
-                    "completed": False,
-                    "resources": [],
-                    "estimated_hours": 12
-                },
-                {
-                    "title": "Advanced Topics",
-                    "description": "Deep dive into complex concepts",
-                    "completed": False,
-                    "resources": [],
-                    "estimated_hours": 15
-                },
-                {
-                    "title": "Portfolio Project",
-                    "description": "Create a showcase project",
-                    "completed": False,
-                    "resources": [],
-                    "estimated_hours": 20
-                }
-            ],
-            "estimated_total_hours": 55,
-            "difficulty": "intermediate",
-            "skills": goal.split() + ["problem-solving", "project-management"]
-        }
-
-        return {"generated_path": generated_path, "ai_explanation": ai_response}
-
-    except Exception as e:
-        print(f"Error generating learning path: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate learning path")
-
-@app.post("/learning/add-generated-path")
-async def add_generated_path_to_folder(
-    request: AddToPathRequest,
-    current_user: User = Depends(get_current_user)
-):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    items_data = read_csv_data(LEARNING_PATH_ITEMS_CSV)
-
-    # Get current max order_index for the folder
-    folder_items = [item for item in items_data if item['folder_id'] == request.folder_id]
-    max_order = max([int(item.get('order_index', 0)) for item in folder_items]) if folder_items else 0
-
-    # Add each item from the generated path
-    for i, item in enumerate(request.generated_path.items):
-        item_id = str(uuid.uuid4())
-        items_data.append({
-            'id': item_id,
-            'folder_id': request.folder_id,
-            'user_id': current_user.id,
-            'title':item.title,
-            'description': item.description,
-            'completed': 'False',
-            'resources': ','.join(item.resources),
-            'estimated_hours': str(item.estimated_hours),
-            'order_index': str(max_order + i + 1),
-            'created_at': datetime.utcnow().isoformat()
-        })
-
-    write_csv_data(LEARNING_PATH_ITEMS_CSV, items_data,
-                  ['id', 'folder_id', 'user_id', 'title', 'description', 'completed', 
-                   'resources', 'estimated_hours', 'order_index', 'created_at'])
-
-    return {"message": "Learning path added successfully", "items_added": len(request.generated_path.items)}
-
 # Application tracking endpoints
 @app.get("/applications/tracked")
 async def get_tracked_applications(current_user: User = Depends(get_current_user)):
@@ -1269,9 +1141,8 @@ async def get_tracked_applications(current_user: User = Depends(get_current_user
         raise HTTPException(status_code=403, detail="Access denied")
     
     try:
-        # Get applications from database or CSV
-        applications_data = read_csv_data("data/user_applications.csv")
-        user_applications = [app for app in applications_data if app.get('user_id') == current_user.id]
+        # Get applications from storage
+        user_applications = await applications_store.scan_by('user_id', current_user.id)
         
         # Format applications for frontend
         formatted_applications = []
@@ -1292,29 +1163,16 @@ async def get_tracked_applications(current_user: User = Depends(get_current_user
         print(f"Error fetching tracked applications: {e}")
         return {"applications": []}
 
-@app.post("/applications/sync")
-async def sync_applications(current_user: User = Depends(get_current_user)):
-    if current_user.role != "individual":
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    try:
-        # Initialize Gmail tracker
-        gmail_tracker = GmailApplicationTracker()
-        
-        # Sync applications from Gmail
-        synced_applications = await gmail_tracker.sync_user_applications(current_user.id, current_user.email)
-        
-        # Save to CSV
-        applications_data = read_csv_data("data/user_applications.csv")
-        
-        # Remove existing applications for this user
-        applications_data = [app for app in applications_data if app.get('user_id') != current_user.id]
-        
-        # Add synced applications
+def replace_user_applications(user_id: str, synced_applications: List[dict]):
+    """Replace a user's stored applications with freshly synced ones"""
+    repository = applications_store.repository
+    with repository.batch():
+        repository.delete_by('user_id', user_id)
+
         for app in synced_applications:
-            applications_data.append({
-                'id': str(uuid.uuid4()),
-                'user_id': current_user.id,
+            repository.put({
+                'id': new_id(),
+                'user_id': user_id,
                 'type': app.get('type', 'job'),
                 'company': app.get('company', ''),
                 'position': app.get('position', ''),
@@ -1323,23 +1181,20 @@ async def sync_applications(current_user: User = Depends(get_current_user)):
                 'email_subject': app.get('email_subject', ''),
                 'created_at': datetime.utcnow().isoformat()
             })
+
+@app.post("/applications/sync")
+async def sync_applications(current_user: User = Depends(get_current_user)):
+    if current_user.role != "individual":
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    try:
+        # Sync applications from Gmail
+        synced_applications = await gmail_tracker.sync_user_applications(current_user.id, current_user.email)
         
-        # Write back to CSV
-        write_csv_data("data/user_applications.csv", applications_data,
-                      ['id', 'user_id', 'type', 'company', 'position', 'status', 'date', 'email_subject', 'created_at'])
+        # Replace this user's stored applications with the synced ones
+        await run_storage(replace_user_applications, current_user.id, synced_applications)
         
         return {"message": "Applications synced successfully", "count": len(synced_applications)}
     except Exception as e:
         print(f"Error syncing applications: {e}")
         raise HTTPException(status_code=500, detail="Failed to sync applications")
-
-# Initialize applications CSV
-def init_applications_csv():
-    applications_csv = "data/user_applications.csv"
-    if not os.path.exists(applications_csv):
-        with open(applications_csv, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['id', 'user_id', 'type', 'company', 'position', 'status', 'date', 'email_subject', 'created_at'])
-
-# Call initialization
-init_applications_csv()
\ No newline at end of file
@@ -0,0 +1,146 @@
+from typing import List, Optional, Tuple
+
+# Base-62 digits in ASCII order, so keys compare correctly as plain strings
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_VALUE = {digit: value for value, digit in enumerate(DIGITS)}
+
+# A key is an integer part followed by a fraction. The integer part is a head
+# letter giving its digit count ('a' one digit, 'b' two, ...; 'Z' one digit,
+# 'Y' two, ... for the negative side) and then its digits, so appending or
+# prepending only increments or decrements it and keys stay O(log n) long.
+# The fraction is only used to fit keys between two neighbours.
+FIRST_KEY = "a0"
+_SMALLEST_INTEGER = "A" + DIGITS[0] * 26
+
+def _integer_length(head: str) -> int:
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if 'A' <= head <= 'Z':
+        return ord('Z') - ord(head) + 2
+    raise ValueError(f"Invalid order key head: {head!r}")
+
+def _split(key: str) -> Tuple[str, str]:
+    """(integer part, fraction) of a key"""
+    if not key:
+        raise ValueError("Empty order key")
+    length = _integer_length(key[0])
+    if len(key) < length or key == _SMALLEST_INTEGER or key[length:].endswith(DIGITS[0]):
+        raise ValueError(f"Invalid order key: {key!r}")
+    return key[:length], key[length:]
+
+def _increment(integer: str) -> Optional[str]:
+    """Next integer part, or None past the largest one"""
+    head, digits = integer[0], list(integer[1:])
+    for position in range(len(digits) - 1, -1, -1):
+        value = _VALUE[digits[position]] + 1
+        if value < BASE:
+            digits[position] = DIGITS[value]
+            return head + ''.join(digits)
+        digits[position] = DIGITS[0]
+    # Every digit carried: one more digit
+    if head == 'Z':
+        return 'a' + DIGITS[0]
+    if head == 'z':
+        return None
+    head = chr(ord(head) + 1)
+    if head > 'a':
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+def _decrement(integer: str) -> Optional[str]:
+    """Previous integer part, or None below the smallest one"""
+    head, digits = integer[0], list(integer[1:])
+    for position in range(len(digits) - 1, -1, -1):
+        value = _VALUE[digits[position]] - 1
+        if value >= 0:
+            digits[position] = DIGITS[value]
+            return head + ''.join(digits)
+        digits[position] = DIGITS[-1]
+    # Every digit borrowed: one digit fewer on the positive side, one more on the negative
+    if head == 'a':
+        return 'Z' + DIGITS[-1]
+    if head == 'A':
+        return None
+    head = chr(ord(head) - 1)
+    if head < 'Z':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+def _midpoint(low: str, high: Optional[str]) -> str:
+    """Shortest fraction strictly between low and high (None means no upper bound)"""
+    prefix = []
+    while True:
+        if high is not None:
+            # Keep the prefix the two fractions share; low is padded with zeros
+            shared = 0
+            while shared < len(high) and (low[shared] if shared < len(low) else '0') == high[shared]:
+                shared += 1
+            prefix.append(high[:shared])
+            low, high = low[shared:], high[shared:]
+
+        low_digit = _VALUE[low[0]] if low else 0
+        high_digit = _VALUE[high[0]] if high is not None else BASE
+        if high_digit - low_digit > 1:
+            prefix.append(DIGITS[(low_digit + high_digit + 1) // 2])
+            return ''.join(prefix)
+        if high is not None and len(high) > 1:
+            prefix.append(high[0])
+            return ''.join(prefix)
+        prefix.append(DIGITS[low_digit])
+        low, high = low[1:], None
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """Order key that sorts after `before` and before `after`; either may be None.
+
+    Fractions never end in '0', so there is always room for another key
+    between two of them without renumbering anything else.
+    """
+    if before is None and after is None:
+        return FIRST_KEY
+    if before is None:
+        integer, fraction = _split(after)
+        if integer == _SMALLEST_INTEGER:
+            return integer + _midpoint('', fraction)
+        if fraction:
+            return integer
+        previous = _decrement(integer)
+        if previous is None:
+            raise ValueError("No order key before the smallest one")
+        return previous
+
+    integer, fraction = _split(before)
+    if after is None:
+        following = _increment(integer)
+        return following if following is not None else integer + _midpoint(fraction, None)
+
+    if before >= after:
+        raise ValueError(f"Order keys out of order: {before!r} >= {after!r}")
+    after_integer, after_fraction = _split(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after_fraction)
+    following = _increment(integer)
+    if following is not None and following < after:
+        return following
+    return integer + _midpoint(fraction, None)
+
+def keys_between(before: Optional[str], after: Optional[str], count: int) -> List[str]:
+    """count increasing keys between before and after, kept short"""
+    if count <= 0:
+        return []
+    if after is None or before is None:
+        # Open ends: step the integer part, one key after (or before) the other
+        keys = []
+        key = before if after is None else after
+        for _ in range(count):
+            key = key_between(key, None) if after is None else key_between(None, key)
+            keys.append(key)
+        return keys if after is None else keys[::-1]
+    # Bisect the range, so keys between two neighbours grow by O(log count)
+    middle = key_between(before, after)
+    half = count // 2
+    return keys_between(before, middle, half) + [middle] + keys_between(middle, after, count - half - 1)
@@ -0,0 +1,149 @@
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+
+# Providers whose resources get a small relevance bonus
+TRUSTED_PROVIDERS = ['freecodecamp', 'mit', 'stanford', 'harvard', 'coursera', 'edx']
+
+# Joins texts in a field; goals containing it cannot match (resource text never does)
+_SEPARATOR = '\x00'
+
+def calculate_relevance(resource: Dict, goal: str) -> float:
+    """Calculate relevance score for a resource based on learning goal"""
+    score = 0.0
+    goal_lower = goal.lower()
+
+    # Title match (highest weight)
+    if goal_lower in resource['title'].lower():
+        score += 3.0
+
+    # Description match
+    if goal_lower in resource['description'].lower():
+        score += 2.0
+
+    # Tags match
+    for tag in resource['tags']:
+        if goal_lower in tag.lower():
+            score += 1.5
+
+    # Category match
+    if goal_lower in resource['category'].lower():
+        score += 1.0
+
+    # Provider preference (trusted sources get bonus)
+    if any(provider in resource['provider'].lower() for provider in TRUSTED_PROVIDERS):
+        score += 0.5
+
+    return score
+
+class _JoinedText:
+    """Lowercased texts joined into one string, so finding a goal in all of them is one scan"""
+
+    def __init__(self, texts: Iterable[str]):
+        texts = [text.lower() for text in texts]
+        self.count = len(texts)
+        self.text = _SEPARATOR.join(texts)
+        lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=self.count)
+        self.starts = np.cumsum(lengths) - lengths
+
+    def containing(self, goal: str) -> np.ndarray:
+        """Positions of the texts that contain goal, ascending"""
+        if not goal:
+            return np.arange(self.count)
+        if _SEPARATOR in goal:
+            return np.empty(0, dtype=np.int64)
+
+        # After a hit, skip to the next text: each text is reported once
+        hits = []
+        text = self.text
+        offset = text.find(goal)
+        while offset != -1:
+            hits.append(offset)
+            end = text.find(_SEPARATOR, offset)
+            if end == -1:
+                break
+            offset = text.find(goal, end + 1)
+        return np.searchsorted(self.starts, np.array(hits, dtype=np.int64), side='right') - 1
+
+class RelevanceIndex:
+    """Resource text fields precomputed for scoring every resource against a goal at once.
+
+    Scores follow calculate_relevance(): each field is one joined string
+    searched with str.find, and per-resource hits are combined into scores
+    with array arithmetic instead of a Python loop over resources.
+    """
+
+    def __init__(self, resources: Sequence[Dict]):
+        self.doc_count = len(resources)
+        self.titles = _JoinedText(resource['title'] for resource in resources)
+        self.descriptions = _JoinedText(resource['description'] for resource in resources)
+
+        # Tags and categories repeat across resources, so a goal is checked
+        # once per distinct value and the results are spread out by code
+        tag_codes: Dict[str, int] = {}
+        owners, codes = [], []
+        for doc, resource in enumerate(resources):
+            for tag in resource['tags']:
+                owners.append(doc)
+                codes.append(tag_codes.setdefault(tag.lower(), len(tag_codes)))
+        self.tag_values = _JoinedText(tag_codes)
+        self.tag_owners = np.array(owners, dtype=np.int64)
+        self.tag_codes = np.array(codes, dtype=np.int64)
+
+        category_codes: Dict[str, int] = {}
+        codes = [category_codes.setdefault(resource['category'].lower(), len(category_codes)) for resource in resources]
+        self.categories = list(category_codes)
+        self.category_codes = np.array(codes, dtype=np.int64)
+
+        self.trusted = np.fromiter(
+            (any(provider in resource['provider'].lower() for provider in TRUSTED_PROVIDERS) for resource in resources),
+            dtype=bool, count=self.doc_count
+        )
+        self.ratings = np.fromiter((resource['rating'] for resource in resources), dtype=np.float64, count=self.doc_count)
+
+    @classmethod
+    def build(cls, resources: Iterable[Dict]) -> "RelevanceIndex":
+        return cls(list(resources))
+
+    @staticmethod
+    def _values_mask(positions: np.ndarray, size: int) -> np.ndarray:
+        mask = np.zeros(size, dtype=bool)
+        mask[positions] = True
+        return mask
+
+    def _mask(self, docs: np.ndarray) -> np.ndarray:
+        return self._values_mask(docs, self.doc_count)
+
+    def score(self, goal: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Which resources match a goal (title, description or a tag), and every resource's score for it"""
+        goal = goal.lower()
+        in_title = self._mask(self.titles.containing(goal))
+        in_description = self._mask(self.descriptions.containing(goal))
+        tag_matches = self._values_mask(self.tag_values.containing(goal), self.tag_values.count)
+        tag_hits = np.bincount(self.tag_owners, weights=tag_matches[self.tag_codes], minlength=self.doc_count)
+        in_category = np.array([goal in category for category in self.categories], dtype=bool)[self.category_codes]
+
+        matched = in_title | in_description | (tag_hits > 0)
+        scores = (3.0 * in_title + 2.0 * in_description + 1.5 * tag_hits
+                  + 1.0 * in_category + 0.5 * self.trusted)
+        return matched, scores
+
+    def rank(self, goals: List[str], limit: int, min_rating: float = 4.0) -> List[Tuple[int, float]]:
+        """Best (doc, score) pairs for a list of goals.
+
+        A resource matching several goals is scored by the last one it matches.
+        Ties on score and rating keep the order resources were first matched
+        in: by goal, then by catalog position.
+        """
+        eligible = self.ratings >= min_rating
+        last_scores = np.zeros(self.doc_count)
+        first_goals = np.full(self.doc_count, -1, dtype=np.int64)
+        for position, goal in enumerate(goals):
+            matched, scores = self.score(goal)
+            matched &= eligible
+            first_goals[matched & (first_goals < 0)] = position
+            last_scores[matched] = scores[matched]
+
+        docs = np.flatnonzero(first_goals >= 0)
+        order = np.lexsort((docs, first_goals[docs], -self.ratings[docs], -last_scores[docs]))
+        best = docs[order[:limit]]
+        return [(int(doc), float(last_scores[doc])) for doc in best]
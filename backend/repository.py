@@ -0,0 +1,720 @@
+import csv
+import heapq
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from typing import IO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from database import get_pool
+from id_generator import is_generated_id
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # File locking is unavailable on Windows; the in-process lock still applies
+
+# Storage backend for entity repositories: "csv" (default, compatible with the
+# existing data files) or "sqlite" (WAL-mode database, row-level writes)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "csv").lower()
+STORAGE_SQLITE_PATH = os.getenv("STORAGE_SQLITE_PATH", os.path.join("data", "storage.db"))
+
+# Superseded rows an append-updates CSV file may hold before it is compacted
+CSV_COMPACT_THRESHOLD = int(os.getenv("CSV_COMPACT_THRESHOLD", "1000"))
+
+Key = Union[str, Tuple[str, ...]]
+
+class Entity:
+    """Schema of a stored record type: its fields, key and secondary indexes.
+
+    With append_updates, the CSV backend writes a replaced row as a new
+    version at the end of the file instead of rewriting the file; the latest
+    version of a key wins when the file is read. With atomic_writes every
+    write is fsynced before it returns: appends in place, rewrites through a
+    temporary file that replaces the original.
+    ordered_indexes lists (field, order field) pairs read with latest_by().
+    With legacy_ids, a stored row whose id repeats an earlier row's and is not
+    a generated id is a separate record from before ids were unique; it is
+    read under a new id instead of replacing the earlier row.
+    """
+
+    def __init__(self, name: str, csv_file: str, fieldnames: Sequence[str],
+                 key: Sequence[str] = ('id',), indexes: Sequence[str] = (),
+                 append_updates: bool = False, atomic_writes: bool = False,
+                 ordered_indexes: Sequence[Tuple[str, str]] = (),
+                 legacy_ids: bool = False):
+        self.name = name
+        self.csv_file = csv_file
+        self.fieldnames = list(fieldnames)
+        self.key = tuple(key)
+        self.indexes = tuple(indexes)
+        self.append_updates = append_updates
+        self.atomic_writes = atomic_writes
+        self.ordered_indexes = tuple(tuple(pair) for pair in ordered_indexes)
+        self.legacy_ids = legacy_ids
+
+    def key_of(self, row: Dict) -> Key:
+        """Key value of a row: a string for single-field keys, else a tuple"""
+        if len(self.key) == 1:
+            return row[self.key[0]]
+        return tuple(row[field] for field in self.key)
+
+    def key_fields(self, key: Key) -> Dict[str, str]:
+        """Map a key value back to its field values"""
+        if len(self.key) == 1:
+            return {self.key[0]: key}
+        return dict(zip(self.key, key))
+
+    def normalize(self, row: Dict, base: Optional[Dict] = None) -> Dict[str, str]:
+        """Coerce a row to the entity's fields with string values"""
+        base = base or {}
+        normalized = {}
+        for field in self.fieldnames:
+            value = row.get(field, base.get(field, ''))
+            normalized[field] = '' if value is None else str(value)
+        return normalized
+
+    def stored_rows(self, rows: Iterable[Dict]) -> Iterable[Dict]:
+        """Normalize rows read from storage, renaming repeated legacy ids.
+
+        A repeat gets the first free "<id>-<n>", so the same file always reads
+        back the same ids and the next rewrite keeps them.
+        """
+        seen = set()
+        for row in rows:
+            row = self.normalize(row)
+            if self.legacy_ids:
+                field = self.key[0]
+                record_id = row[field]
+                if record_id in seen and not is_generated_id(record_id):
+                    suffix = 2
+                    while f"{record_id}-{suffix}" in seen:
+                        suffix += 1
+                    row[field] = f"{record_id}-{suffix}"
+                seen.add(row[field])
+            yield row
+
+class Repository(ABC):
+    """Keyed storage for one entity.
+
+    Rows are dicts of strings, as they are read from CSV. put() writes a whole
+    row (insert or replace), upsert() merges the given fields into an existing
+    row, and add_many() inserts only rows whose key is not stored yet. Writes
+    made inside batch() are flushed together.
+    """
+
+    def __init__(self, entity: Entity):
+        self.entity = entity
+
+    @abstractmethod
+    def get(self, key: Key) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan(self) -> List[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def scan_by(self, field: str, value: str) -> List[Dict]:
+        raise NotImplementedError
+
+    def latest_by(self, field: str, value: str, order_field: str, limit: int,
+                  since: Optional[str] = None) -> List[Dict]:
+        """Up to limit rows with field == value, largest order_field first (ties: largest key first).
+
+        With since, only rows whose order_field is at least since are returned.
+        """
+        rows = self.scan_by(field, value)
+        if since is not None:
+            rows = [row for row in rows if row[order_field] >= since]
+        return heapq.nlargest(limit, rows, key=lambda row: (row[order_field], self.entity.key_of(row)))
+
+    @abstractmethod
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def generation(self) -> int:
+        """Counter that changes when rows are reloaded after an outside write, for caches built on top"""
+        return 0
+
+    @abstractmethod
+    def put(self, row: Dict) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def upsert(self, row: Dict) -> Dict:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_many(self, rows: Iterable[Dict]) -> List[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def update(self, key: Key, **fields) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: Key) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_by(self, field: str, value: str) -> int:
+        raise NotImplementedError
+
+    @contextmanager
+    def batch(self):
+        yield self
+
+class CSVRepository(Repository):
+    """Repository over a CSV file with in-memory key and secondary indexes.
+
+    New rows are appended to the file; replacing or deleting rows rewrites it
+    through a temporary file and an atomic rename. For append_updates entities
+    replaced rows are appended too, and the file is compacted once superseded
+    rows pile up. The file is reloaded when another writer changes it.
+
+    Writers in every process hold an exclusive lock on a sidecar file while
+    they reload, change and write the file, so concurrent writers never drop
+    each other's rows; reloads hold it shared.
+    """
+
+    def __init__(self, entity: Entity):
+        super().__init__(entity)
+        self.csv_file = entity.csv_file
+        self._rows: Dict[Key, Dict] = {}
+        self._indexes: Dict[str, Dict[str, Dict[Key, None]]] = {field: {} for field in entity.indexes}
+        # (field, order field) -> field value -> sorted (order value, key) pairs
+        self._ordered: Dict[Tuple[str, str], Dict[str, List[Tuple[str, Key]]]] = {
+            pair: {} for pair in entity.ordered_indexes}
+        self._signature = None
+        self._lock = threading.RLock()
+        self._file_locked = False  # Sidecar file lock held (under _lock)
+        self._batch_depth = 0
+        self._pending: List[Dict] = []
+        self._dirty = False
+        self._stale_rows = 0  # Superseded row versions still in the file
+        self._generation = 0
+        self._ensure_file()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.csv_file)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    @contextmanager
+    def _file_lock(self, shared: bool = False):
+        """Cross-process lock on a sidecar file that survives rewrites; caller holds _lock.
+
+        Only the outermost use locks the file; nested uses are covered by it.
+        """
+        if self._file_locked:
+            yield
+            return
+        with open(f"{self.csv_file}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            self._file_locked = True
+            try:
+                yield
+            finally:
+                self._file_locked = False
+
+    @contextmanager
+    def _writing(self):
+        """Hold both locks and catch up with the file, so changes merge with other writers'"""
+        with self._lock, self._file_lock():
+            self._sync()
+            yield
+
+    def _ensure_file(self):
+        """Create the file, or migrate its header to the entity's fields"""
+        os.makedirs(os.path.dirname(self.csv_file) or ".", exist_ok=True)
+        with self._lock, self._file_lock():
+            if not os.path.exists(self.csv_file):
+                with open(self.csv_file, 'w', newline='', encoding='utf-8') as file:
+                    csv.writer(file).writerow(self.entity.fieldnames)
+                return
+
+            with open(self.csv_file, 'r', newline='', encoding='utf-8') as file:
+                header = next(csv.reader(file), [])
+            if header != self.entity.fieldnames:
+                self._load()
+                self._rewrite()
+
+    def _index_add(self, key: Key, row: Dict):
+        for field, index in self._indexes.items():
+            index.setdefault(row[field], {})[key] = None
+        self._ordered_add(key, row)
+
+    def _index_remove(self, key: Key, row: Dict):
+        for field, index in self._indexes.items():
+            keys = index.get(row[field])
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del index[row[field]]
+        self._ordered_remove(key, row)
+
+    def _ordered_add(self, key: Key, row: Dict):
+        for (field, order_field), index in self._ordered.items():
+            # Logs are written in order, so this is almost always an append
+            insort(index.setdefault(row[field], []), (row[order_field], key))
+
+    def _ordered_remove(self, key: Key, row: Dict):
+        for (field, order_field), index in self._ordered.items():
+            entries = index.get(row[field])
+            if entries is None:
+                continue
+            position = bisect_left(entries, (row[order_field], key))
+            if position < len(entries) and entries[position] == (row[order_field], key):
+                del entries[position]
+            if not entries:
+                del index[row[field]]
+
+    def _load(self):
+        """Rebuild rows and indexes from the file"""
+        rows = {}
+        stale_rows = 0
+        with self._file_lock(shared=True):  # No writer is halfway through a row meanwhile
+            signature = self._file_signature()
+            if os.path.exists(self.csv_file):
+                with open(self.csv_file, 'r', newline='', encoding='utf-8') as file:
+                    reader = csv.DictReader(file)
+                    for row in self.entity.stored_rows(reader):
+                        key = self.entity.key_of(row)
+                        if key in rows:
+                            stale_rows += 1  # A later version keeps the key's first position
+                        rows[key] = row
+
+        self._rows = rows
+        self._stale_rows = stale_rows
+        self._generation += 1
+        self._indexes = {field: {} for field in self.entity.indexes}
+        self._ordered = {pair: {} for pair in self.entity.ordered_indexes}
+        for key, row in rows.items():
+            self._index_add(key, row)
+        self._signature = signature
+
+    def _sync(self):
+        """Reload if another writer changed the file since our last read/write"""
+        if self._batch_depth == 0 and self._file_signature() != self._signature:
+            self._load()
+
+    def _replace_file(self, write: Callable[[IO], None]):
+        """Atomically replace the file with what write() puts in a new temporary file"""
+        descriptor, temp_file = tempfile.mkstemp(dir=os.path.dirname(self.csv_file) or ".",
+                                                 prefix=f"{os.path.basename(self.csv_file)}.", suffix=".tmp")
+        try:
+            with open(descriptor, 'w', newline='', encoding='utf-8') as file:
+                write(file)
+                file.flush()
+                os.fsync(file.fileno())
+            try:
+                os.chmod(temp_file, stat.S_IMODE(os.stat(self.csv_file).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(temp_file, self.csv_file)
+        except BaseException:
+            try:
+                os.unlink(temp_file)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _rewrite(self):
+        """Atomically replace the file with the current rows"""
+        def write(file):
+            writer = csv.DictWriter(file, fieldnames=self.entity.fieldnames)
+            writer.writeheader()
+            writer.writerows(self._rows.values())
+
+        self._replace_file(write)
+        self._signature = self._file_signature()
+        self._stale_rows = 0
+
+    def _append(self, rows: List[Dict]):
+        """Append rows in place; the caller holds the file lock, so readers wait for whole rows"""
+        with open(self.csv_file, 'a', newline='', encoding='utf-8') as file:
+            csv.DictWriter(file, fieldnames=self.entity.fieldnames).writerows(rows)
+            if self.entity.atomic_writes:
+                file.flush()
+                os.fsync(file.fileno())
+        self._signature = self._file_signature()
+
+    def _flush(self):
+        """Write pending changes unless a batch is still open"""
+        if self._batch_depth > 0:
+            return
+        if self._dirty:
+            self._rewrite()
+        elif self._pending:
+            self._append(self._pending)
+            if self._stale_rows >= max(CSV_COMPACT_THRESHOLD, len(self._rows) // 2):
+                self._rewrite()
+        self._pending = []
+        self._dirty = False
+
+    def _store(self, row: Dict):
+        """Place a normalized row in memory and schedule it for writing"""
+        key = self.entity.key_of(row)
+        existing = self._rows.get(key)
+        if existing is not None:
+            # Only re-index changed fields so index order follows file order
+            for field, index in self._indexes.items():
+                if existing[field] != row[field]:
+                    keys = index.get(existing[field], {})
+                    keys.pop(key, None)
+                    if not keys:
+                        index.pop(existing[field], None)
+                    index.setdefault(row[field], {})[key] = None
+            if any(existing[field] != row[field] or existing[order_field] != row[order_field]
+                   for field, order_field in self._ordered):
+                self._ordered_remove(key, existing)
+                self._ordered_add(key, row)
+            if self.entity.append_updates:
+                self._pending.append(row)
+                self._stale_rows += 1
+            else:
+                self._dirty = True
+        else:
+            self._pending.append(row)
+            self._index_add(key, row)
+        self._rows[key] = row
+
+    @contextmanager
+    def batch(self):
+        with self._writing():
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                self._flush()
+
+    def get(self, key: Key) -> Optional[Dict]:
+        with self._lock:
+            self._sync()
+            row = self._rows.get(key)
+            return dict(row) if row is not None else None
+
+    def scan(self) -> List[Dict]:
+        with self._lock:
+            self._sync()
+            return [dict(row) for row in self._rows.values()]
+
+    def scan_by(self, field: str, value: str) -> List[Dict]:
+        with self._lock:
+            self._sync()
+            if field in self._indexes:
+                keys = self._indexes[field].get(value, {})
+                return [dict(self._rows[key]) for key in keys]
+            return [dict(row) for row in self._rows.values() if row[field] == value]
+
+    def latest_by(self, field: str, value: str, order_field: str, limit: int,
+                  since: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            self._sync()
+            index = self._ordered.get((field, order_field))
+            if index is None:
+                return super().latest_by(field, value, order_field, limit, since)
+            if limit <= 0:
+                return []
+            entries = index.get(value, [])
+            start = len(entries) - limit
+            if since is not None:
+                start = max(start, bisect_left(entries, (since,)))
+            return [dict(self._rows[key]) for _, key in reversed(entries[max(start, 0):])]
+
+    def count(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._rows)
+
+    def generation(self) -> int:
+        with self._lock:
+            self._sync()
+            return self._generation
+
+    def put(self, row: Dict) -> Dict:
+        with self._writing():
+            row = self.entity.normalize(row)
+            self._store(row)
+            self._flush()
+            return dict(row)
+
+    def upsert(self, row: Dict) -> Dict:
+        with self._writing():
+            existing = self._rows.get(self.entity.key_of(row))
+            row = self.entity.normalize(row, existing)
+            self._store(row)
+            self._flush()
+            return dict(row)
+
+    def add_many(self, rows: Iterable[Dict]) -> List[Dict]:
+        with self._writing():
+            added = []
+            for row in rows:
+                row = self.entity.normalize(row)
+                if self.entity.key_of(row) not in self._rows:
+                    self._store(row)
+                    added.append(dict(row))
+            self._flush()
+            return added
+
+    def update(self, key: Key, **fields) -> Optional[Dict]:
+        with self._writing():
+            existing = self._rows.get(key)
+            if existing is None:
+                return None
+            row = self.entity.normalize(fields, existing)
+            self._store(row)
+            self._flush()
+            return dict(row)
+
+    def delete(self, key: Key) -> bool:
+        with self._writing():
+            row = self._rows.pop(key, None)
+            if row is None:
+                return False
+            self._index_remove(key, row)
+            self._pending = [pending for pending in self._pending if self.entity.key_of(pending) != key]
+            self._dirty = True
+            self._flush()
+            return True
+
+    def delete_by(self, field: str, value: str) -> int:
+        with self._writing():
+            keys = [self.entity.key_of(row) for row in self.scan_by(field, value)]
+            with self.batch():
+                for key in keys:
+                    self.delete(key)
+            return len(keys)
+
+class SQLiteRepository(Repository):
+    """Repository over a WAL-mode SQLite table, using the shared connection pool.
+
+    Every committed write also bumps the table's counter in _table_versions,
+    inside the same transaction. A counter that moved by more than this
+    repository's own bumps means another process or worker wrote the table,
+    which is what generation() reports.
+    """
+
+    def __init__(self, entity: Entity, database_path: str = STORAGE_SQLITE_PATH):
+        super().__init__(entity)
+        self.database_path = database_path
+        self.pool = get_pool(database_path)
+        self._local = threading.local()  # Connection held by an open batch, per thread
+        self.table = entity.name
+        self.columns = ', '.join(f'"{field}"' for field in entity.fieldnames)
+        self.key_clause = ' AND '.join(f'"{field}" = ?' for field in entity.key)
+        self._generation = 0
+        self._seen_version: Optional[int] = None  # Table counter as of our last commit or check
+        self._version_lock = threading.Lock()
+        self._init_table()
+
+    @contextmanager
+    def _connection(self):
+        """Use the open batch's connection, or borrow one and commit on success"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        with self.pool.connection() as conn:
+            changes = conn.total_changes
+            yield conn
+            self._commit(conn, changes)
+
+    def _commit(self, conn: sqlite3.Connection, changes: int):
+        """Commit, bumping the table counter if rows changed since total_changes was `changes`"""
+        if not conn.in_transaction:
+            return
+        if conn.total_changes == changes:
+            conn.commit()
+            return
+        # The write lock is held from the first write on, so no other writer can commit in between
+        conn.execute('UPDATE "_table_versions" SET version = version + 1 WHERE name = ?', (self.table,))
+        version = conn.execute('SELECT version FROM "_table_versions" WHERE name = ?', (self.table,)).fetchone()[0]
+        conn.commit()
+        self._observe(version, own=True)
+
+    def _observe(self, version: int, own: bool = False):
+        """Count an outside write if the table counter moved past what we know"""
+        with self._version_lock:
+            seen = self._seen_version
+            if seen is not None and version > seen + (1 if own else 0):
+                self._generation += 1
+            self._seen_version = version if seen is None else max(seen, version)
+
+    def _init_table(self):
+        """Create the table and indexes, importing the CSV file on first use"""
+        column_defs = ', '.join(f'"{field}" TEXT NOT NULL DEFAULT \'\'' for field in self.entity.fieldnames)
+        key_columns = ', '.join(f'"{field}"' for field in self.entity.key)
+        with self._connection() as conn:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({column_defs}, PRIMARY KEY ({key_columns}))')
+            existing = {row['name'] for row in conn.execute(f'PRAGMA table_info("{self.table}")')}
+            for field in self.entity.fieldnames:
+                if field not in existing:
+                    conn.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{field}" TEXT NOT NULL DEFAULT \'\'')
+            for field in self.entity.indexes:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.table}_{field}" ON "{self.table}" ("{field}")')
+            for field, order_field in self.entity.ordered_indexes:
+                columns = ', '.join(f'"{column}"' for column in (field, order_field) + self.entity.key)
+                conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{self.table}_{field}_{order_field}" '
+                             f'ON "{self.table}" ({columns})')
+            conn.execute('CREATE TABLE IF NOT EXISTS "_table_versions" (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+            conn.execute('INSERT OR IGNORE INTO "_table_versions" (name, version) VALUES (?, 0)', (self.table,))
+
+            empty = conn.execute(f'SELECT 1 FROM "{self.table}" LIMIT 1').fetchone() is None
+            if empty and os.path.exists(self.entity.csv_file):
+                with open(self.entity.csv_file, 'r', newline='', encoding='utf-8') as file:
+                    rows = list(self.entity.stored_rows(csv.DictReader(file)))
+                # Later versions of a key (append_updates files) replace earlier ones
+                assignments = ', '.join(f'"{field}" = excluded."{field}"' for field in self.entity.fieldnames)
+                self._insert(conn, rows, conflict=f'ON CONFLICT ({key_columns}) DO UPDATE SET {assignments}')
+
+    def _insert(self, conn: sqlite3.Connection, rows: List[Dict], verb: str = 'INSERT', conflict: str = ''):
+        placeholders = ', '.join('?' for _ in self.entity.fieldnames)
+        sql = f'{verb} INTO "{self.table}" ({self.columns}) VALUES ({placeholders}) {conflict}'
+        conn.executemany(sql, [[row[field] for field in self.entity.fieldnames] for row in rows])
+
+    def _key_params(self, key: Key) -> List[str]:
+        return list(self.entity.key_fields(key).values())
+
+    @contextmanager
+    def batch(self):
+        if getattr(self._local, 'conn', None) is not None:
+            yield self
+            return
+
+        with self.pool.connection() as conn:
+            self._local.conn = conn
+            changes = conn.total_changes
+            try:
+                yield self
+                self._commit(conn, changes)
+            finally:
+                self._local.conn = None
+
+    def get(self, key: Key) -> Optional[Dict]:
+        with self._connection() as conn:
+            row = conn.execute(
+                f'SELECT {self.columns} FROM "{self.table}" WHERE {self.key_clause}',
+                self._key_params(key)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def scan(self) -> List[Dict]:
+        with self._connection() as conn:
+            rows = conn.execute(f'SELECT {self.columns} FROM "{self.table}" ORDER BY rowid').fetchall()
+        return [dict(row) for row in rows]
+
+    def scan_by(self, field: str, value: str) -> List[Dict]:
+        if field not in self.entity.fieldnames:
+            raise KeyError(field)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f'SELECT {self.columns} FROM "{self.table}" WHERE "{field}" = ? ORDER BY rowid', (value,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def latest_by(self, field: str, value: str, order_field: str, limit: int,
+                  since: Optional[str] = None) -> List[Dict]:
+        if field not in self.entity.fieldnames or order_field not in self.entity.fieldnames:
+            raise KeyError(field if field not in self.entity.fieldnames else order_field)
+        if limit <= 0:
+            return []
+        order = ', '.join(f'"{column}" DESC' for column in (order_field,) + self.entity.key)
+        where, params = f'"{field}" = ?', [value]
+        if since is not None:
+            where += f' AND "{order_field}" >= ?'
+            params.append(since)
+        with self._connection() as conn:
+            rows = conn.execute(
+                f'SELECT {self.columns} FROM "{self.table}" WHERE {where} ORDER BY {order} LIMIT ?',
+                params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        with self._connection() as conn:
+            return conn.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+
+    def generation(self) -> int:
+        with self._connection() as conn:
+            version = conn.execute('SELECT version FROM "_table_versions" WHERE name = ?', (self.table,)).fetchone()
+        if version is not None:
+            self._observe(version[0])
+        return self._generation
+
+    def put(self, row: Dict) -> Dict:
+        row = self.entity.normalize(row)
+        assignments = ', '.join(f'"{field}" = excluded."{field}"' for field in self.entity.fieldnames)
+        key_columns = ', '.join(f'"{field}"' for field in self.entity.key)
+        with self._connection() as conn:
+            self._insert(conn, [row], conflict=f'ON CONFLICT ({key_columns}) DO UPDATE SET {assignments}')
+        return row
+
+    def upsert(self, row: Dict) -> Dict:
+        with self.batch():
+            existing = self.get(self.entity.key_of(row))
+            return self.put(self.entity.normalize(row, existing))
+
+    def add_many(self, rows: Iterable[Dict]) -> List[Dict]:
+        placeholders = ', '.join('?' for _ in self.entity.fieldnames)
+        sql = f'INSERT OR IGNORE INTO "{self.table}" ({self.columns}) VALUES ({placeholders})'
+        added = []
+        with self._connection() as conn:
+            for row in rows:
+                row = self.entity.normalize(row)
+                if conn.execute(sql, [row[field] for field in self.entity.fieldnames]).rowcount:
+                    added.append(row)
+        return added
+
+    def update(self, key: Key, **fields) -> Optional[Dict]:
+        fields = {field: '' if value is None else str(value)
+                  for field, value in fields.items() if field in self.entity.fieldnames}
+        with self.batch():
+            if fields:
+                assignments = ', '.join(f'"{field}" = ?' for field in fields)
+                with self._connection() as conn:
+                    conn.execute(
+                        f'UPDATE "{self.table}" SET {assignments} WHERE {self.key_clause}',
+                        list(fields.values()) + self._key_params(key)
+                    )
+            return self.get(key)
+
+    def delete(self, key: Key) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute(f'DELETE FROM "{self.table}" WHERE {self.key_clause}', self._key_params(key))
+        return cursor.rowcount > 0
+
+    def delete_by(self, field: str, value: str) -> int:
+        if field not in self.entity.fieldnames:
+            raise KeyError(field)
+        with self._connection() as conn:
+            cursor = conn.execute(f'DELETE FROM "{self.table}" WHERE "{field}" = ?', (value,))
+        return cursor.rowcount
+
+_repositories: Dict[str, Repository] = {}
+_repositories_lock = threading.Lock()
+
+def get_repository(entity: Entity, backend: Optional[str] = None) -> Repository:
+    """Return the process-wide repository for an entity on the configured backend"""
+    backend = (backend or STORAGE_BACKEND).lower()
+    with _repositories_lock:
+        repository = _repositories.get(entity.name)
+        if repository is None:
+            if backend == "sqlite":
+                repository = SQLiteRepository(entity)
+            elif backend == "csv":
+                repository = CSVRepository(entity)
+            else:
+                raise ValueError(f"Unknown storage backend: {backend}")
+            _repositories[entity.name] = repository
+        return repository
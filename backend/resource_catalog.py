@@ -0,0 +1,377 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+import numpy as np
+from catalog_file import file_signature, read_arrays, read_catalog, stored_version, write_arrays, write_catalog
+from repository import Entity, Repository, get_repository
+
+# Keep a binary copy of the catalog next to its CSV, loaded at startup instead of parsing the CSV
+CATALOG_SNAPSHOT_FILES = os.getenv("CATALOG_SNAPSHOT_FILES", "true").lower() == "true"
+
+# The binary copy is rewritten at most this long after a change, so bursts of
+# writes cost one rewrite; 0 rewrites it on every change
+CATALOG_SNAPSHOT_MS = int(os.getenv("CATALOG_SNAPSHOT_MS", "1000"))
+
+# Query parameters that only track where a link was shared from
+_TRACKING_PARAMS = {'feature', 'ref', 'si', 'fbclid', 'gclid'}
+
+_YOUTUBE_HOSTS = {'youtube.com', 'm.youtube.com', 'youtu.be'}
+
+def resource_from_row(row: Dict) -> Dict:
+    """Convert a stored resource row to its API shape"""
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'description': row['description'],
+        'provider': row['provider'],
+        'category': row['category'],
+        'level': row['level'],
+        'duration': row['duration'],
+        'url': row['url'],
+        'embed_url': row['embed_url'],
+        'thumbnail': row['thumbnail'],
+        'language': row['language'],
+        'tags': row['tags'].split(',') if row['tags'] else [],
+        'rating': float(row['rating']) if row['rating'] else 0,
+        'created_at': row['created_at']
+    }
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a resource URL, so one resource linked different ways is stored once.
+
+    Scheme, "www.", fragments, trailing slashes, tracking parameters and
+    parameter order are ignored, and YouTube short, embed and watch links
+    map to the same video.
+    """
+    url = url.strip()
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url if '://' in url else f"https://{url}")
+        host = parts.hostname or ''
+        port = parts.port
+    except ValueError:
+        return url.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip('/')
+    params = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                    if name.lower() not in _TRACKING_PARAMS and not name.lower().startswith('utm_'))
+
+    if host in _YOUTUBE_HOSTS:
+        video_id = None
+        if host == 'youtu.be':
+            video_id = path.lstrip('/')
+        elif path.startswith('/embed/'):
+            video_id = path[len('/embed/'):]
+        elif path == '/watch':
+            video_id = next((value for name, value in params if name == 'v'), None)
+        if video_id:
+            return f"youtube.com/watch?v={video_id}"
+
+    return host + path + (f"?{urlencode(params)}" if params else '')
+
+class CatalogSnapshot:
+    """One immutable version of the resource catalog.
+
+    Snapshots are shared by every reader: the resource dicts must be copied
+    before they are modified. Structures derived from a snapshot (search
+    indexes and the like) are built once per version through derive(), or
+    extended from the previous version's when resources were only appended,
+    or loaded from disk when the catalog stored them for this version.
+    """
+
+    def __init__(self, version: int, resources: List[Dict], previous: Optional["CatalogSnapshot"] = None,
+                 appended: bool = False):
+        self.version = version
+        self.previous = previous
+        self.resources: Tuple[Dict, ...] = tuple(resources)
+        # appended: resources are previous.resources with more at the end
+        self._appended = appended and previous is not None
+        if self._appended:
+            added = self.resources[len(previous.resources):]
+            self.by_id: Dict[str, Dict] = {**previous.by_id, **{resource['id']: resource for resource in added}}
+            categories = set(previous.categories).union(resource['category'] for resource in added)
+            languages = set(previous.languages).union(resource['language'] for resource in added)
+        else:
+            self.by_id = {resource['id']: resource for resource in self.resources}
+            categories = {resource['category'] for resource in self.resources}
+            languages = {resource['language'] for resource in self.resources}
+        self.categories: Tuple[str, ...] = tuple(sorted(categories))
+        self.languages: Tuple[str, ...] = tuple(sorted(languages))
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+        self._stored: Dict[str, Callable[[], Optional[Any]]] = {}  # Loaders of derived structures kept on disk
+        self.on_derived: Optional[Callable[[str], None]] = None  # Called with the name of each structure computed
+
+    def appended_to(self, other: "CatalogSnapshot") -> bool:
+        """True if this snapshot is other's resources with more added at the end"""
+        if other is self.previous and self._appended:
+            return True
+        if len(self.resources) < len(other.resources):
+            return False
+        return all(ours is theirs or ours == theirs for ours, theirs in zip(self.resources, other.resources))
+
+    def derive(self, name: str, build: Callable[["CatalogSnapshot"], Any],
+               extend: Optional[Callable[[Any, Tuple[Dict, ...]], Any]] = None) -> Any:
+        """Build (once) and return a structure computed from this snapshot.
+
+        With extend, a structure derived from the previous snapshot is passed
+        to extend(previous_value, appended_resources) instead of building
+        from scratch, as long as resources were only appended since then.
+        """
+        value = self._derived.get(name)
+        if value is None:
+            loaded = False
+            with self._derived_lock:
+                value = self._derived.get(name)
+                if value is None:
+                    previous = self.previous
+                    previous_value = previous._derived.get(name) if previous is not None else None
+                    if extend is not None and previous_value is not None and self.appended_to(previous):
+                        value = extend(previous_value, self.resources[len(previous.resources):])
+                    stored = self._stored.pop(name, None)
+                    if value is None and stored is not None:
+                        value = stored()
+                        loaded = value is not None
+                    if value is None:
+                        value = build(self)
+                    self._derived[name] = value
+            if not loaded and self.on_derived is not None:
+                self.on_derived(name)
+        return value
+
+    def __len__(self) -> int:
+        return len(self.resources)
+
+class ResourceCatalog:
+    """In-memory resource catalog and the single writer of its resources.
+
+    Readers take a snapshot() and keep using it for a whole request, so they
+    see one consistent version however the catalog changes meanwhile.
+    Writers go through apply(), which stores a batch and builds the next
+    snapshot from the current one plus the batch instead of re-reading the
+    file; the repository batch reloads, merges and writes under its
+    cross-process file lock. Versions only increase. The file is re-read when another process
+    changes it, or on publish().
+
+    New versions are also written to snapshot_file, a binary copy that the
+    next startup loads instead of parsing the CSV, as long as the CSV has
+    not changed since. The CSV stays the format to edit and export.
+    Derived structures registered with store_derived() are written next to
+    the copy once built, and loaded with it instead of being rebuilt.
+    """
+
+    def __init__(self, entity: Entity, repository: Optional[Repository] = None):
+        self.entity = entity
+        self.repository = repository or get_repository(entity)
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._signature = None
+        self._version = 0
+        self._lock = threading.RLock()
+        self.snapshot_file = os.path.splitext(entity.csv_file)[0] + ".catalog" if CATALOG_SNAPSHOT_FILES else None
+        self.save_interval = CATALOG_SNAPSHOT_MS / 1000
+        self._save_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()  # One write at a time; never held while taking _lock
+        self._saved_version = 0
+        self._copy_signature = None  # Signature of the binary copy holding _saved_version
+        self._stored_derived: Dict[str, Tuple[Callable[[Any], Dict[str, np.ndarray]],
+                                              Callable[[Dict[str, np.ndarray]], Any]]] = {}
+        self._saved_derived: Set[str] = set()  # Derived structures on disk for _saved_version
+
+    @property
+    def write_lock(self) -> threading.RLock:
+        """Held by apply(); hold it around reading a snapshot and writing a batch derived from it"""
+        return self._lock
+
+    def _file_signature(self):
+        return file_signature(self.entity.csv_file)
+
+    def store_derived(self, name: str, to_arrays: Callable[[Any], Dict[str, np.ndarray]],
+                      from_arrays: Callable[[Dict[str, np.ndarray]], Any]):
+        """Keep the snapshot structure derived under name on disk next to the binary copy"""
+        self._stored_derived[name] = (to_arrays, from_arrays)
+
+    def _derived_file(self, name: str) -> str:
+        return f"{os.path.splitext(self.snapshot_file)[0]}.{name}.npz"
+
+    def _load_derived(self, name: str, version: int, copy_signature) -> Optional[Any]:
+        """A derived structure stored for the binary copy with copy_signature, or None"""
+        arrays = read_arrays(self._derived_file(name), copy_signature)
+        if arrays is None:
+            return None
+        try:
+            value = self._stored_derived[name][1](arrays)
+        except (KeyError, ValueError) as e:
+            print(f"Error loading {name}: {e}")
+            return None
+        with self._save_lock:
+            if self._saved_version == version:
+                self._saved_derived.add(name)
+        return value
+
+    def _derived_built(self, name: str):
+        if name in self._stored_derived:
+            with self._lock:
+                self._schedule_save()
+
+    def _install(self, resources: List[Dict], signature, appended: bool = False) -> CatalogSnapshot:
+        """Make resources the next version; caller holds the lock"""
+        previous = self._snapshot
+        self._version += 1
+        if previous is not None:
+            previous.previous = None  # Keep only one generation of history alive
+        self._snapshot = CatalogSnapshot(self._version, resources, previous, appended)
+        self._snapshot.on_derived = self._derived_built
+        self._signature = signature
+        return self._snapshot
+
+    def _schedule_save(self):
+        """Write the binary copy soon; caller holds the lock"""
+        if self.snapshot_file is None:
+            return
+        if self.save_interval <= 0:
+            self.save()
+        elif self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_interval, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Write the current version to the binary copy if it is not there yet, with its built derived structures"""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            snapshot, signature = self._snapshot, self._signature
+        if self.snapshot_file is None or snapshot is None or signature is None:
+            return
+        with self._save_lock:
+            if snapshot.version > self._saved_version:
+                try:
+                    # A copy that cannot be written stays stale, and its CSV signature no longer matches
+                    copy_signature = write_catalog(self.snapshot_file, snapshot.resources, snapshot.version, signature)
+                    if copy_signature is not None:
+                        self._saved_version = snapshot.version
+                        self._copy_signature = copy_signature
+                        self._saved_derived = set()
+                except OSError as e:
+                    print(f"Error writing catalog file: {e}")
+            if snapshot.version == self._saved_version and self._copy_signature is not None:
+                self._save_derived(snapshot)
+
+    def _save_derived(self, snapshot: CatalogSnapshot):
+        """Write derived structures of the saved version not on disk yet; caller holds _save_lock"""
+        for name, (to_arrays, _) in self._stored_derived.items():
+            value = snapshot._derived.get(name)
+            if value is None or name in self._saved_derived:
+                continue
+            try:
+                write_arrays(self._derived_file(name), to_arrays(value), self._copy_signature)
+                self._saved_derived.add(name)
+            except OSError as e:
+                print(f"Error writing {name} file: {e}")
+
+    def close(self):
+        """Write pending changes to the binary copy; called at shutdown"""
+        self.save()
+
+    def _load(self, signature) -> CatalogSnapshot:
+        """Build a new snapshot from the binary copy, or else the repository; caller holds the lock"""
+        if self.snapshot_file is not None and signature is not None:
+            copy_signature = file_signature(self.snapshot_file)
+            stored = read_catalog(self.snapshot_file, signature)
+            if stored is not None:
+                version, resources = stored
+                self._version = max(self._version, version - 1)
+                snapshot = self._install(resources, signature)
+                with self._save_lock:
+                    self._saved_version = max(self._saved_version, snapshot.version)
+                    if self._saved_version == snapshot.version and file_signature(self.snapshot_file) == copy_signature:
+                        # Derived structures stored for this copy number documents as it does
+                        self._copy_signature = copy_signature
+                        self._saved_derived = set()
+                        snapshot._stored = {
+                            name: lambda name=name: self._load_derived(name, snapshot.version, copy_signature)
+                            for name in self._stored_derived
+                        }
+                return snapshot
+            self._version = max(self._version, stored_version(self.snapshot_file))
+
+        # A file that grew without being replaced only had rows appended:
+        # entries for the rows it already had are carried over as they are
+        previous = self._snapshot
+        grew = (previous is not None and signature is not None and self._signature is not None
+                and signature[0] == self._signature[0] and signature[2] > self._signature[2])
+        carried = previous.resources if grew else ()
+
+        resources = []
+        try:
+            for position, row in enumerate(self.repository.scan()):
+                if position < len(carried) and carried[position]['id'] == row['id']:
+                    resources.append(carried[position])
+                else:
+                    resources.append(resource_from_row(row))
+        except Exception as e:
+            print(f"Error reading resources: {e}")
+            if self._snapshot is not None:
+                return self._snapshot
+
+        snapshot = self._install(resources, signature)
+        self._schedule_save()
+        return snapshot
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current catalog version, reloading first if the file changed"""
+        snapshot = self._snapshot
+        signature = self._file_signature()
+        if snapshot is not None and signature == self._signature:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and self._file_signature() == self._signature:
+                return self._snapshot
+            return self._load(self._file_signature())
+
+    def apply(self, added: Iterable[Dict] = (), removed: Iterable[str] = ()) -> Tuple[CatalogSnapshot, List[Dict]]:
+        """Store a batch of changes and publish it as the next version.
+
+        added rows whose id is already stored are skipped; removed lists ids
+        to delete. Returns the new snapshot and the rows actually added.
+        """
+        with self._lock:
+            current = self.snapshot()
+            removed = set(removed)
+            generation = self.repository.generation()
+            with self.repository.batch():
+                for resource_id in removed:
+                    self.repository.delete(resource_id)
+                stored = self.repository.add_many(added)
+            if not stored and not removed:
+                return current, stored
+            # Taken before checking for other writers: one writing after this
+            # leaves the signature stale, so the next snapshot() reloads
+            signature = self._file_signature()
+            if self.repository.generation() != generation:
+                # Another process wrote meanwhile: its rows are only in the file
+                return self._load(self._file_signature()), stored
+
+            resources = [resource for resource in current.resources if resource['id'] not in removed]
+            appended = len(resources) == len(current.resources)
+            resources.extend(resource_from_row(row) for row in stored)
+            snapshot = self._install(resources, signature, appended)
+            self._schedule_save()
+            return snapshot, stored
+
+    def publish(self) -> CatalogSnapshot:
+        """Re-read the catalog after writes made around apply()"""
+        with self._lock:
+            return self._load(self._file_signature())
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
@@ -0,0 +1,372 @@
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+import numpy as np
+
+# Searchable resource fields and how much a match in each counts
+SEARCH_FIELD_WEIGHTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'category': 1.0,
+    'description': 1.0,
+    'provider': 0.5
+}
+
+# Matches are scored outright, rather than walking postings by impact, while
+# there are at most this many of them
+DIRECT_SCORING_MATCHES = 4096
+
+# Postings are walked by impact this many entries per term at first, twice as
+# many each further round
+IMPACT_BLOCK = 256
+
+# Terms whose postings arrays and bitset are kept between searches; the least
+# recently used are dropped first
+TERM_CACHE_SIZE = 4096
+
+# Words joined by '.', '+' or '#' stay one token ("node.js", "c++", "c#")
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[.+#]+[a-z0-9]+)*[+#]*")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+def _field_text(resource: Dict, field: str) -> str:
+    value = resource.get(field, '')
+    if isinstance(value, (list, tuple)):
+        return ' '.join(value)
+    return str(value)
+
+def _bitset_mask(bits: int, size: int) -> np.ndarray:
+    """Bitset as a boolean array indexed by document"""
+    flags = np.frombuffer(bits.to_bytes((size + 7) // 8 or 1, 'little'), dtype=np.uint8)
+    return np.unpackbits(flags, bitorder='little')[:size].view(bool)
+
+def _bitset_of(docs: np.ndarray, size: int) -> int:
+    """Bitset with the given document bits set"""
+    mask = np.zeros(size, dtype=bool)
+    mask[docs] = True
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+def _best(docs: np.ndarray, scores: np.ndarray, limit: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """The limit best (doc, score) pairs: highest score first, lowest document on ties"""
+    if limit is not None and len(scores) > 4 * limit:
+        # Only scores at least the limit-th largest can make it, ties included
+        threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+        keep = scores >= threshold
+        docs, scores = docs[keep], scores[keep]
+    order = np.lexsort((docs, -scores))[:limit]
+    return docs[order], scores[order]
+
+class _TermArrays:
+    """A term's postings as arrays: by document for lookups, and by impact for walks"""
+
+    __slots__ = ('docs', 'scores', 'impact_docs', 'impact_scores', 'bits')
+
+    def __init__(self, docs: np.ndarray, scores: np.ndarray):
+        order = np.argsort(docs, kind='stable')  # Postings are added in document order, so this is cheap
+        self.docs, self.scores = docs[order], scores[order]
+        impact = np.lexsort((self.docs, -self.scores))
+        self.impact_docs, self.impact_scores = self.docs[impact], self.scores[impact]
+        self.bits: Optional[int] = None  # Bitset of docs, made on first use
+
+    def scores_of(self, docs: np.ndarray) -> np.ndarray:
+        """Scores of documents known to contain the term"""
+        return self.scores[np.searchsorted(self.docs, docs)]
+
+# Shared by every term that is not in an index, so unknown query terms are not cached
+_NO_POSTINGS = _TermArrays(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+_NO_POSTINGS.bits = 0
+
+class _StoredPostings(Mapping):
+    """Postings of an index loaded from arrays, turned into dicts only for terms that are used"""
+
+    def __init__(self, terms: Dict[str, int], offsets: np.ndarray, docs: np.ndarray, scores: np.ndarray,
+                 dicts: Optional[Dict[str, Dict[int, float]]] = None):
+        self._terms = terms  # Term -> position in offsets
+        self._offsets = offsets
+        self._docs = docs
+        self._scores = scores
+        self._dicts = dicts or {}  # Terms used or replaced since loading
+
+    def stored(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Documents and scores of a term as loaded, unless it was replaced since"""
+        position = self._terms.get(term)
+        if position is None or term in self._dicts:
+            return None
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return self._docs[start:end], self._scores[start:end]
+
+    def __getitem__(self, term: str) -> Dict[int, float]:
+        postings = self._dicts.get(term)
+        if postings is None:
+            stored = self.stored(term)
+            if stored is None:
+                raise KeyError(term)
+            postings = self._dicts[term] = dict(zip(stored[0].tolist(), stored[1].tolist()))
+        return postings
+
+    def __setitem__(self, term: str, postings: Dict[int, float]):
+        self._dicts[term] = postings
+
+    def __contains__(self, term) -> bool:
+        return term in self._terms or term in self._dicts
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._terms
+        yield from (term for term in self._dicts if term not in self._terms)
+
+    def __len__(self) -> int:
+        return len(self._terms) + sum(term not in self._terms for term in self._dicts)
+
+    def copy(self) -> "_StoredPostings":
+        return _StoredPostings(self._terms, self._offsets, self._docs, self._scores, dict(self._dicts))
+
+class SearchIndex:
+    """BM25F inverted index over resources.
+
+    Each posting stores a document's saturated, length-normalized and
+    field-weighted term frequency, so a query only adds idf-weighted
+    postings. Documents are numbered by their position in the list they
+    were indexed from. extended() returns a new index with more documents
+    appended, copying only the postings the new documents touch, so an
+    index can be shared with concurrent readers. to_arrays() and
+    from_arrays() store an index and load it back without re-tokenizing.
+    """
+
+    def __init__(self, field_weights: Optional[Dict[str, float]] = None, k1: float = 1.2, b: float = 0.75):
+        self.field_weights = dict(field_weights or SEARCH_FIELD_WEIGHTS)
+        self.k1 = k1
+        self.b = b
+        self.doc_count = 0
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self._length_totals: Dict[str, int] = {field: 0 for field in self.field_weights}
+        self._average_lengths: Dict[str, float] = {}  # Field lengths the postings were normalized with
+        self._arrays: "OrderedDict[str, _TermArrays]" = OrderedDict()  # LRU of TERM_CACHE_SIZE terms
+        self._arrays_lock = threading.Lock()
+        self._owned: Set[str] = set()  # Posting dicts created by this index, safe to modify
+
+    @classmethod
+    def build(cls, resources: Iterable[Dict], **kwargs) -> "SearchIndex":
+        index = cls(**kwargs)
+        documents = index._tokenize(resources)
+        index._measure(documents)
+        index._freeze_lengths(len(documents))
+        index._add(documents)
+        return index
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The index as flat arrays, for storing; from_arrays() loads them back"""
+        terms = list(self.postings)
+        postings = [self._posting_arrays(term) for term in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(docs) for docs, _ in postings], out=offsets[1:])
+        fields = list(self.field_weights)
+        return {
+            'fields': np.frombuffer('\x00'.join(fields).encode('utf-8'), dtype=np.uint8),
+            'field_weights': np.array([self.field_weights[field] for field in fields], dtype=np.float64),
+            'length_totals': np.array([self._length_totals[field] for field in fields], dtype=np.int64),
+            'average_lengths': np.array([self._average_lengths.get(field, 1.0) for field in fields], dtype=np.float64),
+            'parameters': np.array([self.k1, self.b, self.doc_count], dtype=np.float64),
+            # Tokens never contain NUL, so it separates them
+            'terms': np.frombuffer('\x00'.join(terms).encode('utf-8'), dtype=np.uint8),
+            'offsets': offsets,
+            'docs': np.concatenate([docs for docs, _ in postings] or [np.empty(0)]).astype(np.int32),
+            'scores': np.concatenate([scores for _, scores in postings] or [np.empty(0)]).astype(np.float64),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "SearchIndex":
+        """Index stored with to_arrays(); postings become dicts only once a term is used"""
+        fields = arrays['fields'].tobytes().decode('utf-8').split('\x00')
+        k1, b, doc_count = arrays['parameters'].tolist()
+        index = cls(dict(zip(fields, arrays['field_weights'].tolist())), k1, b)
+        index.doc_count = int(doc_count)
+        index._length_totals = dict(zip(fields, arrays['length_totals'].tolist()))
+        index._average_lengths = dict(zip(fields, arrays['average_lengths'].tolist()))
+        text = arrays['terms'].tobytes().decode('utf-8')
+        terms = text.split('\x00') if text else []
+        index.postings = _StoredPostings(dict(zip(terms, range(len(terms)))), arrays['offsets'],
+                                         arrays['docs'].astype(np.int64), arrays['scores'])
+        return index
+
+    def _tokenize(self, resources: Iterable[Dict]) -> List[Dict[str, List[str]]]:
+        """Tokens of each searchable field, per resource"""
+        return [{field: tokenize(_field_text(resource, field)) for field in self.field_weights}
+                for resource in resources]
+
+    def _measure(self, documents: List[Dict[str, List[str]]]):
+        for fields in documents:
+            for field, tokens in fields.items():
+                self._length_totals[field] += len(tokens)
+
+    def _freeze_lengths(self, documents: int):
+        documents = max(documents, 1)
+        self._average_lengths = {field: max(total / documents, 1.0) for field, total in self._length_totals.items()}
+
+    def _add(self, documents: List[Dict[str, List[str]]]):
+        """Index tokenized resources as the next documents; _measure must have counted them"""
+        for fields in documents:
+            doc = self.doc_count
+            self.doc_count += 1
+            weighted: Dict[str, float] = {}
+            for field, weight in self.field_weights.items():
+                tokens = fields[field]
+                if not tokens:
+                    continue
+                norm = 1 - self.b + self.b * len(tokens) / self._average_lengths.get(field, 1.0)
+                for token in tokens:
+                    weighted[token] = weighted.get(token, 0.0) + weight / norm
+
+            for term, frequency in weighted.items():
+                postings = self.postings.get(term)
+                if postings is None or term not in self._owned:
+                    postings = self.postings[term] = dict(postings or {})
+                    self._owned.add(term)
+                postings[doc] = frequency * (self.k1 + 1) / (frequency + self.k1)
+                self._arrays.pop(term, None)
+
+    def extended(self, resources: Iterable[Dict]) -> "SearchIndex":
+        """New index with resources appended; this index is left unchanged"""
+        index = SearchIndex.__new__(SearchIndex)
+        index.field_weights = self.field_weights
+        index.k1 = self.k1
+        index.b = self.b
+        index.doc_count = self.doc_count
+        index.postings = self.postings.copy()
+        index._length_totals = dict(self._length_totals)
+        index._average_lengths = self._average_lengths
+        index._arrays = OrderedDict()  # Starts empty: terms are cached again as searches use them
+        index._arrays_lock = threading.Lock()
+        index._owned = set()
+        documents = index._tokenize(resources)
+        index._measure(documents)
+        index._add(documents)
+        return index
+
+    @property
+    def drifted(self) -> bool:
+        """True once field lengths moved far enough from those used for normalization"""
+        if self.doc_count == 0:
+            return False
+        for field, total in self._length_totals.items():
+            frozen = self._average_lengths.get(field, 1.0)
+            current = max(total / self.doc_count, 1.0)
+            if abs(current - frozen) > 0.25 * frozen:
+                return True
+        return False
+
+    def idf(self, term: str) -> float:
+        frequency = len(self._term_arrays(term).docs)
+        return math.log(1 + (self.doc_count - frequency + 0.5) / (frequency + 0.5))
+
+    def _posting_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """A term's documents and scores, read from loaded arrays while the term is unchanged"""
+        if isinstance(self.postings, _StoredPostings):
+            stored = self.postings.stored(term)
+            if stored is not None:
+                return stored
+        postings = self.postings.get(term, {})
+        return (np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)))
+
+    def _term_arrays(self, term: str) -> _TermArrays:
+        """A term's postings as arrays, kept in a bounded LRU cache"""
+        if term not in self.postings:
+            return _NO_POSTINGS
+        with self._arrays_lock:
+            arrays = self._arrays.get(term)
+            if arrays is not None:
+                self._arrays.move_to_end(term)
+                return arrays
+
+        arrays = _TermArrays(*self._posting_arrays(term))
+        with self._arrays_lock:
+            self._arrays[term] = arrays
+            while len(self._arrays) > TERM_CACHE_SIZE:
+                self._arrays.popitem(last=False)
+        return arrays
+
+    def term_bits(self, term: str) -> int:
+        """Bitset of the documents containing a term (cached with its arrays)"""
+        arrays = self._term_arrays(term)
+        if arrays.bits is None:
+            arrays.bits = _bitset_of(arrays.docs, self.doc_count)
+        return arrays.bits
+
+    def matches(self, query: str) -> int:
+        """Bitset of the documents containing every query term"""
+        terms = set(tokenize(query))
+        if not terms:
+            return 0
+        bits = -1
+        for term in terms:
+            bits &= self.term_bits(term)
+            if not bits:
+                break
+        return bits
+
+    def search(self, query: str, limit: Optional[int] = None,
+               candidates: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Documents containing every query term, as (doc, score) best first.
+
+        candidates is a bitset the results are restricted to, such as the
+        documents passing facet filters.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        allowed = self.matches(query)
+        if candidates is not None:
+            allowed &= candidates
+        if not allowed or (limit is not None and limit <= 0):
+            return []
+
+        idfs = [self.idf(term) for term in terms]
+        arrays = [self._term_arrays(term) for term in terms]
+
+        def scores_of(docs: np.ndarray) -> np.ndarray:
+            # Summed in query term order, as one document at a time would be
+            total = idfs[0] * arrays[0].scores_of(docs)
+            for idf, term_arrays in zip(idfs[1:], arrays[1:]):
+                total = total + idf * term_arrays.scores_of(docs)
+            return total
+
+        mask = _bitset_mask(allowed, self.doc_count)
+        if limit is None or allowed.bit_count() <= DIRECT_SCORING_MATCHES:
+            docs = np.flatnonzero(mask)
+            best_docs, best_scores = _best(docs, scores_of(docs), limit)
+            return list(zip(best_docs.tolist(), best_scores.tolist()))
+
+        # Threshold algorithm, a block at a time: walk every term's postings
+        # best first in step and score the matching documents met on the way.
+        # A document not met yet scores at most the sum of the scores at the
+        # current depths, so the walk stops once that bound cannot beat the
+        # k-th best
+        seen = np.zeros(self.doc_count, dtype=bool)
+        best_docs = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float64)
+        depth, block = 0, max(IMPACT_BLOCK, limit)
+        while True:
+            end = depth + block
+            met = np.concatenate([term_arrays.impact_docs[depth:end] for term_arrays in arrays])
+            met = np.unique(met[mask[met] & ~seen[met]])
+            seen[met] = True
+            if len(met):
+                best_docs, best_scores = _best(np.concatenate((best_docs, met)),
+                                               np.concatenate((best_scores, scores_of(met))), limit)
+
+            if any(end >= len(term_arrays.docs) for term_arrays in arrays):
+                # Every match contains this term, so every match has been met
+                break
+            if len(best_docs) >= limit:
+                bound = sum(idf * float(term_arrays.impact_scores[end - 1]) for idf, term_arrays in zip(idfs, arrays))
+                worst_score, worst_doc = float(best_scores[-1]), int(best_docs[-1])
+                # Documents tied with the bound come after the current depths,
+                # so they have larger numbers and lose ties
+                frontier_doc = max(int(term_arrays.impact_docs[end - 1]) for term_arrays in arrays)
+                if bound < worst_score or (bound == worst_score and frontier_doc >= worst_doc):
+                    break
+            depth, block = end, block * 2
+        return list(zip(best_docs.tolist(), best_scores.tolist()))
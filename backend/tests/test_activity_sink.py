@@ -0,0 +1,77 @@
+import threading
+
+from activity_sink import ActivitySink
+
+class BlockingWriter:
+    """Batch writer that holds the sink's thread until released"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.batches = []
+
+    def __call__(self, events):
+        self.entered.set()
+        self.release.wait(5)
+        self.batches.append(list(events))
+
+def test_events_are_dropped_while_the_queue_is_full():
+    writer = BlockingWriter()
+    sink = ActivitySink(max_pending=2, batch_size=1, flush_interval=0.01)
+    assert sink.submit(writer, 'first')
+    assert writer.entered.wait(5)  # 'first' is being written, the queue is empty
+
+    assert sink.submit(writer, 'second')
+    assert sink.submit(writer, 'third')
+    assert not sink.submit(writer, 'fourth')
+
+    writer.release.set()
+    sink.close()
+    assert [event for batch in writer.batches for event in batch] == ['first', 'second', 'third']
+    stats = sink.stats()
+    assert (stats['submitted'], stats['written'], stats['dropped']) == (3, 3, 1)
+
+def test_close_drains_queued_events():
+    written = []
+    sink = ActivitySink(batch_size=10, flush_interval=60)
+    for number in range(25):
+        sink.submit(written.extend, number)
+
+    sink.close()  # Long before the flush interval would have passed
+
+    assert written == list(range(25))
+    assert sink.stats()['pending'] == 0
+
+def test_submit_after_close_starts_a_new_writer():
+    written = []
+    sink = ActivitySink(batch_size=10, flush_interval=60)
+    sink.submit(written.extend, 'before')
+    sink.close()
+
+    # As after a shutdown/startup cycle of the app
+    assert sink.submit(written.extend, 'after')
+    sink.close()
+    sink.close()  # Nothing running: a no-op
+
+    assert written == ['before', 'after']
+    stats = sink.stats()
+    assert (stats['submitted'], stats['written'], stats['dropped']) == (2, 2, 0)
+
+def test_counters_add_up_under_concurrent_producers():
+    written = []
+    sink = ActivitySink(max_pending=50, batch_size=20, flush_interval=0.001)
+
+    def produce():
+        for number in range(2_000):
+            sink.submit(written.extend, number)
+
+    producers = [threading.Thread(target=produce) for _ in range(4)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    sink.close()
+
+    stats = sink.stats()
+    assert stats['submitted'] + stats['dropped'] == 8_000
+    assert stats['written'] == stats['submitted'] == len(written)
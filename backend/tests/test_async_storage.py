@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+import async_storage
+from async_storage import run_storage, shutdown_storage
+
+@pytest.fixture(autouse=True)
+def small_storage(monkeypatch):
+    monkeypatch.setattr(async_storage, 'STORAGE_WORKERS', 2)
+    monkeypatch.setattr(async_storage, 'STORAGE_MAX_PENDING', 2)
+    shutdown_storage()
+    yield
+    shutdown_storage()
+
+def lifespan(calls=6):
+    """One app run: more storage calls than may be pending at once, then shutdown"""
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def work(number):
+        with lock:
+            running.append(number)
+            peak.append(len(running))
+        threading.Event().wait(0.01)
+        with lock:
+            running.remove(number)
+        return threading.current_thread().name
+
+    async def main():
+        return await asyncio.gather(*(run_storage(work, number) for number in range(calls)))
+
+    threads = asyncio.run(main())
+    shutdown_storage()
+    return threads, max(peak)
+
+def test_storage_work_runs_across_app_restarts():
+    for _ in range(3):
+        threads, peak = lifespan()
+        assert len(threads) == 6
+        assert all(name.startswith('storage') for name in threads)
+        assert peak <= 2
+
+def test_shutdown_waits_for_queued_work_and_a_new_executor_starts():
+    done = []
+
+    def slow():
+        threading.Event().wait(0.05)
+        done.append(1)
+
+    async def main():
+        queued = asyncio.ensure_future(run_storage(slow))
+        await asyncio.sleep(0.01)
+        await asyncio.to_thread(shutdown_storage)
+        assert done == [1]
+        await queued
+        return await run_storage(lambda: 'after restart')
+
+    assert asyncio.run(main()) == 'after restart'
@@ -0,0 +1,110 @@
+import copy
+import time
+
+import pytest
+
+from repository import CSVRepository
+
+FLUSH_INTERVAL = 0.05
+
+@pytest.fixture
+def bookmarks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Importing bookmark_store creates its global store under data/
+    import bookmark_store
+    return bookmark_store
+
+class FlakyRepository(CSVRepository):
+    """CSV repository whose next `failures` puts raise"""
+
+    failures = 0
+
+    def put(self, row):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        return super().put(row)
+
+@pytest.fixture
+def repository(bookmarks, tmp_path):
+    entity = copy.copy(bookmarks.BOOKMARK_ENTITY)
+    entity.csv_file = str(tmp_path / "store" / "user_bookmarks.csv")
+    return FlakyRepository(entity)
+
+@pytest.fixture
+def store(bookmarks, repository):
+    return bookmarks.BookmarkStore(repository, flush_interval=FLUSH_INTERVAL)
+
+def stored_rows(repository):
+    with open(repository.entity.csv_file) as file:
+        return file.read().splitlines()[1:]
+
+def wait_for_flushes(store, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while store.flushes < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.flushes >= count
+
+def test_progress_reports_in_one_window_are_stored_as_one_row(store, repository):
+    for progress in (10, 20, 35):
+        store.set_progress('u1', 'r1', progress)
+    assert store.get('u1', 'r1')['progress'] == '35'  # Read from the overlay before the flush
+
+    wait_for_flushes(store, 1)
+    assert store.stats()['pending'] == 0
+    assert store.rows_written == 1
+    assert len(stored_rows(repository)) == 1
+    assert repository.get(('u1', 'r1'))['progress'] == '35'
+
+    store.set_progress('u1', 'r1', 100)
+    wait_for_flushes(store, 2)
+    assert len(stored_rows(repository)) == 2  # One appended row per window
+    assert repository.get(('u1', 'r1'))['status'] == 'completed'
+
+def test_stale_reports_are_ignored(store):
+    store.set_progress_many('u1', [('r1', 50, '2026-01-01T10:00:00')])
+    changed = store.set_progress_many('u1', [
+        ('r1', 20, '2026-01-01T09:00:00'),  # Older than the client's last stored report
+        ('r2', 70, '2026-01-01T10:00:05'),
+        ('r2', 40, '2026-01-01T10:00:01'),  # Reordered: an earlier report arriving later
+    ])
+
+    assert changed == 1
+    assert store.get('u1', 'r1')['progress'] == '50'
+    assert store.get('u1', 'r2')['progress'] == '70'
+
+def test_client_clock_behind_the_server_still_records_progress(store):
+    store.set_progress('u1', 'r1', 10)  # last_accessed is server time, now
+    changed = store.set_progress_many('u1', [('r1', 40, '2001-01-01T00:00:00')])
+
+    row = store.get('u1', 'r1')
+    assert changed == 1
+    assert row['progress'] == '40'
+    assert row['last_accessed'] > '2001-01-01T00:00:00'  # Server time, not the client's
+    assert row['reported_at'] == '2001-01-01T00:00:00'
+
+def test_failed_flush_is_retried(store, repository):
+    repository.failures = 1
+    store.set_progress('u1', 'r1', 30)
+    store.flush()
+    assert store.flushes == 0
+    assert store.stats()['pending'] == 1
+
+    store.set_progress('u1', 'r2', 60)
+    wait_for_flushes(store, 1)
+    assert repository.get(('u1', 'r1'))['progress'] == '30'
+    assert repository.get(('u1', 'r2'))['progress'] == '60'
+
+def test_close_stores_pending_changes(bookmarks, repository):
+    store = bookmarks.BookmarkStore(repository, flush_interval=60)
+    store.set_progress('u1', 'r1', 25)
+    store.bookmark('u1', 'r2')
+    assert not repository.scan_by('user_id', 'u1')
+
+    store.close()
+    assert {row['resource_id'] for row in repository.scan_by('user_id', 'u1')} == {'r1', 'r2'}
+
+def test_bookmarking_again_starts_over(store):
+    store.set_progress('u1', 'r1', 80)
+    store.bookmark('u1', 'r1', 'bookmarked')
+    row = store.get('u1', 'r1')
+    assert (row['status'], row['progress']) == ('bookmarked', '0')
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+from catalog_file import file_signature, read_arrays, read_catalog, stored_version, write_arrays, write_catalog
+
+def resource(number, **fields):
+    return {
+        'id': str(number), 'title': f'Course {number}', 'description': 'Multi-line\ndescription, with "quotes"',
+        'provider': 'MIT', 'category': 'Data Science', 'level': 'Beginner', 'duration': '4 hours',
+        'url': f'https://example.com/{number}', 'embed_url': '', 'thumbnail': '', 'language': 'English',
+        'tags': ['Python', 'Data'], 'rating': 4.5, 'created_at': '2024-01-01', **fields
+    }
+
+SOURCE = (11, 1_700_000_000_000_000_000, 4096)
+
+def test_catalog_roundtrip(tmp_path):
+    path = str(tmp_path / "resources.catalog")
+    resources = [resource(1), resource(2, tags=[], rating=0, provider='Khan Academy'),
+                 resource(3, title='Ünïcode ✓', language='Hindi')]
+
+    signature = write_catalog(path, resources, 7, SOURCE)
+    assert signature == file_signature(path)
+    assert stored_version(path) == 7
+    assert read_catalog(path, SOURCE) == (7, resources)
+    assert read_catalog(path, SOURCE)[1][1]['tags'] == []
+
+def test_empty_catalog_roundtrip(tmp_path):
+    path = str(tmp_path / "resources.catalog")
+    write_catalog(path, [], 1, SOURCE)
+    assert read_catalog(path, SOURCE) == (1, [])
+
+def test_stale_or_damaged_copy_is_not_read(tmp_path):
+    path = str(tmp_path / "resources.catalog")
+    write_catalog(path, [resource(1)], 3, SOURCE)
+
+    assert read_catalog(path, (11, SOURCE[1] + 1, 4096)) is None  # CSV changed since the copy was written
+    assert read_catalog(str(tmp_path / "missing.catalog"), SOURCE) is None
+    with open(path, 'r+b') as file:
+        file.write(b'XXXX')
+    assert read_catalog(path, SOURCE) is None
+
+def test_unstorable_tags_are_refused(tmp_path):
+    path = str(tmp_path / "resources.catalog")
+    assert write_catalog(path, [resource(1, tags=['a,b'])], 1, SOURCE) is None
+    assert not os.path.exists(path)
+
+def test_arrays_are_read_only_for_their_source(tmp_path):
+    path = str(tmp_path / "index.npz")
+    write_arrays(path, {'docs': np.arange(5)}, SOURCE)
+
+    assert read_arrays(path, SOURCE)['docs'].tolist() == [0, 1, 2, 3, 4]
+    assert read_arrays(path, (12, SOURCE[1], SOURCE[2])) is None
+    assert read_arrays(str(tmp_path / "missing.npz"), SOURCE) is None
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
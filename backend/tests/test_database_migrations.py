@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+import database
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "migrations.db"))
+    conn.row_factory = sqlite3.Row
+    database._create_tables(conn)
+    conn.commit()
+    database.migrate_database(conn)
+    yield conn
+    conn.close()
+
+def query_plan(conn, query, params):
+    return [row['detail'] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+
+@pytest.mark.parametrize('query, params, index', [
+    (database.USER_ACTIVITIES_QUERY, ('user-1', 10), 'idx_activity_logs_user_timestamp'),
+    (database.USER_LEARNING_PATHS_QUERY, ('user-1',), 'idx_learning_paths_user_created'),
+])
+def test_user_queries_use_covering_indexes(conn, query, params, index):
+    plan = query_plan(conn, query, params)
+    assert any(f'USING COVERING INDEX {index}' in detail for detail in plan), plan
+    assert not any('TEMP B-TREE' in detail for detail in plan), plan
+
+def test_migration_sets_user_version_and_reruns_as_a_no_op(conn):
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == len(database.MIGRATIONS) == 1
+    schema = [tuple(row) for row in conn.execute('SELECT name, sql FROM sqlite_master ORDER BY name')]
+
+    database.migrate_database(conn)
+
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 1
+    assert [tuple(row) for row in conn.execute('SELECT name, sql FROM sqlite_master ORDER BY name')] == schema
+
+def test_activities_logged_in_the_same_second_come_newest_first(conn):
+    # Timestamps have one-second resolution; the time-ordered ids break ties
+    conn.executemany('INSERT INTO activity_logs (id, user_id, type, title, description, timestamp) '
+                     'VALUES (?, ?, ?, ?, ?, ?)',
+                     [(activity_id, 'user-1', 'login', '', '', '2024-01-01 10:00:00')
+                      for activity_id in ('01HQ0000000000000000000002', '01HQ0000000000000000000003',
+                                          '01HQ0000000000000000000001')])
+    rows = conn.execute(database.USER_ACTIVITIES_QUERY, ('user-1', 10)).fetchall()
+    assert [row['id'][-1] for row in rows] == ['3', '2', '1']
@@ -0,0 +1,73 @@
+import random
+
+from catalog_file import read_arrays, write_arrays
+from facet_index import FACET_FIELDS, FacetIndex, bitset_docs, bitset_from
+
+SOURCE = (11, 1_700_000_000_000_000_000, 4096)
+
+def catalog(count=300, seed=3):
+    rng = random.Random(seed)
+    return [{'category': rng.choice(['AI', 'Design', 'Data Science', 'Web Development']),
+             'level': rng.choice(['Beginner', 'Intermediate', 'Advanced']),
+             'language': rng.choice(['English', 'Hindi', 'Español']),
+             'provider': rng.choice(['MIT', 'freeCodeCamp', 'Coursera', ''])}
+            for _ in range(count)]
+
+def scanned(resources, filters):
+    """What the list comprehension filter the index replaced returned"""
+    return [doc for doc, resource in enumerate(resources)
+            if all(not value or resource[field] == value for field, value in filters.items())]
+
+FILTERS = [
+    {},
+    {'category': 'AI'},
+    {'category': 'Design', 'level': 'Advanced'},
+    {'level': 'Beginner', 'language': 'Hindi', 'provider': 'MIT'},
+    {'category': 'AI', 'level': '', 'language': 'English', 'provider': ''},
+    {'category': 'Cooking'},
+]
+
+def test_filter_matches_scanning_the_catalog():
+    resources = catalog()
+    index = FacetIndex.build(resources[:200]).extended(resources[200:])
+    for filters in FILTERS:
+        assert list(bitset_docs(index.filter(filters))) == scanned(resources, filters)
+
+def test_counts_ignore_a_facets_own_filter_but_apply_the_others():
+    resources = catalog()
+    index = FacetIndex.build(resources)
+    matches = bitset_from(range(0, len(resources), 3), len(resources))
+    filters = {'category': 'AI', 'level': 'Beginner', 'language': '', 'provider': ''}
+
+    counts = index.counts(matches, filters)
+    for field in FACET_FIELDS:
+        others = {name: value for name, value in filters.items() if name != field}
+        expected = {}
+        for doc in scanned(resources, others):
+            if doc % 3 == 0:
+                value = resources[doc][field]
+                expected[value] = expected.get(value, 0) + 1
+        assert counts[field] == expected
+    # The level facet still offers the levels the level filter excludes
+    assert set(counts['level']) == {'Beginner', 'Intermediate', 'Advanced'}
+    assert set(counts['category']) > {'AI'}
+
+def test_arrays_survive_a_stored_roundtrip(tmp_path):
+    resources = catalog()
+    index = FacetIndex.build(resources[:150]).extended(resources[150:])
+    path = str(tmp_path / "resources.facet_index.npz")
+    write_arrays(path, index.to_arrays(), SOURCE)
+
+    loaded = FacetIndex.from_arrays(read_arrays(path, SOURCE))
+    assert loaded.doc_count == index.doc_count
+    assert loaded.all_docs == index.all_docs
+    assert loaded.bitmaps == index.bitmaps
+    for filters in FILTERS:
+        assert loaded.filter(filters) == index.filter(filters)
+    assert read_arrays(path, (12, *SOURCE[1:])) is None  # Stored for another catalog copy
+
+def test_empty_index_roundtrip(tmp_path):
+    path = str(tmp_path / "empty.npz")
+    write_arrays(path, FacetIndex.build([]).to_arrays(), SOURCE)
+    loaded = FacetIndex.from_arrays(read_arrays(path, SOURCE))
+    assert loaded.doc_count == 0 and loaded.filter({'category': 'AI'}) == 0
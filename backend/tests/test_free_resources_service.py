@@ -0,0 +1,81 @@
+import copy
+
+import pytest
+
+from repository import CSVRepository
+from resource_catalog import ResourceCatalog
+from trigram_index import FALLBACK_MIN_HITS
+
+def resource(number, title, url=None, category='Data Science'):
+    return {'id': str(number), 'title': title, 'description': '', 'provider': 'MIT', 'category': category,
+            'level': 'Beginner', 'duration': '', 'url': url or f'https://example.com/{number}', 'embed_url': '',
+            'thumbnail': '', 'language': 'English', 'tags': '', 'rating': '4.5', 'created_at': '2024-01-01'}
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Importing the service creates its global stores under data/
+    import free_resources_service
+    entity = copy.copy(free_resources_service.RESOURCE_ENTITY)
+    entity.csv_file = str(tmp_path / "free_resources.csv")
+    service = free_resources_service.FreeResourcesService.__new__(free_resources_service.FreeResourcesService)
+    service.catalog = ResourceCatalog(entity, CSVRepository(entity))
+    service.catalog.save_interval = 0
+    return service
+
+def titles(result):
+    return [resource['title'] for resource in result['resources']]
+
+def test_misspelled_query_falls_back_to_corrected_terms(service):
+    service.catalog.apply(added=[
+        resource(1, 'Python Basics'),
+        resource(2, 'Advanced Python', category='Computer Science'),
+        resource(3, 'JavaScript Basics'),
+    ])
+
+    result = service.search_with_facets('pyhton')
+    assert sorted(titles(result)) == ['Advanced Python', 'Python Basics']
+    assert result['total'] == 2
+    assert result['facets']['category'] == {'Data Science': 1, 'Computer Science': 1}
+
+    assert titles(service.search_with_facets('pyhton basics')) == ['Python Basics']
+    assert titles(service.search_with_facets('pyhton', category='Computer Science')) == ['Advanced Python']
+    assert len(service.search_with_facets('pyhton', limit=1)['resources']) == 1
+
+def test_enough_exact_hits_mean_no_fallback(service):
+    service.catalog.apply(added=[resource(number, f'Pyhton Notes {number}') for number in range(FALLBACK_MIN_HITS)]
+                          + [resource(100, 'Python Basics')])
+
+    result = service.search_with_facets('pyhton')
+    assert result['total'] == FALLBACK_MIN_HITS
+    assert 'Python Basics' not in titles(result)
+
+def test_nothing_close_finds_nothing(service):
+    service.catalog.apply(added=[resource(1, 'Python Basics')])
+
+    result = service.search_with_facets('kubernetes')
+    assert result['resources'] == [] and result['total'] == 0
+
+def external(url, title='External course'):
+    return {'title': title, 'url': url, 'tags': ['Python']}
+
+def test_external_resources_are_added_once_per_normalized_url(service):
+    service.catalog.apply(added=[resource(1, 'Python Basics', url='https://www.example.com/python')])
+
+    result = service.add_resources_from_external([
+        external('HTTP://Example.com/python/?utm_source=feed#top'),  # Already in the catalog
+        external('https://example.com/course?id=7'),
+        external('https://www.example.com/course?id=7&fbclid=abc'),  # Same as the previous one
+        external('https://example.com/course?id=8'),                 # Another course
+    ])
+
+    assert result['added'] == 2 and result['existing'] == 2
+    statuses = [entry['status'] for entry in result['results']]
+    assert statuses == ['exists', 'added', 'exists', 'added']
+    assert result['results'][0]['id'] == '1'
+    assert result['results'][2]['id'] == result['results'][1]['id']
+    urls = sorted(resource['url'] for resource in service.catalog.snapshot().resources)
+    assert urls == ['https://example.com/course?id=7', 'https://example.com/course?id=8',
+                    'https://www.example.com/python']
+
+    again = service.add_resources_from_external([external('example.com/course?id=8&utm_medium=email')])
+    assert again['added'] == 0 and again['results'][0]['id'] == result['results'][3]['id']
@@ -0,0 +1,41 @@
+import id_generator
+from id_generator import IdGenerator, id_timestamp_ms, is_generated_id, min_id_for
+
+class Clock:
+    def __init__(self, now_ms):
+        self.now_ms = now_ms
+
+    def time_ns(self):
+        return self.now_ms * 1_000_000
+
+def test_ids_within_one_millisecond_strictly_increase(monkeypatch):
+    monkeypatch.setattr(id_generator, 'time', Clock(1_700_000_000_000))
+    generator = IdGenerator()
+    ids = [generator.new_id() for _ in range(1_000)]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    assert {id_timestamp_ms(value) for value in ids} == {1_700_000_000_000}
+
+def test_ids_sort_by_time_even_if_the_clock_steps_back(monkeypatch):
+    clock = Clock(1_700_000_000_000)
+    monkeypatch.setattr(id_generator, 'time', clock)
+    generator = IdGenerator()
+    ids = []
+    for now_ms in [1_700_000_000_000, 1_700_000_000_005, 1_700_000_000_002, 1_700_000_060_000]:
+        clock.now_ms = now_ms
+        ids.append(generator.new_id())
+
+    assert ids == sorted(ids)
+    assert [id_timestamp_ms(value) for value in ids] == [
+        1_700_000_000_000, 1_700_000_000_005, 1_700_000_000_005, 1_700_000_060_000]
+
+def test_min_id_for_bounds_ids_from_that_millisecond_on(monkeypatch):
+    clock = Clock(1_700_000_000_000)
+    monkeypatch.setattr(id_generator, 'time', clock)
+    generator = IdGenerator()
+    before = generator.new_id()
+    clock.now_ms += 1
+    after = generator.new_id()
+
+    assert before < min_id_for(clock.now_ms) <= after
+    assert is_generated_id(after) and is_generated_id(min_id_for(0))
+    assert not is_generated_id('user-1_20240101120000')
@@ -0,0 +1,115 @@
+import copy
+import os
+
+import pytest
+
+from repository import CSVRepository
+
+@pytest.fixture
+def learning(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Importing learning_store creates its global store under data/
+    import learning_store
+    return learning_store
+
+@pytest.fixture
+def store(learning, tmp_path):
+    def repository(entity):
+        entity = copy.copy(entity)
+        entity.csv_file = str(tmp_path / "store" / os.path.basename(entity.csv_file))
+        return CSVRepository(entity)
+
+    store = learning.LearningStore(repository(learning.FOLDER_ENTITY), repository(learning.ITEM_ENTITY),
+                                   repository(learning.FOLDER_STATS_ENTITY))
+    store.create_folder('f1', 'u1', 'First', '', 'blue')
+    store.create_folder('f2', 'u1', 'Second', '', 'green')
+    store.add_items('u1', 'f1', [{'id': f'i{number}', 'title': f'Item {number}'} for number in range(1, 6)])
+    return store
+
+def item_order(store, folder_id='f1'):
+    return [item['id'] for item in store.folder_items('u1', folder_id)]
+
+def test_move_between_neighbours_writes_one_key(store):
+    keys = {item['id']: item['order_key'] for item in store.folder_items('u1', 'f1')}
+    moved = store.move_item('u1', 'f1', 'i5', after_id='i2')
+
+    assert item_order(store) == ['i1', 'i2', 'i5', 'i3', 'i4']
+    assert keys['i2'] < moved['order_key'] < keys['i3']
+    assert {item['id']: item['order_key'] for item in store.folder_items('u1', 'f1') if item['id'] != 'i5'} == \
+        {item_id: key for item_id, key in keys.items() if item_id != 'i5'}
+
+def test_move_to_head_and_tail(store):
+    store.move_item('u1', 'f1', 'i3')
+    assert item_order(store) == ['i3', 'i1', 'i2', 'i4', 'i5']
+    store.move_item('u1', 'f1', 'i1', after_id='i5')
+    assert item_order(store) == ['i3', 'i2', 'i4', 'i5', 'i1']
+
+def test_move_across_folders_updates_both_orders_and_counters(store):
+    store.add_items('u1', 'f2', [{'id': 'j1', 'title': 'Other'}])
+    store.toggle_item('u1', 'i2')
+
+    store.move_item('u1', 'f1', 'i2', after_id='j1', to_folder_id='f2')
+    store.move_item('u1', 'f1', 'i4', to_folder_id='f2')
+
+    assert item_order(store) == ['i1', 'i3', 'i5']
+    assert item_order(store, 'f2') == ['i4', 'j1', 'i2']
+    progress = {folder['id']: (folder['total_items'], folder['completed_items'])
+                for folder in store.list_folders('u1')}
+    assert progress == {'f1': (3, 0), 'f2': (3, 1)}
+
+def test_move_rejects_anchors_outside_the_target_folder(store):
+    store.add_items('u1', 'f2', [{'id': 'j1', 'title': 'Other'}])
+    with pytest.raises(ValueError):
+        store.move_item('u1', 'f1', 'i1', after_id='j1')
+    with pytest.raises(ValueError):
+        store.move_item('u1', 'f1', 'i1', after_id='i2', to_folder_id='f2')
+    with pytest.raises(ValueError):
+        store.move_item('u1', 'f1', 'i1', to_folder_id='missing')
+    assert store.move_item('u2', 'f1', 'i1') is None
+    assert item_order(store) == ['i1', 'i2', 'i3', 'i4', 'i5']
+
+def test_move_rebuilds_an_order_that_missed_a_write(store):
+    item_order(store)  # Cache the order
+    store.items.update('i4', order_key='')  # Written around the store, like a legacy item without a key
+    store.items.put({**store.items.get('i1'), 'id': 'i6', 'order_key': store.items.get('i5')['order_key'] + 'V'})
+
+    store.move_item('u1', 'f1', 'i6', after_id='i4')
+
+    assert item_order(store)[:4] == ['i1', 'i2', 'i3', 'i5'] and item_order(store)[4:] == ['i4', 'i6']
+
+def test_reorder_keeps_keys_of_items_already_in_order(store):
+    assert store.reorder_items('u1', 'f1', ['i2', 'i3', 'i4', 'i5', 'i1']) == 1
+    assert item_order(store) == ['i2', 'i3', 'i4', 'i5', 'i1']
+    with pytest.raises(ValueError):
+        store.reorder_items('u1', 'f1', ['i1', 'i2'])
+
+def test_pages_follow_the_order_and_end_without_a_cursor(store):
+    pages = []
+    cursor = None
+    while True:
+        items, cursor = store.folder_items_page('u1', 'f1', 2, cursor)
+        pages.append([item['id'] for item in items])
+        if cursor is None:
+            break
+    assert pages == [['i1', 'i2'], ['i3', 'i4'], ['i5']]
+
+    items, cursor = store.folder_items_page('u1', 'f1', 5)
+    assert len(items) == 5 and cursor is None
+
+def test_no_cursor_when_only_other_users_items_follow(store):
+    store.add_items('u2', 'f1', [{'id': 'x1', 'title': 'Not mine'}, {'id': 'x2', 'title': 'Not mine'}])
+    items, cursor = store.folder_items_page('u1', 'f1', 5)
+    assert [item['id'] for item in items] == ['i1', 'i2', 'i3', 'i4', 'i5'] and cursor is None
+
+def test_pages_stay_stable_when_items_move_between_requests(store):
+    items, cursor = store.folder_items_page('u1', 'f1', 2)
+    store.move_item('u1', 'f1', 'i1', after_id='i5')  # Moves past the cursor: shows up again at the end
+    rest = []
+    while cursor is not None:
+        items, cursor = store.folder_items_page('u1', 'f1', 2, cursor)
+        rest.extend(item['id'] for item in items)
+    assert rest == ['i3', 'i4', 'i5', 'i1']
+
+@pytest.mark.parametrize('cursor', ['not base64!', 'e30', 'WyJhIl0', 'ImFiIg'])
+def test_malformed_cursor_is_rejected(store, cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        store.folder_items_page('u1', 'f1', 2, cursor)
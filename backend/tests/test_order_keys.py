@@ -0,0 +1,47 @@
+import random
+
+import pytest
+
+from order_keys import key_between, keys_between
+
+def test_appended_keys_stay_short_and_ordered():
+    keys = []
+    for _ in range(10_000):
+        keys.append(key_between(keys[-1] if keys else None, None))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert max(map(len, keys)) <= 4
+
+def test_prepended_keys_stay_short_and_ordered():
+    keys = []
+    for _ in range(10_000):
+        keys.insert(0, key_between(None, keys[0] if keys else None))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert max(map(len, keys)) <= 4
+
+def test_batches_appended_like_add_items_stay_short():
+    keys = []
+    for _ in range(2_500):
+        keys.extend(keys_between(keys[-1] if keys else None, None, 4))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert max(map(len, keys)) <= 4
+
+def test_keys_between_neighbours():
+    low, high = key_between(None, None), None
+    high = key_between(low, None)
+    keys = keys_between(low, high, 1_000)
+    assert [low] + keys + [high] == sorted(set([low] + keys + [high]))
+    assert max(map(len, keys)) <= 4
+
+def test_random_inserts_keep_order():
+    rng = random.Random(3)
+    keys = []
+    for _ in range(3_000):
+        position = rng.randint(0, len(keys))
+        before = keys[position - 1] if position > 0 else None
+        after = keys[position] if position < len(keys) else None
+        keys.insert(position, key_between(before, after))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+
+def test_out_of_order_bounds_are_rejected():
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from relevance_index import RelevanceIndex, calculate_relevance
+
+def reference_ranking(resources, goals, limit):
+    """The per-resource loop get_resources_for_learning_path ran before RelevanceIndex"""
+    relevant = []
+    scores = {}
+    for goal in goals:
+        goal_lower = goal.lower()
+        for resource in resources:
+            if (goal_lower in resource['title'].lower() or
+                    goal_lower in resource['description'].lower() or
+                    any(goal_lower in tag.lower() for tag in resource['tags'])):
+                if resource['rating'] >= 4.0:
+                    if resource['id'] not in scores:
+                        relevant.append(resource)
+                    scores[resource['id']] = calculate_relevance(resource, goal)
+    relevant.sort(key=lambda resource: (scores[resource['id']], resource['rating']), reverse=True)
+    return [(resource['id'], scores[resource['id']]) for resource in relevant[:limit]]
+
+def resource(id, title, description='', tags=(), category='', provider='', rating=4.5):
+    return {'id': id, 'title': title, 'description': description, 'tags': list(tags),
+            'category': category, 'provider': provider, 'rating': rating}
+
+# Small catalog with score and rating ties, multi-goal matches and
+# low-rated matches
+SAMPLE = [
+    resource('r0', 'Python Basics', 'Learn python', tags=['Python'], category='Programming', provider='MIT'),
+    resource('r1', 'Web Development', 'HTML and CSS', tags=['Web', 'Frontend'], category='Web Development'),
+    resource('r2', 'Python for Data', 'Pandas and numpy', tags=['Python', 'Data'], provider='Coursera'),
+    resource('r3', 'Intro to Python', 'First steps', tags=['python'], category='Programming', provider='MIT'),
+    resource('r4', 'Python Basics', 'Learn python', tags=['Python'], category='Programming', provider='MIT'),
+    resource('r5', 'Data Science', 'Python and statistics', tags=['Data'], rating=4.9),
+    resource('r6', 'Advanced Python', 'Decorators', tags=['Python'], rating=3.9),
+    resource('r7', 'Web APIs with Python', 'Flask and FastAPI', tags=['Web', 'Backend'], provider='edX'),
+    resource('r8', 'Design Systems', 'Reusable web components', tags=['Design'], rating=4.0),
+    resource('r9', 'Statistics', 'Probability', tags=['Math'], category='Data Science', provider='Stanford'),
+]
+
+@pytest.mark.parametrize('goals', [
+    ['python'],
+    ['Python', 'web'],
+    ['web', 'python', 'data'],
+    ['data', 'DATA'],
+    ['statistics', 'nothing-matches'],
+    [''],
+])
+def test_rank_matches_the_reference_loop(goals):
+    index = RelevanceIndex.build(SAMPLE)
+    for limit in (1, 3, 15):
+        ranked = [(SAMPLE[doc]['id'], score) for doc, score in index.rank(goals, limit=limit)]
+        assert ranked == reference_ranking(SAMPLE, goals, limit)
+
+def test_equal_scores_and_ratings_keep_first_match_order():
+    index = RelevanceIndex.build(SAMPLE)
+    ranked = [SAMPLE[doc]['id'] for doc, _ in index.rank(['web', 'python'], limit=15)]
+    # r0 and r4 are identical, so they stay in catalog order
+    assert ranked.index('r0') < ranked.index('r4')
+    assert 'r6' not in ranked  # Rated below 4.0
+
+def test_rank_matches_the_reference_loop_on_a_generated_catalog():
+    rng = random.Random(18)
+    topics = ['python', 'web', 'data', 'design', 'cloud', 'machine learning']
+    catalog = [resource(f'g{i}', ' '.join(rng.choices(topics, k=2)).title(),
+                        ' '.join(rng.choices(topics + ['intro', 'guide'], k=5)),
+                        tags=[topic.title() for topic in rng.sample(topics, 2)],
+                        category=rng.choice(['Data Science', 'Programming', 'Design']),
+                        provider=rng.choice(['MIT', 'YouTube', 'freeCodeCamp', 'Blog']),
+                        rating=rng.choice([3.8, 4.0, 4.2, 4.5, 5.0]))
+               for i in range(500)]
+    index = RelevanceIndex.build(catalog)
+    goals = ['Machine Learning', 'data', 'web design']
+    ranked = [(catalog[doc]['id'], score) for doc, score in index.rank(goals, limit=15)]
+    assert ranked == reference_ranking(catalog, goals, 15)
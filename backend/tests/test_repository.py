@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+
+import pytest
+
+import repository
+from repository import CSVRepository, Entity, Repository, SQLiteRepository
+
+@pytest.fixture(params=['csv', 'sqlite'])
+def events(request, tmp_path):
+    entity = Entity("events", str(tmp_path / "events.csv"), ['id', 'user_id', 'timestamp'],
+                    indexes=['user_id'], ordered_indexes=[('user_id', 'timestamp')])
+    if request.param == 'csv':
+        return CSVRepository(entity)
+    return SQLiteRepository(entity, str(tmp_path / "events.db"))
+
+def test_latest_by_returns_newest_rows_first(events):
+    events.add_many([
+        {'id': '1', 'user_id': 'a', 'timestamp': '2024-01-03'},
+        {'id': '2', 'user_id': 'b', 'timestamp': '2024-01-09'},
+        {'id': '3', 'user_id': 'a', 'timestamp': '2024-01-01'},
+        {'id': '4', 'user_id': 'a', 'timestamp': '2024-01-03'},
+        {'id': '5', 'user_id': 'a', 'timestamp': '2024-01-02'},
+    ])
+    events.update('3', timestamp='2024-01-05')
+    events.delete('5')
+
+    assert [row['id'] for row in events.latest_by('user_id', 'a', 'timestamp', 10)] == ['3', '4', '1']
+    assert [row['id'] for row in events.latest_by('user_id', 'a', 'timestamp', 2)] == ['3', '4']
+    assert events.latest_by('user_id', 'a', 'timestamp', 0) == []
+    assert events.latest_by('user_id', 'nobody', 'timestamp', 5) == []
+
+def test_latest_by_since_reads_only_the_newer_range(events):
+    events.add_many([{'id': str(number), 'user_id': 'a', 'timestamp': f'2024-01-{number:02d}'}
+                     for number in range(1, 10)])
+
+    newest = events.latest_by('user_id', 'a', 'timestamp', 10, since='2024-01-07')
+    assert [row['id'] for row in newest] == ['9', '8', '7']
+    assert [row['id'] for row in events.latest_by('user_id', 'a', 'timestamp', 2, since='2024-01-03')] == ['9', '8']
+    assert events.latest_by('user_id', 'a', 'timestamp', 10, since='2024-02-01') == []
+
+def test_incomplete_backend_fails_on_instantiation(tmp_path):
+    class ReadOnlyRepository(Repository):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match='abstract'):
+        ReadOnlyRepository(Entity("events", str(tmp_path / "events.csv"), ['id']))
+
+def write_and_delete(csv_file, prefix, count, atomic_writes):
+    """Add rows one at a time, deleting every fifth one again, which rewrites the file"""
+    items = CSVRepository(Entity("items", csv_file, ['id', 'value'], atomic_writes=atomic_writes))
+    for number in range(count):
+        items.put({'id': f'{prefix}{number}', 'value': str(number)})
+        if number % 5 == 4:
+            items.delete(f'{prefix}{number}')
+
+@pytest.mark.skipif(repository.fcntl is None or 'fork' not in multiprocessing.get_all_start_methods(),
+                    reason="needs fcntl and fork")
+@pytest.mark.parametrize('atomic_writes', [False, True])
+def test_writer_processes_do_not_lose_each_others_rows(tmp_path, atomic_writes):
+    csv_file = str(tmp_path / "items.csv")
+    CSVRepository(Entity("items", csv_file, ['id', 'value']))
+    context = multiprocessing.get_context('fork')
+    writers = [context.Process(target=write_and_delete, args=(csv_file, prefix, 150, atomic_writes))
+               for prefix in ('a', 'b')]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join(60)
+        assert writer.exitcode == 0
+
+    expected = {f'{prefix}{number}' for prefix in ('a', 'b') for number in range(150) if number % 5 != 4}
+    stored = CSVRepository(Entity("items", csv_file, ['id', 'value'])).scan()
+    assert sorted(row['id'] for row in stored) == sorted(expected)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+@pytest.mark.parametrize('backend', ['csv', 'sqlite'])
+def test_legacy_rows_sharing_an_id_are_all_kept(tmp_path, backend):
+    csv_file = tmp_path / "activities.csv"
+    # Written before the 'kind' column existed, so opening it migrates the header
+    csv_file.write_text("id,user_id,title\n"
+                        "u1_20240101120000,u1,first\n"
+                        "u1_20240101120000,u1,second\n"
+                        "u1_20240101120001,u1,third\n", encoding='utf-8')
+    entity = Entity("activities", str(csv_file), ['id', 'user_id', 'title', 'kind'],
+                    indexes=['user_id'], legacy_ids=True)
+
+    def open_repository():
+        if backend == 'csv':
+            return CSVRepository(entity)
+        return SQLiteRepository(entity, str(tmp_path / "activities.db"))
+
+    activities = open_repository()
+    assert sorted(row['title'] for row in activities.scan_by('user_id', 'u1')) == ['first', 'second', 'third']
+    assert activities.get('u1_20240101120000-2')['title'] == 'second'
+
+    activities.delete('u1_20240101120001')  # Rewrites the file
+    reopened = open_repository()
+    assert sorted((row['id'], row['title']) for row in reopened.scan()) == [
+        ('u1_20240101120000', 'first'), ('u1_20240101120000-2', 'second')]
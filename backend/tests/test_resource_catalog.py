@@ -0,0 +1,89 @@
+import pytest
+
+from facet_index import FacetIndex
+from repository import CSVRepository, Entity
+from resource_catalog import ResourceCatalog, normalize_url
+from search_index import SearchIndex
+
+FIELDS = ['id', 'title', 'description', 'provider', 'category', 'level', 'duration', 'url', 'embed_url',
+          'thumbnail', 'language', 'tags', 'rating', 'created_at']
+
+def row(number, title=None):
+    return {'id': str(number), 'title': title or f'Python course {number}', 'description': 'Learn python',
+            'provider': 'MIT', 'category': 'Data Science', 'level': 'Beginner', 'duration': '2 hours',
+            'url': f'https://example.com/{number}', 'embed_url': '', 'thumbnail': '', 'language': 'English',
+            'tags': 'Python,Data', 'rating': '4.5', 'created_at': '2024-01-01'}
+
+class NoCSV(CSVRepository):
+    """Repository whose rows cannot be read, so a catalog must come from the binary copy"""
+
+    def scan(self):
+        raise AssertionError("read the CSV")
+
+@pytest.fixture
+def entity(tmp_path):
+    return Entity("free_resources", str(tmp_path / "free_resources.csv"), FIELDS)
+
+def open_catalog(entity, repository=None):
+    catalog = ResourceCatalog(entity, repository or CSVRepository(entity))
+    catalog.save_interval = 0
+    catalog.store_derived('search_index', SearchIndex.to_arrays, SearchIndex.from_arrays)
+    catalog.store_derived('facet_index', FacetIndex.to_arrays, FacetIndex.from_arrays)
+    return catalog
+
+def not_built(snapshot):
+    raise AssertionError("rebuilt instead of loaded")
+
+def test_startup_loads_the_binary_copy_and_stored_indexes(entity):
+    writer = open_catalog(entity)
+    writer.apply(added=[row(number) for number in range(1, 6)])
+    snapshot = writer.snapshot()
+    expected = snapshot.derive('search_index', lambda snapshot: SearchIndex.build(snapshot.resources))
+    snapshot.derive('facet_index', lambda snapshot: FacetIndex.build(snapshot.resources))
+
+    reader = open_catalog(entity, NoCSV(entity))
+    loaded = reader.snapshot()
+    assert loaded.resources == snapshot.resources
+    index = loaded.derive('search_index', not_built)
+    assert index.search('python course', 3) == expected.search('python course', 3)
+    assert loaded.derive('facet_index', not_built).filter({'level': 'Beginner'}) == 0b11111
+
+def test_changed_csv_falls_back_to_parsing_it(entity):
+    writer = open_catalog(entity)
+    writer.apply(added=[row(1), row(2)])
+    writer.snapshot().derive('search_index', lambda snapshot: SearchIndex.build(snapshot.resources))
+
+    CSVRepository(entity).put(row(3, 'Rust course'))  # Another writer: the copy's CSV signature is stale now
+
+    reader = open_catalog(entity)
+    snapshot = reader.snapshot()
+    assert [resource['id'] for resource in snapshot.resources] == ['1', '2', '3']
+    built = []
+    index = snapshot.derive('search_index', lambda snapshot: built.append(1) or SearchIndex.build(snapshot.resources))
+    assert built
+    assert [doc for doc, _ in index.search('rust')] == [2]
+
+@pytest.mark.parametrize('variant', [
+    'https://example.com/course/python',
+    'HTTPS://Example.COM/course/python',
+    'http://www.example.com/course/python',
+    'https://example.com/course/python/',
+    'example.com/course/python',
+    'https://example.com/course/python?utm_source=news&utm_campaign=fall',
+    'https://example.com/course/python?feature=share&ref=home&si=abc&fbclid=1&gclid=2',
+    'https://example.com/course/python#syllabus',
+])
+def test_normalize_url_ignores_presentation_and_tracking(variant):
+    assert normalize_url(variant) == 'example.com/course/python'
+
+def test_normalize_url_keeps_meaningful_parameters():
+    assert normalize_url('https://example.com/course?id=1&utm_medium=x') == 'example.com/course?id=1'
+    assert normalize_url('https://example.com/course?id=1') != normalize_url('https://example.com/course?id=2')
+    assert normalize_url('https://example.com/c?b=2&a=1') == normalize_url('https://example.com/c?a=1&b=2')
+    assert normalize_url('https://example.com/Course') != normalize_url('https://example.com/course')
+
+def test_normalize_url_maps_youtube_links_to_the_video():
+    assert (normalize_url('https://youtu.be/SqcY0GlETPk?si=x')
+            == normalize_url('https://www.youtube.com/watch?v=SqcY0GlETPk&feature=share')
+            == normalize_url('https://www.youtube.com/embed/SqcY0GlETPk'))
+    assert normalize_url('https://youtu.be/SqcY0GlETPk') != normalize_url('https://youtu.be/RLtyhiShda8')
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+import search_index
+from search_index import SearchIndex, tokenize
+
+def resource(title, description='', tags=(), category='', provider=''):
+    return {'title': title, 'description': description, 'tags': list(tags), 'category': category,
+            'provider': provider}
+
+CATALOG = [
+    resource('Learn Python', 'Start programming today'),
+    resource('Machine Learning Course', 'Models and data', tags=['AI']),
+    resource('E-learning platforms compared', 'Which site to learn on'),
+    resource('Node.js Basics', 'Server-side JavaScript', tags=['Node.js', 'Backend']),
+    resource('C++ and C# for games', 'Systems programming'),
+    resource('Data Science Handbook', 'Learn data analysis', category='Data Science', provider='MIT'),
+]
+
+@pytest.fixture
+def index():
+    return SearchIndex.build(CATALOG)
+
+def found(index, query):
+    return sorted(doc for doc, _ in index.search(query))
+
+def test_queries_match_whole_words_not_substrings(index):
+    # "learn" is a word of its own in these resources, not a prefix of "learning"
+    assert found(index, 'Learn') == [0, 2, 5]
+    assert found(index, 'learning') == [1, 2]
+    assert found(index, 'lear') == []
+    assert found(index, 'scien') == []
+
+def test_every_query_term_must_match_in_some_field(index):
+    assert found(index, 'learn data') == [5]  # 'data' from the title, 'learn' from the description
+    assert found(index, 'data mit') == [5]    # Provider
+    assert found(index, 'backend node.js') == [3]  # Tags
+    assert found(index, 'learn cobol') == []
+
+def test_symbols_stay_part_of_their_words(index):
+    assert tokenize('Node.js, C++ & C#!') == ['node.js', 'c++', 'c#']
+    assert found(index, 'c++') == [4]
+    assert found(index, 'c#') == [4]
+    assert found(index, 'node') == []
+
+def test_title_matches_rank_above_description_matches(index):
+    assert [doc for doc, _ in index.search('learn')][:1] == [0]
+
+def random_catalog(rng, size):
+    words = ['python', 'data', 'web', 'design', 'cloud', 'security', 'react', 'course', 'guide']
+    return [resource(' '.join(rng.choices(words, k=rng.randint(1, 4))),
+                     ' '.join(rng.choices(words, k=rng.randint(0, 8))),
+                     tags=rng.sample(words, rng.randint(0, 2))) for _ in range(size)]
+
+@pytest.mark.parametrize('direct_matches', [0, 4096])
+def test_top_k_is_the_head_of_the_full_ranking(monkeypatch, direct_matches):
+    monkeypatch.setattr(search_index, 'DIRECT_SCORING_MATCHES', direct_matches)
+    monkeypatch.setattr(search_index, 'IMPACT_BLOCK', 4)
+    rng = random.Random(5)
+    index = SearchIndex.build(random_catalog(rng, 2_000))
+    for query in ['python', 'python data', 'web design course', 'react security']:
+        ranking = index.search(query)
+        scores = [score for _, score in ranking]
+        assert scores == sorted(scores, reverse=True)
+        for limit in [1, 7, 50]:
+            assert index.search(query, limit) == ranking[:limit]
+        candidates = rng.getrandbits(index.doc_count)
+        assert index.search(query, 10, candidates=candidates) == \
+            [(doc, score) for doc, score in ranking if candidates >> doc & 1][:10]
+
+def test_unknown_terms_are_not_cached(index):
+    for number in range(100):
+        assert index.search(f'python zz{number}') == []
+        assert index.term_bits(f'zz{number}') == 0
+    assert not [term for term in index._arrays if term.startswith('zz')]
+
+def test_term_cache_is_bounded_and_not_copied(monkeypatch, index):
+    monkeypatch.setattr(search_index, 'TERM_CACHE_SIZE', 2)
+    for query in ['learn', 'data', 'python', 'learn data']:
+        expected = SearchIndex.build(CATALOG).search(query)
+        assert index.search(query) == expected
+    assert list(index._arrays) == ['learn', 'data']
+
+    extended = index.extended([resource('Learn Rust')])
+    assert not extended._arrays
+    assert found(extended, 'learn') == [0, 2, 5, 6]
+    assert found(index, 'learn') == [0, 2, 5]
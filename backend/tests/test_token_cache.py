@@ -0,0 +1,58 @@
+import pytest
+
+import token_cache as token_cache_module
+from token_cache import TokenCache
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(token_cache_module, 'time', clock)
+    return clock
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TokenCache(max_size=2)
+    cache.put('a', {'exp': 2_000}, 'user-a')
+    cache.put('b', {'exp': 2_000}, 'user-b')
+    assert cache.get('a') == ({'exp': 2_000}, 'user-a')  # 'b' is now the oldest
+
+    cache.put('c', {'exp': 2_000}, 'user-c')
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+
+def test_entries_expire_at_their_exp_claim(clock):
+    cache = TokenCache()
+    cache.put('short', {'exp': 1_010}, 'user-a')
+    cache.put('long', {'exp': 1_100}, 'user-b')
+    assert cache.get('short') is not None
+
+    clock.now = 1_010
+    assert cache.get('short') is None
+    assert cache.get('long') is not None
+
+    clock.now = 1_200
+    cache.put('new', {'exp': 1_300}, 'user-c')  # Purges 'long' without it being read
+    assert len(cache.entries) == 1
+    assert cache.stats()['expirations'] == 2
+
+def test_tokens_without_exp_are_not_cached(clock):
+    cache = TokenCache()
+    cache.put('forever', {'sub': 'a@example.com'}, 'user-a')
+    assert cache.get('forever') is None
+
+def test_generation_change_invalidates_entries(clock):
+    cache = TokenCache()
+    cache.put('token', {'exp': 2_000}, 'user-a', generation=3)
+
+    assert cache.get('token', generation=3) is not None
+    assert cache.get('token', generation=4) is None
+    # The stale entry is dropped, not kept for the old generation
+    assert cache.get('token', generation=3) is None
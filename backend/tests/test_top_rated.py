@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from repository import CSVRepository, Entity
+from resource_catalog import ResourceCatalog
+from top_rated import TopRated
+
+CATEGORIES = ['AI', 'Design', 'Data Science', 'Web Development']
+
+def catalog(count, seed=5):
+    rng = random.Random(seed)
+    # Few distinct ratings, so many resources tie
+    return [{'id': str(doc), 'category': rng.choice(CATEGORIES), 'rating': rng.choice([3.5, 4.0, 4.5, 4.8])}
+            for doc in range(count)]
+
+def expected(resources, categories, k):
+    """The sort the heap merge replaced: stable, so ties keep catalog order"""
+    docs = [doc for doc, resource in enumerate(resources) if resource['category'] in categories]
+    return tuple(sorted(docs, key=lambda doc: resources[doc]['rating'], reverse=True)[:k])
+
+@pytest.mark.parametrize('categories', [['AI'], ['AI', 'Design'], ['Design', 'AI', 'Web Development'],
+                                        CATEGORIES, ['Cooking'], ['AI', 'Cooking']])
+def test_merge_matches_sorting_by_rating(categories):
+    resources = catalog(200)
+    index = TopRated.build(resources[:120]).extended(resources[120:])
+    for k in (1, 3, 10):
+        assert index.best(categories, k) == expected(resources, categories, k)
+
+def test_equal_ratings_keep_catalog_order():
+    resources = [{'category': 'AI', 'rating': 4.5} for _ in range(4)] + [{'category': 'Design', 'rating': 4.5}]
+    index = TopRated.build(resources)
+    assert index.best(['Design', 'AI'], 10) == (0, 1, 2, 3, 4)
+
+def test_k_larger_than_the_catalog_returns_everything():
+    resources = catalog(6)
+    index = TopRated.build(resources, depth=50)
+    assert index.best(CATEGORIES, 50) == expected(resources, CATEGORIES, 50)
+    assert len(index.best(CATEGORIES, 50)) == 6
+    assert len(TopRated.build(catalog(30)).best(CATEGORIES, 50)) == 10  # At most depth
+
+def row(number, category, rating):
+    return {'id': str(number), 'title': f'Course {number}', 'description': '', 'provider': 'MIT',
+            'category': category, 'level': 'Beginner', 'duration': '', 'url': f'https://example.com/{number}',
+            'embed_url': '', 'thumbnail': '', 'language': 'English', 'tags': '', 'rating': str(rating),
+            'created_at': '2024-01-01'}
+
+def top_rated(snapshot):
+    return snapshot.derive('top_rated', lambda snapshot: TopRated.build(snapshot.resources), lambda index, added: index.extended(added))
+
+def test_rating_update_reorders_the_next_snapshot(tmp_path):
+    entity = Entity("free_resources", str(tmp_path / "free_resources.csv"), list(row(0, '', 0)))
+    resources = ResourceCatalog(entity, CSVRepository(entity))
+    resources.save_interval = 0
+    resources.apply(added=[row(1, 'AI', 4.0), row(2, 'AI', 4.5), row(3, 'Design', 4.2)])
+    before = resources.snapshot()
+    assert [before.resources[doc]['id'] for doc in top_rated(before).best(['AI', 'Design'], 3)] == ['2', '3', '1']
+
+    after, _ = resources.apply(added=[row(1, 'AI', 4.9)], removed=['1'])
+    ids = [after.resources[doc]['id'] for doc in top_rated(after).best(['AI', 'Design'], 3)]
+    assert ids == ['1', '2', '3']
+    assert ids == [resource['id'] for resource in sorted(after.resources, key=lambda resource: resource['rating'], reverse=True)]
@@ -0,0 +1,39 @@
+import random
+
+from trigram_index import TrigramIndex, trigrams
+
+TEXTS = ['Learn Python', 'Python for Data Science', 'JavaScript Basics', 'Machine Learning',
+         'Data Structures and Algorithms', 'React Native', 'Node.js Backend', 'Deep Learning']
+
+def dice(first, second):
+    first, second = set(trigrams(first)), set(trigrams(second))
+    return 2 * len(first & second) / (len(first) + len(second))
+
+def test_corrects_misspelled_terms_and_keeps_known_ones():
+    index = TrigramIndex.build(TEXTS)
+    assert index.correct('pyhton') == 'python'
+    assert index.correct('lerning pyton') == 'learning python'
+    assert index.correct('machine algoritms') == 'machine algorithms'
+    assert index.correct('python') is None  # Nothing to correct
+
+def test_unrelated_and_short_terms_are_not_corrected():
+    index = TrigramIndex.build(TEXTS)
+    assert index.similar('kubernetes') == []
+    assert index.correct('kubernetes') is None
+    assert index.correct('xq') is None  # Too short to correct
+
+def test_known_callback_decides_what_needs_correcting():
+    index = TrigramIndex.build(TEXTS)
+    assert index.correct('pyhton', known=lambda term: True) is None
+
+def test_similar_finds_what_scoring_every_term_finds():
+    rng = random.Random(7)
+    letters = 'aeinorst'  # Few letters, so common trigrams are posted for much of the vocabulary
+    vocabulary = {''.join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(2000)}
+    index = TrigramIndex.build(sorted(vocabulary)[:1000]).extended(sorted(vocabulary)[1000:])
+
+    for _ in range(50):
+        query = ''.join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        expected = sorted(dice(query, term) for term in vocabulary if dice(query, term) >= 0.4)
+        found = [similarity for _, similarity in index.similar(query, limit=3)]
+        assert found == sorted(expected, reverse=True)[:3]
@@ -0,0 +1,78 @@
+import os
+
+from user_store import UserStore
+
+def make_user(number, **fields):
+    return {'id': f'user-{number}', 'email': f'user{number}@example.com', 'password_hash': 'hash',
+            'role': 'student', 'profession': '', 'created_at': '2024-01-01', **fields}
+
+def test_other_store_catches_up_by_reading_only_appended_rows(tmp_path):
+    users_file = str(tmp_path / "users.csv")
+    writer = UserStore(users_file, check_interval=0)
+    reader = UserStore(users_file, check_interval=0)
+    assert writer.create_user(make_user(1))
+    assert reader.get_by_email('user1@example.com')['id'] == 'user-1'
+
+    assert writer.create_user(make_user(2))
+    with open(users_file, 'a') as file:
+        file.write('user-3,user3@exam')  # A row still being written by another process
+
+    assert reader.get_by_id('user-2')['email'] == 'user2@example.com'
+    assert reader.get_by_id('user-3') is None
+    assert reader._offset == os.path.getsize(users_file) - len('user-3,user3@exam')
+
+def test_duplicate_email_is_rejected_across_stores(tmp_path):
+    users_file = str(tmp_path / "users.csv")
+    first = UserStore(users_file)
+    second = UserStore(users_file)
+    assert first.create_user(make_user(1))
+    assert not second.create_user(make_user(2, email='user1@example.com'))
+    assert len(second) == 1
+
+def test_update_user_creates_a_missing_file(tmp_path):
+    store = UserStore(str(tmp_path / "data" / "users.csv"))
+    assert store.update_user('user-1', role='recruiter') is None
+    assert os.path.exists(store.users_file)
+
+def test_updates_compact_and_other_stores_reload(tmp_path):
+    users_file = str(tmp_path / "users.csv")
+    writer = UserStore(users_file, check_interval=0, compact_threshold=3)
+    reader = UserStore(users_file, check_interval=0)
+    writer.create_user(make_user(1))
+    writer.create_user(make_user(2))
+    assert reader.get_by_id('user-1')['role'] == 'student'
+    generation = reader.generation
+
+    writer.update_user('user-1', role='recruiter')
+    writer.update_user('user-1', email='renamed@example.com')
+    writer.update_user('user-2', profession='Engineer')  # Third superseded row: compacts
+
+    assert writer.stale_rows == 0
+    with open(users_file) as file:
+        assert len(file.read().splitlines()) == 3  # Header and one row per user
+    assert reader.get_by_email('renamed@example.com')['role'] == 'recruiter'
+    assert reader.get_by_email('user1@example.com') is None
+    assert reader.get_by_id('user-2')['profession'] == 'Engineer'
+    assert reader.generation > generation
+
+def test_readers_keep_the_old_indexes_while_a_replaced_file_reloads(tmp_path, monkeypatch):
+    users_file = str(tmp_path / "users.csv")
+    writer = UserStore(users_file, check_interval=0)
+    reader = UserStore(users_file, check_interval=0)
+    writer.create_user(make_user(1))
+    writer.create_user(make_user(2))
+    assert reader.get_by_id('user-1') is not None
+    writer.compact()  # A new file, so the reader reloads it in full
+
+    seen_during_reload = []
+    read_from = reader._read_from
+
+    def observed_read_from(offset, users_by_email, users_by_id):
+        # What a reader not holding the lock sees while the file is read
+        seen_during_reload.append((reader.users_by_id.get('user-1'), reader.users_by_email.get('user2@example.com')))
+        return read_from(offset, users_by_email, users_by_id)
+
+    monkeypatch.setattr(reader, '_read_from', observed_read_from)
+    assert reader.get_by_id('user-2')['email'] == 'user2@example.com'
+    assert seen_during_reload and all(user is not None for seen in seen_during_reload for user in seen)
+    assert len(reader) == 2 and reader.stale_rows == 0
@@ -0,0 +1,98 @@
+import hashlib
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+class TokenCache:
+    """Bounded LRU of verified JWTs, each entry evicted at its exp time"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, Tuple[float, int, Dict, Any]]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str, generation: int = 0) -> Optional[Tuple[Dict, Any]]:
+        """Return (claims, user) for a cached token, or None on a miss"""
+        key = self._digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, entry_generation, claims, user = entry
+            if expires_at <= now or entry_generation != generation:
+                del self.entries[key]
+                if expires_at <= now:
+                    self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return claims, user
+
+    def put(self, token: str, claims: Dict, user: Any, generation: int = 0):
+        """Cache a verified token until its exp claim"""
+        expires_at = claims.get('exp')
+        if expires_at is None:
+            return
+
+        key = self._digest(token)
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            self.entries[key] = (float(expires_at), generation, claims, user)
+            self.entries.move_to_end(key)
+            heapq.heappush(self._expiry_heap, (float(expires_at), key))
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def _purge_expired(self, now: float):
+        """Drop every entry whose exp has passed"""
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self.entries[key]
+                self.expirations += 1
+
+        # Keep the heap from growing past the live entries it tracks
+        if len(self._expiry_heap) > 2 * self.max_size:
+            self._expiry_heap = [(entry[0], key) for key, entry in self.entries.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._expiry_heap = []
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+# Global token cache
+token_cache = TokenCache()
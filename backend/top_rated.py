@@ -0,0 +1,62 @@
+import heapq
+from bisect import insort
+from itertools import islice
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Resources kept per category: enough for any recommendation list
+TOP_RATED_DEPTH = 10
+
+class TopRated:
+    """The best-rated resources of each category, best first.
+
+    Entries are (-rating, doc) so ties keep catalog order, and the lists of
+    several categories merge with a heap into the same order a stable sort
+    of all their resources would give. Results are cached per category set;
+    an index belongs to one catalog snapshot, so the cache never goes stale.
+    extended() returns a new index with documents appended.
+    """
+
+    def __init__(self, depth: int = TOP_RATED_DEPTH):
+        self.depth = depth
+        self.doc_count = 0
+        self.lists: Dict[str, List[Tuple[float, int]]] = {}
+        self._cache: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
+
+    @classmethod
+    def build(cls, resources: Iterable[Dict], depth: int = TOP_RATED_DEPTH) -> "TopRated":
+        index = cls(depth)
+        index._add(list(resources))
+        return index
+
+    def _add(self, resources: Sequence[Dict]):
+        copied = set()  # Lists shared with the index this one was extended from are copied before changing
+        for resource in resources:
+            doc = self.doc_count
+            self.doc_count += 1
+            entry = (-resource['rating'], doc)
+            category = resource['category']
+            entries = self.lists.get(category)
+            if entries is not None and len(entries) >= self.depth and entry > entries[-1]:
+                continue
+            if entries is None or category not in copied:
+                entries = self.lists[category] = list(entries or [])
+                copied.add(category)
+            insort(entries, entry)
+            del entries[self.depth:]
+
+    def extended(self, resources: Iterable[Dict]) -> "TopRated":
+        """New index with resources appended; this index is left unchanged"""
+        index = TopRated(self.depth)
+        index.doc_count = self.doc_count
+        index.lists = dict(self.lists)
+        index._add(list(resources))
+        return index
+
+    def best(self, categories: Iterable[str], limit: int) -> Tuple[int, ...]:
+        """Best-rated documents across categories (at most depth), merged from their lists"""
+        key = tuple(dict.fromkeys(categories))
+        docs = self._cache.get(key)
+        if docs is None:
+            merged = heapq.merge(*(self.lists.get(category, ()) for category in key))
+            docs = self._cache[key] = tuple(doc for _, doc in islice(merged, self.depth))
+        return docs[:limit]
@@ -0,0 +1,129 @@
+import math
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from search_index import tokenize
+
+# Searches with fewer exact hits than this also try a typo-corrected query
+FALLBACK_MIN_HITS = 5
+
+# Dice coefficient of trigram sets a correction must reach ("pyhton" -> "python" is 0.43)
+TRIGRAM_MIN_SIMILARITY = 0.4
+
+# Most overlapping terms scored per query term, so lookups stay cheap on a large vocabulary
+TRIGRAM_MAX_CANDIDATES = 50
+
+# Shorter query terms are too ambiguous to correct
+MIN_CORRECTED_LENGTH = 3
+
+def trigrams(term: str) -> List[str]:
+    """Distinct character trigrams of a term, padded so its start and end count"""
+    padded = f"  {term} "
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+class TrigramIndex:
+    """Trigram postings over the distinct terms of some texts, for typo-tolerant lookups.
+
+    Only the vocabulary is indexed, not documents, so postings stay bounded
+    by the number of distinct terms however many documents share them.
+    Corrected terms are then searched for exactly. extended() returns a
+    new index with more texts added.
+    """
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.term_ids: Dict[str, int] = {}
+        self.frequencies: List[int] = []
+        self.sizes: List[int] = []
+        self.postings: Dict[str, List[int]] = {}
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "TrigramIndex":
+        index = cls()
+        index._add(texts)
+        return index
+
+    def _add(self, texts: Iterable[str], shared: bool = False):
+        copied = set()  # Posting lists shared with the index this one was extended from are copied before changing
+        # Tags and titles repeat, so each distinct text is tokenized once
+        for text, count in Counter(texts).items():
+            for term in tokenize(text):
+                term_id = self.term_ids.get(term)
+                if term_id is not None:
+                    self.frequencies[term_id] += count
+                    continue
+                term_id = self.term_ids[term] = len(self.terms)
+                self.terms.append(term)
+                self.frequencies.append(count)
+                grams = trigrams(term)
+                self.sizes.append(len(grams))
+                for gram in grams:
+                    postings = self.postings.get(gram)
+                    if postings is None or (shared and gram not in copied):
+                        postings = self.postings[gram] = list(postings or [])
+                        copied.add(gram)
+                    postings.append(term_id)
+
+    def extended(self, texts: Iterable[str]) -> "TrigramIndex":
+        """New index with texts added; this index is left unchanged"""
+        index = TrigramIndex()
+        index.terms = list(self.terms)
+        index.term_ids = dict(self.term_ids)
+        index.frequencies = list(self.frequencies)
+        index.sizes = list(self.sizes)
+        index.postings = dict(self.postings)
+        index._add(texts, shared=True)
+        return index
+
+    def __contains__(self, term: str) -> bool:
+        return term in self.term_ids
+
+    def similar(self, term: str, limit: int = 3,
+                min_similarity: float = TRIGRAM_MIN_SIMILARITY) -> List[Tuple[str, float]]:
+        """Indexed terms most like term, as (term, similarity) best first"""
+        # Rarest grams first: common ones ("ion", "ing") are posted for much of the vocabulary
+        grams = sorted(trigrams(term), key=lambda gram: len(self.postings.get(gram, ())))
+        size = len(grams)
+        # Terms too much shorter or longer cannot reach min_similarity whatever they share
+        min_size = size * min_similarity / (2 - min_similarity)
+        max_size = size * (2 - min_similarity) / min_similarity
+        # Nor can terms sharing fewer than min_overlap grams, so every match shares one
+        # of the size - min_overlap + 1 rarest grams. Only those posting lists are walked;
+        # the commoner grams are looked up for the terms found there.
+        min_overlap = max(1, math.ceil(size * min_similarity / (2 - min_similarity) - 1e-9))
+        walked = size - min_overlap + 1
+
+        overlaps = Counter()
+        for gram in grams[:walked]:
+            overlaps.update(self.postings.get(gram, ()))
+        for gram in grams[walked:]:
+            postings = self.postings.get(gram, ())  # Term ids ascending, as they were assigned
+            for term_id in overlaps:
+                position = bisect_left(postings, term_id)
+                if position < len(postings) and postings[position] == term_id:
+                    overlaps[term_id] += 1
+
+        scored = []
+        for term_id, overlap in overlaps.most_common(TRIGRAM_MAX_CANDIDATES):
+            other_size = self.sizes[term_id]
+            if not min_size <= other_size <= max_size:
+                continue
+            similarity = 2 * overlap / (size + other_size)
+            if similarity >= min_similarity:
+                scored.append((-similarity, -self.frequencies[term_id], self.terms[term_id]))
+        scored.sort()
+        return [(candidate, -negative_similarity) for negative_similarity, _, candidate in scored[:limit]]
+
+    def correct(self, query: str, known: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """query with unknown terms replaced by their closest indexed term, or None if nothing changed"""
+        known = known or self.__contains__
+        corrected = []
+        changed = False
+        for term in tokenize(query):
+            if len(term) >= MIN_CORRECTED_LENGTH and not known(term):
+                candidates = self.similar(term, limit=1)
+                if candidates:
+                    term = candidates[0][0]
+                    changed = True
+            corrected.append(term)
+        return ' '.join(corrected) if changed else None
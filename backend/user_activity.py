@@ -1,114 +1,135 @@
-
-import csv
 import os
 from datetime import datetime
 from typing import List, Dict, Optional
 import json
+from repository import Entity, get_repository
+from activity_sink import activity_sink
+from id_generator import is_generated_id, min_id_for, new_id
 
 USER_ACTIVITIES_CSV = "data/user_activities.csv"
 USER_APPLICATIONS_CSV = "data/user_applications.csv"
 
+ACTIVITY_ENTITY = Entity(
+    "user_activities", USER_ACTIVITIES_CSV,
+    ['id', 'user_id', 'activity_type', 'title', 'description', 'timestamp', 'metadata'],
+    indexes=['user_id'],
+    # Ids are time-ordered, so (user_id, id) also orders a user's activities by time
+    ordered_indexes=[('user_id', 'timestamp'), ('user_id', 'id')],
+    # Rows from before generated ids carry "<user>_<second>" ids that can repeat
+    legacy_ids=True
+)
+
+# Opportunity applications logged here and applications synced from Gmail by
+# main.py share this file, so the entity carries the fields of both
+APPLICATION_ENTITY = Entity(
+    "user_applications", USER_APPLICATIONS_CSV,
+    ['id', 'user_id', 'opportunity_id', 'opportunity_type', 'title', 'company', 'applied_date', 'status',
+     'type', 'position', 'date', 'email_subject', 'created_at'],
+    indexes=['user_id'],
+    legacy_ids=True
+)
+
 def init_activity_files():
-    """Initialize activity tracking CSV files"""
+    """Initialize activity tracking storage"""
     os.makedirs("data", exist_ok=True)
-    
-    if not os.path.exists(USER_ACTIVITIES_CSV):
-        with open(USER_ACTIVITIES_CSV, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['id', 'user_id', 'activity_type', 'title', 'description', 'timestamp', 'metadata'])
-    
-    if not os.path.exists(USER_APPLICATIONS_CSV):
-        with open(USER_APPLICATIONS_CSV, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['id', 'user_id', 'opportunity_id', 'opportunity_type', 'title', 'company', 'applied_date', 'status'])
+    get_repository(ACTIVITY_ENTITY)
+    get_repository(APPLICATION_ENTITY)
+
+def write_user_activities(activities: List[Dict]):
+    """Store a batch of queued activities with a single write"""
+    repository = get_repository(ACTIVITY_ENTITY)
+    with repository.batch():
+        for activity in activities:
+            repository.put(activity)
 
 def log_user_activity(user_id: str, activity_type: str, title: str, description: str, metadata: Dict = None):
     """Log user activity"""
     try:
-        with open(USER_ACTIVITIES_CSV, 'a', newline='') as file:
-            writer = csv.writer(file)
-            activity_id = f"{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            writer.writerow([
-                activity_id,
-                user_id,
-                activity_type,
-                title,
-                description,
-                datetime.now().isoformat(),
-                json.dumps(metadata or {})
-            ])
+        activity_sink.submit(write_user_activities, {
+            'id': new_id(),
+            'user_id': user_id,
+            'activity_type': activity_type,
+            'title': title,
+            'description': description,
+            'timestamp': datetime.now().isoformat(),
+            'metadata': json.dumps(metadata or {})
+        })
     except Exception as e:
         print(f"Error logging activity: {e}")
 
 def log_user_application(user_id: str, opportunity_id: str, opportunity_type: str, title: str, company: str):
     """Log user job/hackathon application"""
     try:
-        with open(USER_APPLICATIONS_CSV, 'a', newline='') as file:
-            writer = csv.writer(file)
-            app_id = f"app_{user_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            writer.writerow([
-                app_id,
-                user_id,
-                opportunity_id,
-                opportunity_type,
-                title,
-                company,
-                datetime.now().isoformat(),
-                'applied'
-            ])
+        get_repository(APPLICATION_ENTITY).put({
+            'id': new_id(),
+            'user_id': user_id,
+            'opportunity_id': opportunity_id,
+            'opportunity_type': opportunity_type,
+            'title': title,
+            'company': company,
+            'applied_date': datetime.now().isoformat(),
+            'status': 'applied'
+        })
     except Exception as e:
         print(f"Error logging application: {e}")
 
-def get_user_activities(user_id: str, limit: int = 10) -> List[Dict]:
-    """Get user's recent activities"""
+def _activities_since(user_id: str, since: datetime, limit: int) -> List[Dict]:
+    """Latest activities logged at or after since, read as a range of the time-ordered ids"""
+    repository = get_repository(ACTIVITY_ENTITY)
+    lower = min_id_for(int(since.timestamp() * 1000))
+    fetch = limit
+    while True:
+        rows = repository.latest_by('user_id', user_id, 'id', fetch, since=lower)
+        # Activities logged before time-ordered ids have ids that sort anywhere; they predate since
+        activities = [row for row in rows if is_generated_id(row['id'])]
+        if len(activities) >= limit or len(rows) < fetch:
+            return activities[:limit]
+        fetch *= 2
+
+def get_user_activities(user_id: str, limit: int = 10, since: Optional[datetime] = None) -> List[Dict]:
+    """Get user's recent activities, optionally only those logged at or after since"""
     activities = []
     try:
-        if os.path.exists(USER_ACTIVITIES_CSV):
-            with open(USER_ACTIVITIES_CSV, 'r') as file:
-                reader = csv.DictReader(file)
-                user_activities = [row for row in reader if row['user_id'] == user_id]
-                
-                # Sort by timestamp descending
-                user_activities.sort(key=lambda x: x['timestamp'], reverse=True)
-                
-                for activity in user_activities[:limit]:
-                    activities.append({
-                        'id': activity['id'],
-                        'type': activity['activity_type'],
-                        'title': activity['title'],
-                        'description': activity['description'],
-                        'timestamp': activity['timestamp'],
-                        'metadata': json.loads(activity['metadata']) if activity['metadata'] else {}
-                    })
-                    
+        if since is None:
+            user_activities = get_repository(ACTIVITY_ENTITY).latest_by('user_id', user_id, 'timestamp', limit)
+        else:
+            user_activities = _activities_since(user_id, since, limit)
+
+        for activity in user_activities:
+            activities.append({
+                'id': activity['id'],
+                'type': activity['activity_type'],
+                'title': activity['title'],
+                'description': activity['description'],
+                'timestamp': activity['timestamp'],
+                'metadata': json.loads(activity['metadata']) if activity['metadata'] else {}
+            })
+
     except Exception as e:
         print(f"Error fetching user activities: {e}")
-    
+
     return activities
 
 def get_user_applications(user_id: str) -> List[Dict]:
     """Get user's applications"""
     applications = []
     try:
-        if os.path.exists(USER_APPLICATIONS_CSV):
-            with open(USER_APPLICATIONS_CSV, 'r') as file:
-                reader = csv.DictReader(file)
-                user_apps = [row for row in reader if row['user_id'] == user_id]
-                
-                for app in user_apps:
-                    applications.append({
-                        'id': app['id'],
-                        'opportunity_id': app['opportunity_id'],
-                        'opportunity_type': app['opportunity_type'],
-                        'title': app['title'],
-                        'company': app['company'],
-                        'applied_date': app['applied_date'],
-                        'status': app['status']
-                    })
-                    
+        user_apps = get_repository(APPLICATION_ENTITY).scan_by('user_id', user_id)
+
+        for app in user_apps:
+            applications.append({
+                'id': app['id'],
+                'opportunity_id': app['opportunity_id'],
+                'opportunity_type': app['opportunity_type'],
+                'title': app['title'],
+                'company': app['company'],
+                'applied_date': app['applied_date'],
+                'status': app['status']
+            })
+
     except Exception as e:
         print(f"Error fetching user applications: {e}")
-    
+
     return applications
 
 # Initialize files on module import
@@ -0,0 +1,200 @@
+import csv
+import io
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # File locking is unavailable on Windows; the in-process lock still applies
+
+USERS_CSV = "data/users.csv"
+USER_FIELDS = ['id', 'email', 'password_hash', 'role', 'profession', 'created_at']
+
+class UserStore:
+    """Append-only users CSV with in-memory email/id indexes.
+
+    Every write appends one row; a later row for the same id supersedes the
+    earlier one. Superseded rows are dropped by periodic compaction.
+    """
+
+    def __init__(self, users_file: str = USERS_CSV, check_interval: float = 5.0,
+                 compact_threshold: int = 1000):
+        self.users_file = users_file
+        self.check_interval = check_interval  # Seconds between file change checks
+        self.compact_threshold = compact_threshold  # Superseded rows tolerated before compacting
+        self.users_by_email: Dict[str, Dict] = {}
+        self.users_by_id: Dict[str, Dict] = {}
+        self.generation = 0  # Bumped whenever existing users change or the file is reloaded
+        self.fieldnames: List[str] = list(USER_FIELDS)
+        self.stale_rows = 0
+        self._offset = 0  # Bytes of the file already applied to the indexes
+        self._inode: Optional[int] = None
+        self._last_check = 0.0
+        self._lock = threading.RLock()
+        self.refresh(force=True)
+
+    def _ensure_file(self):
+        """Create the users file with its header if it does not exist"""
+        if not os.path.exists(self.users_file):
+            os.makedirs(os.path.dirname(self.users_file) or ".", exist_ok=True)
+            with open(self.users_file, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(USER_FIELDS)
+
+    def _apply_row(self, row: Dict, users_by_email: Dict[str, Dict], users_by_id: Dict[str, Dict]):
+        """Index a row, superseding any earlier version of the same user"""
+        previous = users_by_id.get(row['id'])
+        if previous is not None:
+            self.stale_rows += 1
+            self.generation += 1
+            if previous['email'] != row['email']:
+                users_by_email.pop(previous['email'], None)
+        users_by_email[row['email']] = row
+        users_by_id[row['id']] = row
+
+    def _read_from(self, offset: int, users_by_email: Dict[str, Dict], users_by_id: Dict[str, Dict]) -> int:
+        """Apply complete rows appended after offset to the given indexes; return the new offset"""
+        with open(self.users_file, 'rb') as file:
+            file.seek(offset)
+            data = file.read()
+
+        # Leave a partially written trailing row for the next read
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return offset
+
+        reader = csv.reader(io.StringIO(data[:end].decode('utf-8'), newline=''))
+        if offset == 0:
+            self.fieldnames = next(reader, USER_FIELDS)
+        for values in reader:
+            if values:
+                self._apply_row(dict(zip(self.fieldnames, values)), users_by_email, users_by_id)
+        return offset + end
+
+    def _catch_up(self):
+        """Bring the indexes in line with the file, reading only what changed"""
+        try:
+            stat = os.stat(self.users_file)
+        except OSError:
+            return
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # File was replaced (e.g. compacted by another process): full reload into new
+            # indexes, swapped in once complete since readers do not take the lock
+            users_by_email: Dict[str, Dict] = {}
+            users_by_id: Dict[str, Dict] = {}
+            self.stale_rows = 0
+            self._offset = self._read_from(0, users_by_email, users_by_id)
+            self.users_by_email, self.users_by_id = users_by_email, users_by_id
+            self._inode = stat.st_ino
+            self.generation += 1
+        elif stat.st_size > self._offset:
+            self._offset = self._read_from(self._offset, self.users_by_email, self.users_by_id)
+
+    def refresh(self, force: bool = False):
+        """Pick up rows written by other processes since the last check"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            self._last_check = now
+            try:
+                self._catch_up()
+            except Exception as e:
+                print(f"Error loading users: {e}")
+
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        """Look up a user row by email"""
+        self.refresh()
+        return self.users_by_email.get(email)
+
+    def get_by_id(self, user_id: str) -> Optional[Dict]:
+        """Look up a user row by id"""
+        self.refresh()
+        return self.users_by_id.get(user_id)
+
+    def _append(self, row: Dict):
+        """Durably append one row; caller holds the locks and has caught up"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow([row.get(field, '') for field in self.fieldnames])
+        data = buffer.getvalue().encode('utf-8')
+
+        with open(self.users_file, 'ab') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self._offset += len(data)
+        self._apply_row(row, self.users_by_email, self.users_by_id)
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive cross-process lock, held on a sidecar file that survives compaction"""
+        with open(f"{self.users_file}.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def create_user(self, user: Dict) -> bool:
+        """Append a new user; return False if the email is already registered"""
+        with self._lock:
+            self._ensure_file()
+            with self._file_lock():
+                self._catch_up()
+                if user['email'] in self.users_by_email:
+                    return False
+                self._append(user)
+
+            self._last_check = time.monotonic()
+            self._maybe_compact()
+            return True
+
+    def update_user(self, user_id: str, **fields) -> Optional[Dict]:
+        """Append a new version of an existing user with the given fields changed"""
+        with self._lock:
+            self._ensure_file()
+            with self._file_lock():
+                self._catch_up()
+                current = self.users_by_id.get(user_id)
+                if current is None:
+                    return None
+                updated = {**current, **fields}
+                self._append(updated)
+
+            self._maybe_compact()
+            return updated
+
+    def _maybe_compact(self):
+        """Compact once superseded rows outnumber the threshold"""
+        if self.stale_rows >= max(self.compact_threshold, len(self.users_by_id) // 2):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file with only the latest row per user"""
+        with self._lock:
+            with self._file_lock():
+                self._catch_up()
+
+                temp_file = f"{self.users_file}.tmp"
+                with open(temp_file, 'w', newline='') as file:
+                    writer = csv.DictWriter(file, fieldnames=self.fieldnames, extrasaction='ignore')
+                    writer.writeheader()
+                    writer.writerows(self.users_by_id.values())
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temp_file, self.users_file)
+
+                stat = os.stat(self.users_file)
+                self._inode = stat.st_ino
+                self._offset = stat.st_size
+                self.stale_rows = 0
+
+    def __len__(self) -> int:
+        return len(self.users_by_id)
+
+# Global user store
+user_store = UserStore()
@@ -1,15 +1,15 @@
 import os
 import requests
-import csv
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 import json
+from free_resources_service import RESOURCE_ENTITY, resource_catalog
 
 class YouTubeService:
     def __init__(self):
         self.api_key = os.getenv("YOUTUBE_API_KEY")
         self.base_url = "https://www.googleapis.com/youtube/v3"
-        self.resources_file = "data/free_resources.csv"
+        self.resources_file = RESOURCE_ENTITY.csv_file
 
         if not self.api_key:
             print("Warning: YouTube API key not found in environment variables")
@@ -340,45 +340,21 @@ class YouTubeService:
                     seen_ids.add(resource['id'])
                     unique_resources.append(resource)
 
-            # Read existing resources
-            existing_resources = []
-            if os.path.exists(self.resources_file):
-                with open(self.resources_file, 'r', encoding='utf-8') as file:
-                    reader = csv.DictReader(file)
-                    existing_resources = list(reader)
-
-            # Filter out YouTube resources that are older than 30 days
-            filtered_existing = [
-                resource for resource in existing_resources 
-                if not resource['id'].startswith('yt_') or 
-                   (datetime.now() - datetime.fromisoformat(resource['created_at'])).days < 30
-            ]
-
-            # Add new resources
             for resource in unique_resources:
-                # Check if resource already exists
-                if not any(existing['id'] == resource['id'] for existing in filtered_existing):
-                    filtered_existing.append(resource)
-
-            # Write back to file
-            if filtered_existing:
-                with open(self.resources_file, 'w', newline='', encoding='utf-8') as file:
-                    fieldnames = [
-                        'id', 'title', 'description', 'provider', 'category', 'level',
-                        'duration', 'url', 'embed_url', 'thumbnail', 'language',
-                        'tags', 'rating', 'created_at'
-                    ]
-                    writer = csv.DictWriter(file, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    for resource in filtered_existing:
-                        # Convert tags list to string for CSV
-                        if isinstance(resource.get('tags'), list):
-                            resource['tags'] = ','.join(resource['tags'])
-
-                        # Only write required fields
-                        row = {field: resource.get(field, '') for field in fieldnames}
-                        writer.writerow(row)
+                # Convert tags list to string for CSV
+                if isinstance(resource.get('tags'), list):
+                    resource['tags'] = ','.join(resource['tags'])
+
+            with resource_catalog.write_lock:
+                # Remove YouTube resources that are older than 30 days
+                expired = [
+                    resource['id'] for resource in resource_catalog.snapshot().resources
+                    if resource['id'].startswith('yt_') and
+                    (datetime.now() - datetime.fromisoformat(resource['created_at'])).days >= 30
+                ]
+
+                # Add new resources that are not stored yet, as one catalog version
+                resource_catalog.apply(added=unique_resources, removed=expired)
 
             print(f"Updated resources with {len(unique_resources)} new YouTube videos")
             return len(unique_resources)